@@ -0,0 +1,332 @@
+import argparse
+import csv
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from marketData.market_data_service import MarketDataService
+from marketData.market_id import PriceId, VolatilityId, RiskFreeRateId
+from path_generators.business_calendar import BusinessCalendar
+from path_generators.linear_path import LinearPath
+from path_generators.returns_generator import ReturnsGenerator
+from portfolio.portfolio import Portfolio
+from positions import common_stock
+from positions import option
+from valuation.online_statistics import DEFAULT_QUANTILES
+from valuation.parallel_valuation import split_scenarios
+from valuation.scenario_valuation import ScenarioValuation
+
+DAYS_IN_YEAR = 255
+GENERATION_BLOCK_SIZE = 1000
+SHARPE_RATIO_QUANTILES = (0.05, 0.5, 0.95)
+SECURITY_DEFAULTS = {'start_value': 100.0, 'annual_drift': 0.0, 'volatility': 0.2, 'implied_volatility': None,
+                     'risk_free_rate': 0.04}
+
+
+def load_spec(file_path):
+    """
+    Loads a batch run spec from a JSON file.
+
+    The spec holds the start_date and end_date as ISO dates, the number_of_scenarios, an optional seed and optional
+    holidays, a list of securities and a list of positions. Each security has a security_id and optionally a
+    start_value, annual_drift, volatility, implied_volatility (the volatility by default) and risk_free_rate. Each
+    position has a type of "stock" or "option", a security_id and a quantity, and options also have a strike, an
+    expiry and an option_type.
+
+    Parameters
+    ----------
+    file_path: str or path
+
+    Returns dict
+    -------
+    """
+    with open(file_path) as file:
+        return parse_spec(json.load(file))
+
+
+def parse_spec(spec):
+    """
+    Checks a batch run spec, converting dates and filling in security defaults.
+
+    Parameters
+    ----------
+    spec: dict, as described by load_spec
+
+    Returns dict
+    -------
+    """
+    for key in ('start_date', 'end_date', 'number_of_scenarios', 'securities', 'positions'):
+        if key not in spec:
+            raise ValueError("Spec must have a {} but has only {}".format(key, sorted(spec)))
+    if spec['number_of_scenarios'] < 1:
+        raise ValueError("Number of scenarios must be positive but was {}".format(spec['number_of_scenarios']))
+
+    securities = []
+    for security in spec['securities']:
+        security = dict(SECURITY_DEFAULTS, **security)
+        if security['implied_volatility'] is None:
+            security['implied_volatility'] = security['volatility']
+        securities.append(security)
+    held = {position['security_id'] for position in spec['positions']} - {
+        security['security_id'] for security in securities}
+    if held:
+        raise ValueError("Positions are held in securities {} which have no scenarios".format(sorted(held)))
+
+    return dict(
+        spec,
+        start_date=datetime.datetime.fromisoformat(spec['start_date']),
+        end_date=datetime.datetime.fromisoformat(spec['end_date']),
+        holidays=[datetime.datetime.fromisoformat(holiday) for holiday in spec.get('holidays', [])],
+        seed=spec.get('seed'),
+        securities=securities)
+
+
+def build_portfolio(positions):
+    """
+    Builds a portfolio from position specs.
+
+    :param positions: list of dict, as described by load_spec
+    :return: Portfolio
+    """
+    portfolio = Portfolio()
+    for position in positions:
+        if position['type'] == 'stock':
+            portfolio.add_position(position=common_stock.CommonStock(
+                security_id=position['security_id'],
+                quantity=position['quantity']))
+        elif position['type'] == 'option':
+            portfolio.add_position(position=option.Option(
+                security_id=position['security_id'],
+                quantity=position['quantity'],
+                expiry=datetime.datetime.fromisoformat(position['expiry']),
+                strike=position['strike'],
+                option_type=position['option_type']))
+        else:
+            raise ValueError("Position type must be stock or option but was {}".format(position['type']))
+    return portfolio
+
+
+def generate_prices(*, central_returns, volatility, start_value, number_of_scenarios, seed, workers):
+    """
+    Generates cumulative price scenarios around a central path, splitting the scenarios across a process pool.
+
+    Scenarios are drawn in blocks of GENERATION_BLOCK_SIZE, each with its own seed spawned from the seed given, so the
+    prices are the same whatever the number of workers. Each worker writes its blocks into a shared output block.
+
+    Parameters
+    ----------
+    central_returns: ndarray of the daily returns of the central path
+    volatility: float, annual volatility
+    start_value: float
+    number_of_scenarios: int
+    seed: optional int or numpy SeedSequence
+    workers: int, number of worker processes, the blocks are generated in this process if not above one
+
+    Returns ndarray shaped (date, scenario)
+    -------
+    """
+    shape = (len(central_returns), number_of_scenarios)
+    blocks = split_scenarios(number_of_scenarios=number_of_scenarios,
+                             number_of_ranges=-(-number_of_scenarios // GENERATION_BLOCK_SIZE))
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    seeds = seed_sequence.spawn(len(blocks))
+    if workers <= 1:
+        prices = np.empty(shape)
+        for (start, stop), block_seed in zip(blocks, seeds):
+            _write_prices(prices, central_returns=central_returns, volatility=volatility, start_value=start_value,
+                          seed=block_seed, start=start, stop=stop)
+        return prices
+
+    output_memory = SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(
+                _generate_price_block,
+                output_description={'name': output_memory.name, 'shape': shape},
+                central_returns=central_returns,
+                volatility=volatility,
+                start_value=start_value,
+                seed=block_seed,
+                start=start,
+                stop=stop) for (start, stop), block_seed in zip(blocks, seeds)]
+            for future in futures:
+                future.result()
+        return np.array(np.ndarray(shape, dtype=np.float64, buffer=output_memory.buf))
+    finally:
+        output_memory.close()
+        output_memory.unlink()
+
+
+def _generate_price_block(*, output_description, central_returns, volatility, start_value, seed, start, stop):
+    """
+    Generates the prices of scenarios start to stop in a worker process, writing into the shared output block.
+    """
+    output_memory = SharedMemory(name=output_description['name'])
+    try:
+        prices = np.ndarray(output_description['shape'], dtype=np.float64, buffer=output_memory.buf)
+        _write_prices(prices, central_returns=central_returns, volatility=volatility, start_value=start_value,
+                      seed=seed, start=start, stop=stop)
+        del prices
+    finally:
+        output_memory.close()
+
+
+def _write_prices(prices, *, central_returns, volatility, start_value, seed, start, stop):
+    returns_generator = ReturnsGenerator(central_returns=central_returns, volatility=volatility, seed=seed)
+    block = prices[:, start:stop]
+    # the first return is ignored, as for the cumulative values of a path
+    block[0] = start_value
+    np.add(returns_generator.generate(number_of_paths=stop - start)[1:], 1, out=block[1:])
+    np.multiply.accumulate(block, axis=0, out=block)
+
+
+def build_market_data_service(*, spec, workers):
+    """
+    Generates the price, implied volatility and risk free rate scenarios of every security in a spec.
+
+    Parameters
+    ----------
+    spec: dict, as returned by parse_spec
+    workers: int, number of worker processes
+
+    Returns MarketDataService
+    -------
+    """
+    number_of_scenarios = spec['number_of_scenarios']
+    calendar = BusinessCalendar(holidays=spec['holidays'])
+    security_seeds = np.random.SeedSequence(spec['seed']).spawn(len(spec['securities']))
+    market_data_service = MarketDataService()
+    for security, security_seed in zip(spec['securities'], security_seeds):
+        security_id = security['security_id']
+        central_path = LinearPath(
+            daily_value=pow(1 + security['annual_drift'], 1 / DAYS_IN_YEAR) - 1,
+            start_date=spec['start_date'],
+            end_date=spec['end_date'],
+            calendar=calendar)
+        dates = central_path.get_path_dataframe().index
+        prices = generate_prices(
+            central_returns=central_path.get_path_values()[:, 0],
+            volatility=security['volatility'],
+            start_value=security['start_value'],
+            number_of_scenarios=number_of_scenarios,
+            seed=security_seed,
+            workers=workers)
+        market_data_service.add_market_data_from_path(
+            path_data_frame=pd.DataFrame(prices, index=dates, copy=False),
+            market_id=PriceId(security_id=security_id))
+
+        for market_id, value in ((VolatilityId(security_id=security_id), security['implied_volatility']),
+                                 (RiskFreeRateId(security_id=security_id), security['risk_free_rate'])):
+            market_data_service.add_market_data_from_path(
+                path_data_frame=LinearPath(daily_value=value, start_date=spec['start_date'],
+                                           end_date=spec['end_date'], calendar=calendar)
+                .repeat_scenarios(number_of_scenarios).get_path_dataframe(),
+                market_id=market_id)
+    return market_data_service
+
+
+def run_batch(*, spec, output_directory, workers=None):
+    """
+    Generates the scenarios of a spec, values its portfolio and writes the results and timings to a directory.
+
+    Three files are written: statistics.csv with the mean, standard deviation, quantiles, value at risk and expected
+    shortfall of the portfolio on each date, summary.json with the sharpe ratio distribution and the value at risk and
+    expected shortfall on the last date, and timings.json with the seconds taken by each stage.
+
+    Parameters
+    ----------
+    spec: dict, as returned by parse_spec
+    output_directory: str or path, made if it does not exist
+    workers: optional int, number of worker processes, all cores are used if not given
+
+    Returns dict, the summary with the timings under 'timings'
+    -------
+    """
+    workers = os.cpu_count() if workers is None else workers
+    timings = {}
+    start = time.perf_counter()
+
+    market_data_service = build_market_data_service(spec=spec, workers=workers)
+    timings['generation_seconds'] = time.perf_counter() - start
+
+    stage_start = time.perf_counter()
+    scenario_valuation = ScenarioValuation(
+        portfolio=build_portfolio(spec['positions']),
+        market_data_service=market_data_service,
+        workers=workers)
+    timings['valuation_seconds'] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    scenario_statistics = scenario_valuation.get_scenario_statistics()
+    sharpe_ratio_quantiles = scenario_statistics.get_sharpe_ratio_quantiles(SHARPE_RATIO_QUANTILES)
+    summary = {
+        'number_of_scenarios': scenario_valuation.get_number_scenarios(),
+        'number_of_dates': len(market_data_service.get_dates()),
+        'mean_sharpe_ratio': float(scenario_statistics.get_sharpe_ratio_mean()),
+        'sharpe_ratio_quantiles': {str(quantile): float(value)
+                                   for quantile, value in zip(SHARPE_RATIO_QUANTILES, sharpe_ratio_quantiles)},
+        'value_at_risk': float(scenario_statistics.get_value_at_risk()[-1]),
+        'expected_shortfall': float(scenario_statistics.get_expected_shortfall()[-1])}
+    timings['statistics_seconds'] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    os.makedirs(output_directory, exist_ok=True)
+    write_statistics(scenario_statistics=scenario_statistics, dates=market_data_service.get_dates(),
+                     file_path=os.path.join(output_directory, 'statistics.csv'))
+    with open(os.path.join(output_directory, 'summary.json'), 'w') as file:
+        json.dump(summary, file, indent=2)
+    timings['writing_seconds'] = time.perf_counter() - stage_start
+    timings['total_seconds'] = time.perf_counter() - start
+
+    timings = dict(timings, workers=workers, python=platform.python_version(), machine=platform.machine())
+    with open(os.path.join(output_directory, 'timings.json'), 'w') as file:
+        json.dump(timings, file, indent=2)
+    return dict(summary, timings=timings)
+
+
+def write_statistics(*, scenario_statistics, dates, file_path):
+    """
+    Writes the statistics of the portfolio on each date to a CSV file.
+
+    :param scenario_statistics: ScenarioStatistics
+    :param dates: Index of valuation dates
+    :param file_path: str or path
+    :return: none
+    """
+    columns = [scenario_statistics.get_mean(), scenario_statistics.get_std()]
+    columns.extend(scenario_statistics.get_quantiles(DEFAULT_QUANTILES).T)
+    columns.extend((scenario_statistics.get_value_at_risk(), scenario_statistics.get_expected_shortfall()))
+    with open(file_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['date', 'mean', 'std'] + ['quantile_{}'.format(quantile) for quantile in DEFAULT_QUANTILES]
+                        + ['value_at_risk', 'expected_shortfall'])
+        for date, row in zip(dates, np.column_stack(columns)):
+            writer.writerow([date.date().isoformat()] + row.tolist())
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Generates scenarios and values a portfolio without the front end.")
+    parser.add_argument('spec', help="JSON file of the scenarios and portfolio to value")
+    parser.add_argument('--output', default='batch_results', help="directory to write the results and timings to")
+    parser.add_argument('--workers', type=int, help="number of worker processes, defaults to the number of cores")
+    arguments = parser.parse_args(arguments)
+
+    results = run_batch(spec=load_spec(arguments.spec), output_directory=arguments.output, workers=arguments.workers)
+    timings = results['timings']
+    print('Valued {} scenarios over {} dates in {:.2f}s with {} workers'.format(
+        results['number_of_scenarios'], results['number_of_dates'], timings['total_seconds'], timings['workers']))
+    print('Mean sharpe ratio {:.4f}, 95% value at risk {:.4f}, 95% expected shortfall {:.4f}'.format(
+        results['mean_sharpe_ratio'], results['value_at_risk'], results['expected_shortfall']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
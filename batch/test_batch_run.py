@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from batch.batch_run import build_market_data_service, build_portfolio, generate_prices, parse_spec, run_batch
+from valuation.scenario_valuation import ScenarioValuation
+
+SPEC = {
+    'start_date': '2023-12-15',
+    'end_date': '2024-03-15',
+    'number_of_scenarios': 40,
+    'seed': 7,
+    'securities': [{'security_id': 1, 'annual_drift': 0.1}, {'security_id': 2, 'volatility': 0.3}],
+    'positions': [
+        {'type': 'stock', 'security_id': 1, 'quantity': 3},
+        {'type': 'option', 'security_id': 2, 'quantity': 2, 'strike': 105, 'expiry': '2024-02-16',
+         'option_type': 'call'}]}
+
+
+class TestBatchRun(unittest.TestCase):
+
+    def test_run_batch(self):
+        spec = parse_spec(SPEC)
+        with tempfile.TemporaryDirectory() as directory:
+            results = run_batch(spec=spec, output_directory=directory, workers=2)
+            with open(os.path.join(directory, 'summary.json')) as file:
+                summary = json.load(file)
+            with open(os.path.join(directory, 'statistics.csv')) as file:
+                statistics_lines = file.read().splitlines()
+            self.assertTrue(os.path.exists(os.path.join(directory, 'timings.json')))
+
+        # Check that the results written are those of valuing the same scenarios in this process.
+        scenario_valuation = ScenarioValuation(
+            portfolio=build_portfolio(spec['positions']),
+            market_data_service=build_market_data_service(spec=spec, workers=1))
+        self.assertEqual(summary['number_of_scenarios'], 40)
+        self.assertAlmostEqual(summary['mean_sharpe_ratio'],
+                               np.mean(scenario_valuation.get_all_sharpe_ratios_max_period()))
+        self.assertEqual(len(statistics_lines), summary['number_of_dates'] + 1)
+        self.assertGreaterEqual(results['timings']['total_seconds'], results['timings']['valuation_seconds'])
+
+    def test_generate_prices(self):
+        central_returns = np.full(30, 0.001)
+        prices = [generate_prices(central_returns=central_returns, volatility=0.2, start_value=100,
+                                  number_of_scenarios=2500, seed=3, workers=workers) for workers in (1, 3)]
+
+        # Check that the prices start at the start value and do not depend on the number of workers.
+        np.testing.assert_array_equal(prices[0][0], 100)
+        np.testing.assert_array_equal(prices[0], prices[1])
+
+    def test_headless_import(self):
+        code = "import sys, batch.batch_run; print(sorted({'tkinter', 'matplotlib'} & set(sys.modules)))"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+        # Check that the batch run can be imported on a machine without a display.
+        self.assertEqual(output.stdout.strip(), '[]')
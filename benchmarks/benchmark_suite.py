@@ -0,0 +1,345 @@
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from marketData import market_id
+from marketData.market_data_service import MarketDataService
+from path_generators.correlated_path import CorrelatedPath
+from path_generators.linear_path import LinearPath
+from path_generators.volatile_path import VolatilePath
+from portfolio.portfolio import Portfolio
+from positions import common_stock
+from positions import option
+from valuation.portfolio_valuation import PortfolioValuation
+from valuation.scenario_valuation import ScenarioValuation
+
+START_DATE = datetime.datetime(2023, 12, 15, 0, 0)
+SECURITY_ID = 1
+SEED = 1000
+
+DEFAULT_SCENARIO_COUNTS = (100, 1000)
+DEFAULT_HORIZONS = (365,)
+DEFAULT_PORTFOLIO_SIZES = (3, 30)
+DEFAULT_REPEATS = 3
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_IMPORT_MODULES = ('valuation.scenario_valuation', 'batch.batch_run')
+DEFERRED_MODULES = ('scipy', 'matplotlib', 'tkinter')
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [name for name in {deferred!r} if name in sys.modules]}}))
+'''
+
+
+def time_call(function, *, repeats):
+    """
+    Times a function, calling it a number of times.
+
+    Parameters
+    ----------
+    function: callable taking no arguments
+    repeats: int
+
+    Returns dict with the best and median times in seconds
+    -------
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {'seconds': min(times), 'median_seconds': float(np.median(times))}
+
+
+def build_central_path(*, horizon):
+    return LinearPath(
+        daily_value=0.0004,
+        start_date=START_DATE,
+        end_date=START_DATE + datetime.timedelta(days=horizon))
+
+
+def build_price_path_dataframe(*, number_of_scenarios, horizon):
+    price_paths = VolatilePath(
+        volatility=0.2,
+        number_of_paths=number_of_scenarios,
+        central_path=build_central_path(horizon=horizon),
+        seed=SEED)
+    return price_paths.get_cumulative_path(start_value=100)
+
+
+def build_market_data_service(*, number_of_scenarios, horizon):
+    """
+    Builds a Market Data Service holding price, volatility and risk free rate scenarios for a single security.
+
+    Parameters
+    ----------
+    number_of_scenarios: int
+    horizon: int, number of calendar days covered by the scenarios
+
+    Returns MarketDataService
+    -------
+    """
+    end_date = START_DATE + datetime.timedelta(days=horizon)
+    market_data_service = MarketDataService()
+    market_data_service.add_market_data_from_path(
+        path_data_frame=build_price_path_dataframe(number_of_scenarios=number_of_scenarios, horizon=horizon),
+        market_id=market_id.PriceId(security_id=SECURITY_ID))
+    market_data_service.add_market_data_from_path(
+        path_data_frame=LinearPath(daily_value=0.2, start_date=START_DATE, end_date=end_date)
+        .repeat_scenarios(number_of_scenarios).get_path_dataframe(),
+        market_id=market_id.VolatilityId(security_id=SECURITY_ID))
+    market_data_service.add_market_data_from_path(
+        path_data_frame=LinearPath(daily_value=0.04, start_date=START_DATE, end_date=end_date)
+        .repeat_scenarios(number_of_scenarios).get_path_dataframe(),
+        market_id=market_id.RiskFreeRateId(security_id=SECURITY_ID))
+    return market_data_service
+
+
+def build_portfolio(*, number_of_positions, horizon):
+    """
+    Builds a portfolio of a stock position and calls and puts spread over strikes and expiries within the horizon.
+
+    Parameters
+    ----------
+    number_of_positions: int
+    horizon: int, number of calendar days covered by the scenarios
+
+    Returns Portfolio
+    -------
+    """
+    portfolio = Portfolio()
+    portfolio.add_position(position=common_stock.CommonStock(security_id=SECURITY_ID, quantity=3))
+    for index in range(number_of_positions - 1):
+        portfolio.add_position(position=option.Option(
+            security_id=SECURITY_ID,
+            quantity=1 + index % 3,
+            expiry=START_DATE + datetime.timedelta(days=horizon * (1 + index % 4) // 4),
+            strike=80 + 40 * (index % 9) / 8,
+            option_type="call" if index % 2 == 0 else "put"))
+    return portfolio
+
+
+def benchmark_volatile_path(*, number_of_scenarios, horizon, repeats):
+    central_path = build_central_path(horizon=horizon)
+    return time_call(
+        lambda: VolatilePath(volatility=0.2, number_of_paths=number_of_scenarios, central_path=central_path, seed=SEED),
+        repeats=repeats)
+
+
+def benchmark_correlated_path(*, number_of_scenarios, horizon, repeats):
+    central_path = VolatilePath(
+        volatility=0.2,
+        number_of_paths=1,
+        central_path=build_central_path(horizon=horizon),
+        seed=SEED)
+    return time_call(
+        lambda: CorrelatedPath(
+            correlation=0.8,
+            annual_volatility=0.2,
+            number_of_paths=number_of_scenarios,
+            central_path=central_path,
+            seed=SEED),
+        repeats=repeats)
+
+
+def benchmark_add_market_data_from_path(*, number_of_scenarios, horizon, repeats):
+    path_data_frame = build_price_path_dataframe(number_of_scenarios=number_of_scenarios, horizon=horizon)
+    return time_call(
+        lambda: MarketDataService().add_market_data_from_path(
+            path_data_frame=path_data_frame,
+            market_id=market_id.PriceId(security_id=SECURITY_ID)),
+        repeats=repeats)
+
+
+def benchmark_portfolio_valuation(*, number_of_scenarios, horizon, number_of_positions, repeats):
+    market_data_service = build_market_data_service(number_of_scenarios=number_of_scenarios, horizon=horizon)
+    portfolio = build_portfolio(number_of_positions=number_of_positions, horizon=horizon)
+    # a single scenario is valued, as the Portfolio Valuation Class values one scenario at a time
+    return time_call(
+        lambda: PortfolioValuation(portfolio=portfolio, market_data_service=market_data_service, scenario_number=0),
+        repeats=repeats)
+
+
+def benchmark_sharpe_ratios_max_period(*, number_of_scenarios, horizon, number_of_positions, repeats):
+    market_data_service = build_market_data_service(number_of_scenarios=number_of_scenarios, horizon=horizon)
+    portfolio = build_portfolio(number_of_positions=number_of_positions, horizon=horizon)
+    return time_call(
+        lambda: ScenarioValuation(portfolio=portfolio, market_data_service=market_data_service)
+        .get_all_sharpe_ratios_max_period(),
+        repeats=repeats)
+
+
+def benchmark_import_time(*, module, repeats):
+    """
+    Times a cold import of a module, each in a new interpreter so nothing is already loaded.
+
+    Only the import itself is timed, not the start up of the interpreter. The heavy optional modules, which should only
+    be loaded when an option is valued or a chart is shown, are listed if the import loaded them.
+
+    Parameters
+    ----------
+    module: str, the dotted module name
+    repeats: int
+
+    Returns dict with the best and median times in seconds and the deferred modules loaded
+    -------
+    """
+    times = []
+    loaded = []
+    for _ in range(repeats):
+        completed = subprocess.run(
+            [sys.executable, '-c', IMPORT_SCRIPT.format(module=module, deferred=DEFERRED_MODULES)],
+            cwd=REPOSITORY_DIRECTORY, capture_output=True, text=True, check=True)
+        result = json.loads(completed.stdout.splitlines()[-1])
+        times.append(result['seconds'])
+        loaded = result['loaded']
+    return {'seconds': min(times), 'median_seconds': float(np.median(times)), 'deferred_modules_loaded': loaded}
+
+
+def run_benchmarks(*, scenario_counts=DEFAULT_SCENARIO_COUNTS, horizons=DEFAULT_HORIZONS,
+                   portfolio_sizes=DEFAULT_PORTFOLIO_SIZES, repeats=DEFAULT_REPEATS,
+                   import_modules=DEFAULT_IMPORT_MODULES):
+    """
+    Runs every benchmark for each combination of the parameters given.
+
+    Path generation and market data loading do not depend on the portfolio, so they are run once for each scenario
+    count and horizon. Import times are run once for each module.
+
+    Parameters
+    ----------
+    scenario_counts: iterable of int
+    horizons: iterable of int, number of calendar days
+    portfolio_sizes: iterable of int, number of positions
+    repeats: int, number of times each benchmark is timed
+    import_modules: iterable of str, modules whose cold import is timed
+
+    Returns list of dict, one for each benchmark run
+    -------
+    """
+    results = [{'name': 'import_time', 'parameters': {'module': module},
+                **benchmark_import_time(module=module, repeats=repeats)}
+               for module in import_modules]
+    for number_of_scenarios, horizon in itertools.product(scenario_counts, horizons):
+        parameters = {'number_of_scenarios': number_of_scenarios, 'horizon': horizon}
+        for name, benchmark in (('volatile_path', benchmark_volatile_path),
+                                ('correlated_path', benchmark_correlated_path),
+                                ('add_market_data_from_path', benchmark_add_market_data_from_path)):
+            results.append({'name': name, 'parameters': dict(parameters),
+                            **benchmark(repeats=repeats, **parameters)})
+        for number_of_positions in portfolio_sizes:
+            portfolio_parameters = {**parameters, 'number_of_positions': number_of_positions}
+            for name, benchmark in (('portfolio_valuation', benchmark_portfolio_valuation),
+                                    ('sharpe_ratios_max_period', benchmark_sharpe_ratios_max_period)):
+                results.append({'name': name, 'parameters': dict(portfolio_parameters),
+                                **benchmark(repeats=repeats, **portfolio_parameters)})
+    return results
+
+
+def get_result_key(result):
+    return result['name'], tuple(sorted(result['parameters'].items()))
+
+
+def compare_results(*, results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compares benchmark results against a baseline, flagging those which are slower by more than the tolerance.
+
+    Benchmarks missing from the baseline are not compared.
+
+    Parameters
+    ----------
+    results: list of dict, as returned by run_benchmarks
+    baseline: list of dict, as returned by run_benchmarks
+    tolerance: float, the fraction by which a benchmark may be slower than the baseline
+
+    Returns list of dict, one for each benchmark compared, with a regression flag
+    -------
+    """
+    baseline_seconds = {get_result_key(result): result['seconds'] for result in baseline}
+    comparisons = []
+    for result in results:
+        key = get_result_key(result)
+        if key not in baseline_seconds:
+            continue
+        ratio = result['seconds'] / baseline_seconds[key] if baseline_seconds[key] > 0 else float('inf')
+        comparisons.append({'name': result['name'],
+                            'parameters': result['parameters'],
+                            'seconds': result['seconds'],
+                            'baseline_seconds': baseline_seconds[key],
+                            'ratio': ratio,
+                            'regression': ratio > 1 + tolerance})
+    return comparisons
+
+
+def save_results(*, results, file_path):
+    document = {'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'results': results}
+    with open(file_path, 'w') as file:
+        json.dump(document, file, indent=2)
+
+
+def load_results(file_path):
+    with open(file_path) as file:
+        return json.load(file)['results']
+
+
+def format_parameters(parameters):
+    return ', '.join('{}={}'.format(key, value) for key, value in parameters.items())
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(
+        description="Times module imports, path generation, market data loading and valuation.")
+    parser.add_argument('--scenarios', type=int, nargs='+', default=list(DEFAULT_SCENARIO_COUNTS),
+                        help="numbers of scenarios to benchmark")
+    parser.add_argument('--horizons', type=int, nargs='+', default=list(DEFAULT_HORIZONS),
+                        help="numbers of calendar days covered by the scenarios")
+    parser.add_argument('--positions', type=int, nargs='+', default=list(DEFAULT_PORTFOLIO_SIZES),
+                        help="numbers of positions in the portfolio")
+    parser.add_argument('--imports', nargs='*', default=list(DEFAULT_IMPORT_MODULES),
+                        help="modules whose cold import time is benchmarked")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="times each benchmark is run")
+    parser.add_argument('--output', default='benchmark_results.json', help="file to write the results to")
+    parser.add_argument('--baseline', help="results file to compare against, flagging regressions")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="fraction by which a benchmark may be slower than the baseline")
+    arguments = parser.parse_args(arguments)
+
+    results = run_benchmarks(
+        scenario_counts=arguments.scenarios,
+        horizons=arguments.horizons,
+        portfolio_sizes=arguments.positions,
+        repeats=arguments.repeats,
+        import_modules=arguments.imports)
+    save_results(results=results, file_path=arguments.output)
+    for result in results:
+        print('{:<28} {:>10.4f}s  {}'.format(
+            result['name'], result['seconds'], format_parameters(result['parameters'])))
+
+    if arguments.baseline is None:
+        return 0
+    comparisons = compare_results(
+        results=results,
+        baseline=load_results(arguments.baseline),
+        tolerance=arguments.tolerance)
+    regressions = [comparison for comparison in comparisons if comparison['regression']]
+    for regression in regressions:
+        print('REGRESSION {:<28} {:.2f}x baseline  {}'.format(
+            regression['name'], regression['ratio'], format_parameters(regression['parameters'])))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
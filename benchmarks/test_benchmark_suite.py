@@ -0,0 +1,39 @@
+import unittest
+
+from benchmarks.benchmark_suite import benchmark_import_time, compare_results, run_benchmarks
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(scenario_counts=[2], horizons=[30], portfolio_sizes=[1, 3], repeats=1,
+                                 import_modules=[])
+
+        # Check that each path benchmark runs once and each valuation benchmark once per portfolio size.
+        names = [result['name'] for result in results]
+        self.assertEqual(names.count('volatile_path'), 1)
+        self.assertEqual(names.count('correlated_path'), 1)
+        self.assertEqual(names.count('add_market_data_from_path'), 1)
+        self.assertEqual(names.count('portfolio_valuation'), 2)
+        self.assertEqual(names.count('sharpe_ratios_max_period'), 2)
+        self.assertTrue(all(result['seconds'] >= 0 for result in results))
+
+    def test_import_time(self):
+        result = benchmark_import_time(module='valuation.scenario_valuation', repeats=1)
+
+        # Check that a headless valuation does not load the option pricing or plotting libraries.
+        self.assertEqual(result['deferred_modules_loaded'], [])
+        self.assertGreater(result['seconds'], 0)
+
+    def test_compare_results(self):
+        baseline = [{'name': 'volatile_path', 'parameters': {'number_of_scenarios': 10}, 'seconds': 1.0},
+                    {'name': 'correlated_path', 'parameters': {'number_of_scenarios': 10}, 'seconds': 1.0}]
+        results = [{'name': 'volatile_path', 'parameters': {'number_of_scenarios': 10}, 'seconds': 1.1},
+                   {'name': 'correlated_path', 'parameters': {'number_of_scenarios': 10}, 'seconds': 1.5},
+                   {'name': 'correlated_path', 'parameters': {'number_of_scenarios': 20}, 'seconds': 9.0}]
+
+        comparisons = compare_results(results=results, baseline=baseline, tolerance=0.25)
+
+        # Check that only the slower benchmark is flagged and that benchmarks missing from the baseline are skipped.
+        self.assertEqual(len(comparisons), 2)
+        self.assertEqual([comparison['regression'] for comparison in comparisons], [False, True])
@@ -1,12 +1,66 @@
-import datetime
 import tkinter as tk
-import pandas as pd
+
 import numpy as np
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import pandas as pd
+
+from path_generators.business_calendar import get_business_day_grid
+
+CANVAS_BASELINE = 281
+
+
+def resample_drawing(points, *, number_of_points, baseline=CANVAS_BASELINE):
+    """
+    Resamples points drawn on a canvas into evenly spaced values, in one vectorized call.
+
+    Canvas y grows downwards, so values are measured up from the baseline. Where the line doubles back, the first
+    point drawn at each x is kept, and values between the points drawn are linearly interpolated.
 
-from matplotlib.figure import Figure
+    Parameters
+    ----------
+    points: sequence of canvas coordinates x0, y0, x1, y1, ...
+    number_of_points: int, the number of values to return
+    baseline: int, the canvas y of a value of zero
+
+    Returns ndarray of float shaped (number_of_points,)
+    -------
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(points) == 0:
+        raise ValueError("A line must be drawn before it can be resampled")
+    x, first = np.unique(points[:, 0], return_index=True)
+    values = baseline - points[first, 1]
+    # the first of the evenly spaced positions is the start of the line, which is not part of the path
+    positions = np.linspace(x[0], x[-1], number_of_points + 1)[1:]
+    return np.interp(positions, x, values)
 
-from path_generators.linear_path import LinearPath
+
+def stretch_and_translate(values, *, target_start, target_peak, target_trough):
+    """
+    Moves values to start at a target and scales the parts above and below the start to reach the target peak and
+    trough.
+
+    Parameters
+    ----------
+    values: ndarray
+    target_start: float
+    target_peak: float
+    target_trough: float
+
+    Returns ndarray
+    -------
+    """
+    current_start = values[0]
+    peak_multiplier = get_multiplier(target_start, current_start, values.max(), target_peak)
+    trough_multiplier = get_multiplier(target_start, current_start, values.min(), target_trough)
+    multiplier = np.where(values >= current_start, peak_multiplier, trough_multiplier)
+    return (values - current_start) * multiplier + target_start
+
+
+def get_multiplier(start_target, current_start, current_peak, current_target):
+    if current_start != current_peak:
+        return (current_target - start_target) / (current_peak - current_start)
+    else:
+        return 0
 
 
 class DrawingInput:
@@ -25,6 +79,8 @@ class DrawingInput:
         self.line_id = None
         self.line_points = []
         self.line_options = {}
+        self.__preview_id = None
+        self.__preview_pending = None
         self.canvas = (tk.Canvas(frame))
         self.canvas.grid(row=1, column=3)
         self.canvas.bind('<Button-1>', self._set_start)
@@ -34,9 +90,32 @@ class DrawingInput:
 
     def _draw_line(self, event):
         self.line_points.extend((event.x, event.y))
-        if self.line_id is not None:
-            self.canvas.delete(self.line_id)
-        self.line_id = self.canvas.create_line(self.line_points, **self.line_options)
+        if self.line_id is None:
+            self.line_id = self.canvas.create_line(self.line_points, **self.line_options)
+        else:
+            self.canvas.coords(self.line_id, self.line_points)
+        # motion events come faster than the preview needs redrawing, so one preview is drawn once they are handled
+        if self.__preview_pending is None:
+            self.__preview_pending = self.canvas.after_idle(self._draw_preview)
+
+    def _draw_preview(self):
+        """
+        Draws the path the line resamples to, one point for each pixel of the line's width.
+        """
+        self.__preview_pending = None
+        if self.__preview_id is not None:
+            self.canvas.delete(self.__preview_id)
+            self.__preview_id = None
+        x = self.line_points[::2]
+        if len(x) < 2:
+            return
+        number_of_points = int(max(x) - min(x))
+        if number_of_points < 2:
+            return
+        values = resample_drawing(self.line_points, number_of_points=number_of_points)
+        preview_x = np.linspace(min(x), max(x), number_of_points + 1)[1:]
+        self.__preview_id = self.canvas.create_line(
+            np.column_stack((preview_x, CANVAS_BASELINE - values)).ravel().tolist(), fill='orange', dash=(2, 2))
 
     def _set_start(self, event):
         self.line_points.extend((event.x, event.y))
@@ -46,53 +125,31 @@ class DrawingInput:
 
     def _clear_line(self):
         self.canvas.delete(self.line_id)
+        if self.__preview_pending is not None:
+            self.canvas.after_cancel(self.__preview_pending)
+            self.__preview_pending = None
+        if self.__preview_id is not None:
+            self.canvas.delete(self.__preview_id)
         self.line_points = []
         self.line_id = None
+        self.__preview_id = None
         self.line_options = {}
 
     def plot_drawn_graph(self, *, target_start, target_peak, target_trough, start_date, end_date):
-        linear_path = LinearPath(daily_value=0.0, start_date=start_date, end_date=end_date)
-        values = self.line_points
-
-        x_axis = values[::2]
-        y_axis_orig = values[1::2]
-        starting = [281] * len(y_axis_orig)
-        y_axis = []
-        for x in range(len(y_axis_orig)):
-            y_axis.append(starting[x] - y_axis_orig[x])
-        cum_values = pd.DataFrame(y_axis, index=x_axis)
-        cum_values = cum_values[~cum_values.index.duplicated(keep='first')]
-
-        r = pd.RangeIndex(0, linear_path.get_path_dataframe().shape[0] + 1, 1)
-        t = cum_values
-        t = t.sort_index()
-        new_idx = np.linspace(t.index[0], t.index[-1], len(r))
-        new_cum = t.reindex(new_idx, method='ffill', limit=1).iloc[1:].interpolate()
-
-        complete = pd.DataFrame(new_cum.values, index=linear_path.get_path_dataframe().index.copy())
-        current_peak = complete.max()[0]
-        current_trough = complete.min()[0]
-
-        current_start = complete.iloc[0][0]
-
-        return self._stretch_and_translate_path(complete, target_start, current_start, current_peak, target_peak,
-                                                current_trough, target_trough)
-
-    def _get_multiplier(self, start_target, current_start, current_peak, current_target):
-        if current_start != current_peak:
-            return (current_target - start_target) / (current_peak - current_start)
-        else:
-            return 0
-
-    def _stretch_and_translate_path(self, path, start_target, current_start, current_peak, target_peak,
-                                    current_trough, target_trough):
-
-        max_multiplier = self._get_multiplier(start_target, current_start, current_peak, target_peak)
-        max_addition = start_target - current_start * max_multiplier
-
-        min_multiplier = self._get_multiplier(start_target, current_start, current_trough, target_trough)
-        min_addition = start_target - current_start * min_multiplier
-
-        max_path = path.where(path >= current_start).mul(max_multiplier).add(max_addition).fillna(0)
-        min_path = path.where(path < current_start).mul(min_multiplier).add(min_addition).fillna(0)
-        return sum([max_path, min_path])
+        """
+        Gets the drawn line as a path of cumulative values on each working day from start date to end date.
+
+        :param target_start: float, the first value
+        :param target_peak: float, the highest value
+        :param target_trough: float, the lowest value
+        :param start_date: datetime
+        :param end_date: datetime
+        :return: DataFrame of date to cumulative value
+        """
+        dates = get_business_day_grid(start_date=start_date, end_date=end_date)
+        values = resample_drawing(self.line_points, number_of_points=len(dates))
+        return pd.DataFrame(stretch_and_translate(
+            values,
+            target_start=target_start,
+            target_peak=target_peak,
+            target_trough=target_trough), index=dates.copy())
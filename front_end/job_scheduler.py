@@ -0,0 +1,163 @@
+import queue
+import threading
+
+DEFAULT_POLL_INTERVAL = 50
+
+
+class BackgroundJob:
+    """ Background Job Class
+    Runs a generator of progress on a worker thread, passing each item it yields to the main thread through a queue.
+
+    The job is cancelled between items, so a generator should yield often enough for cancellation to be prompt.
+    """
+
+    def __init__(self, *, steps):
+        """
+        Initialize the Background Job Class.
+
+        :param steps: callable taking no arguments which returns the generator to run
+        """
+        self.__steps = steps
+        self.__updates = queue.Queue()
+        self.__cancelled = threading.Event()
+        self.__finished = threading.Event()
+        self.__error = None
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+
+    def start(self):
+        self.__thread.start()
+
+    def cancel(self):
+        self.__cancelled.set()
+
+    def is_cancelled(self):
+        return self.__cancelled.is_set()
+
+    def is_finished(self):
+        """
+        Gets whether the worker has stopped, by finishing, failing or being cancelled.
+
+        :return: bool
+        """
+        return self.__finished.is_set()
+
+    def get_error(self):
+        return self.__error
+
+    def get_updates(self):
+        """
+        Takes every item yielded since the last call.
+
+        :return: list
+        """
+        updates = []
+        while True:
+            try:
+                updates.append(self.__updates.get_nowait())
+            except queue.Empty:
+                return updates
+
+    def join(self, timeout=None):
+        self.__thread.join(timeout)
+
+    def __run(self):
+        steps = None
+        try:
+            steps = self.__steps()
+            for update in steps:
+                if self.__cancelled.is_set():
+                    break
+                self.__updates.put(update)
+        except Exception as error:
+            self.__error = error
+        finally:
+            if steps is not None:
+                steps.close()
+            self.__finished.set()
+
+
+class JobScheduler:
+    """ Job Scheduler Class
+    Runs one background job at a time for a Tk widget, polling it with after() so that the widget is only ever
+    updated from the Tk main thread.
+
+    Submitting a job cancels the job already running. Only the latest update is shown on each poll, so a slow chart
+    never falls behind a fast job.
+    """
+
+    def __init__(self, widget, *, poll_interval=DEFAULT_POLL_INTERVAL):
+        """
+        Initialize the Job Scheduler Class.
+
+        Parameters
+        ----------
+        widget: the tkinter widget whose after() is used to poll the job
+        poll_interval: int, milliseconds between polls
+        """
+        self.__widget = widget
+        self.__poll_interval = poll_interval
+        self.__job = None
+        self.__callbacks = None
+        self.__last_update = None
+
+    def submit(self, *, steps, on_progress, on_done=None, on_error=None, on_cancel=None):
+        """
+        Starts a job, cancelling the job already running.
+
+        Parameters
+        ----------
+        steps: callable taking no arguments which returns a generator, run on a worker thread
+        on_progress: callable taking the latest update, called on the main thread
+        on_done: optional callable taking the last update, called on the main thread once the generator is exhausted
+        on_error: optional callable taking the exception raised by the generator
+        on_cancel: optional callable taking no arguments, called once a cancelled job has stopped
+
+        Returns BackgroundJob
+        -------
+        """
+        self.cancel()
+        self.__job = BackgroundJob(steps=steps)
+        self.__callbacks = (on_progress, on_done, on_error, on_cancel)
+        self.__last_update = None
+        self.__job.start()
+        self.__widget.after(self.__poll_interval, self.__poll, self.__job)
+        return self.__job
+
+    def cancel(self):
+        """
+        Cancels the running job, if there is one. No more of its updates are shown.
+
+        :return: none
+        """
+        if self.__job is not None:
+            self.__job.cancel()
+            _, _, _, on_cancel = self.__callbacks
+            self.__job = None
+            if on_cancel is not None:
+                on_cancel()
+
+    def is_running(self):
+        return self.__job is not None
+
+    def __poll(self, job):
+        if job is not self.__job:
+            # the job has been cancelled or replaced
+            return
+        # every update is queued before the job is marked finished, so none are missed by checking first
+        finished = job.is_finished()
+        updates = job.get_updates()
+        on_progress, on_done, on_error, _ = self.__callbacks
+        if updates:
+            self.__last_update = updates[-1]
+            on_progress(self.__last_update)
+        if not finished:
+            self.__widget.after(self.__poll_interval, self.__poll, job)
+            return
+
+        self.__job = None
+        if job.get_error() is not None:
+            if on_error is None:
+                raise job.get_error()
+            on_error(job.get_error())
+        elif on_done is not None:
+            on_done(self.__last_update)
@@ -1,17 +1,19 @@
 import tkinter as tk
+from tkinter import filedialog
+import numpy as np
 import pandas as pd
 import datetime
 
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-
 from front_end.drawing_input import DrawingInput
-from marketData.market_data_service import MarketDataService
+from front_end.job_scheduler import JobScheduler
+from marketData.market_data_service import MarketDataService, open_market_data_service
 from marketData.market_id import PriceId, VolatilityId, RiskFreeRateId
 from path_generators.correlated_path import CorrelatedPath
 from path_generators.linear_path import LinearPath
 from path_generators.path import Path
-from path_generators.volatile_path import VolatilePath
+from path_generators.returns_generator import ReturnsGenerator
+
+SCENARIO_CHUNK_SIZE = 200
 
 
 class MarketScenarios:
@@ -28,6 +30,9 @@ class MarketScenarios:
         """
 
         self.market_data_service = None
+        self.__job_scheduler = JobScheduler(frame)
+        self.__scenario_chart = None
+        self.__status = tk.StringVar(frame, value='')
         drawing_input_frame = tk.Frame(frame)
         numerical_inputs_frame = tk.Frame(frame)
         self.__graph_frame = tk.Frame(frame)
@@ -62,6 +67,27 @@ class MarketScenarios:
         tk.Button(numerical_inputs_frame, text='Exit', command=frame.quit).grid(row=6, column=0, sticky=tk.W, pady=4)
         tk.Button(numerical_inputs_frame, text='Create Graph', command=self._show_data).grid(row=7, column=0,
                                                                                              sticky=tk.W, pady=4)
+        tk.Button(numerical_inputs_frame, text='Save Scenarios', command=self._save_scenarios).grid(row=8, column=0,
+                                                                                                    sticky=tk.W, pady=4)
+        tk.Button(numerical_inputs_frame, text='Open Scenarios', command=self._open_scenarios).grid(row=9, column=0,
+                                                                                                    sticky=tk.W, pady=4)
+        tk.Button(numerical_inputs_frame, text='Cancel', command=self._cancel_data).grid(row=10, column=0,
+                                                                                         sticky=tk.W, pady=4)
+        tk.Label(numerical_inputs_frame, textvariable=self.__status).grid(row=11, column=0, columnspan=2, sticky=tk.W)
+
+    def _save_scenarios(self):
+        if self.market_data_service is not None:
+            file_path = filedialog.asksaveasfilename(defaultextension='.cube', filetypes=[('Scenario cube', '*.cube')])
+            if file_path:
+                self.market_data_service.save(file_path=file_path)
+
+    def _open_scenarios(self):
+        # scenarios still being generated would replace the ones opened
+        self.__job_scheduler.cancel()
+        file_path = filedialog.askopenfilename(filetypes=[('Scenario cube', '*.cube')])
+        if file_path:
+            # the scenarios are memory mapped, so they are read from the file as they are valued
+            self.market_data_service = open_market_data_service(file_path)
 
     def _show_data(self):
         __starting_point = float(self.__starting_point.get())
@@ -81,38 +107,114 @@ class MarketScenarios:
             end_date=__end_date)
 
         central_path = Path(path_cumulative_data_frame=path)
-        path_to_correlate_with = (
-            VolatilePath(volatility=__volatility, number_of_paths=__number_of_scenarios, central_path=central_path))
-
-        cum_values = pd.concat([central_path.get_cumulative_path(
-            start_value=__starting_point),
-            path_to_correlate_with.get_cumulative_path(start_value=__starting_point)], axis=1)
-
-        fig = Figure(figsize=(5, 4), dpi=100)  # create the figure
-        ax = fig.add_subplot(111)  # create the subplot
-        cum_values.plot(ax=ax)
-
-        graph_1 = FigureCanvasTkAgg(fig, master=self.__graph_frame)
-        graph_1.get_tk_widget().grid(row=1, column=4)
-        graph_1.draw()
+        # the scenarios are generated on a worker thread, and the first scenarios are drawn while the rest are made
+        self.__job_scheduler.submit(
+            steps=lambda: generate_market_scenarios(
+                central_path=central_path,
+                volatility=__volatility,
+                number_of_scenarios=__number_of_scenarios,
+                starting_point=__starting_point,
+                start_date=__start_date,
+                end_date=__end_date),
+            on_progress=self._show_progress,
+            on_done=self._set_market_data_service,
+            on_error=lambda error: self.__status.set('Scenario generation failed: {}'.format(error)),
+            on_cancel=lambda: self.__status.set('Scenario generation cancelled'))
+
+    def _cancel_data(self):
+        self.__job_scheduler.cancel()
+
+    def _show_progress(self, progress):
+        """
+        Draws the central path and the scenarios generated so far.
 
-        if not path_to_correlate_with.get_path_dataframe().empty:
+        :param progress: tuple of the cumulative values to draw and the market data service, which is None until every
+            scenario is generated
+        :return: none
+        """
+        cum_values, market_data_service = progress
+        number_generated = cum_values.shape[1] - 1
+        if market_data_service is None:
+            self.__status.set('Generated {} scenarios'.format(number_generated))
+        else:
+            self.__status.set('Generated all {} scenarios'.format(number_generated))
+
+        if self.__scenario_chart is None:
+            # matplotlib and its Tk backend are only loaded once there is a chart to show
+            from front_end.scenario_chart import ScenarioChart
+            self.__scenario_chart = ScenarioChart(self.__graph_frame)
+            self.__scenario_chart.get_tk_widget().grid(row=1, column=4)
+        self.__scenario_chart.show_paths(
+            dates=cum_values.index,
+            values=cum_values.iloc[:, 1:].to_numpy(),
+            central_values=cum_values.iloc[:, 0].to_numpy())
+
+    def _set_market_data_service(self, progress):
+        if progress is not None and progress[1] is not None:
             # Market Data service is public so that it can be accessed by portfolio results.
-            self.market_data_service = MarketDataService()
-            self.market_data_service.add_market_data_from_path(
-                path_data_frame=path_to_correlate_with.get_cumulative_path(start_value=100),
-                market_id=PriceId(security_id=1))
-
-            implied_vol_path = (LinearPath(daily_value=__volatility, start_date=__start_date, end_date=__end_date)
-                                .repeat_scenarios(__number_of_scenarios))
-
-            self.market_data_service.add_market_data_from_path(
-                path_data_frame=implied_vol_path.get_path_dataframe(),
-                market_id=VolatilityId(security_id=1))
+            self.market_data_service = progress[1]
 
-            risk_free_path = (LinearPath(daily_value=0.04, start_date=__start_date, end_date=__end_date)
-                              .repeat_scenarios(__number_of_scenarios))
 
-            self.market_data_service.add_market_data_from_path(
-                path_data_frame=risk_free_path.get_path_dataframe(),
-                market_id=RiskFreeRateId(security_id=1))
+def generate_market_scenarios(*, central_path, volatility, number_of_scenarios, starting_point, start_date, end_date,
+                              chunk_size=SCENARIO_CHUNK_SIZE):
+    """
+    Generates volatile scenarios around a central path a chunk of scenarios at a time, for running on a worker thread.
+
+    After each chunk the cumulative values of the central path and the scenarios generated so far are yielded, with
+    None in place of the market data service. Once every scenario is generated the market data service holding the
+    prices, implied volatilities and risk free rates of the scenarios is yielded with them.
+
+    Parameters
+    ----------
+    central_path: Path
+    volatility: float
+    number_of_scenarios: int
+    starting_point: float, the value the cumulative values drawn start from
+    start_date: datetime
+    end_date: datetime
+    chunk_size: int, number of scenarios in each chunk
+
+    Yields tuple of DataFrame and MarketDataService or None
+    -------
+    """
+    central_path_data_frame = central_path.get_path_dataframe()
+    dates = central_path_data_frame.index
+    returns_generator = ReturnsGenerator(
+        central_returns=central_path_data_frame.iloc[:, 0].to_numpy(),
+        volatility=volatility)
+
+    # each chunk is written once into its own columns, so the values yielded so far are views rather than copies
+    cum_values = np.empty((len(dates), number_of_scenarios + 1))
+    cum_values[:, 0] = central_path.get_cumulative_path(start_value=starting_point).iloc[:, 0].to_numpy()
+    number_generated = 0
+    prices = []
+    for returns in returns_generator.generate_chunks(number_of_paths=number_of_scenarios, chunk_size=chunk_size):
+        scenario_path = Path(path_dataframe=pd.DataFrame(returns, index=dates))
+        chunk_columns = slice(number_generated + 1, number_generated + 1 + returns.shape[1])
+        cum_values[:, chunk_columns] = scenario_path.get_cumulative_path(start_value=starting_point).to_numpy()
+        prices.append(scenario_path.get_cumulative_path(start_value=100))
+        number_generated += returns.shape[1]
+        if number_generated < number_of_scenarios:
+            yield pd.DataFrame(cum_values[:, :number_generated + 1], index=dates, copy=False), None
+
+    market_data_service = None
+    if number_of_scenarios > 0:
+        market_data_service = MarketDataService()
+        market_data_service.add_market_data_from_path(
+            path_data_frame=pd.concat(prices, axis=1, ignore_index=True),
+            market_id=PriceId(security_id=1))
+
+        implied_vol_path = (LinearPath(daily_value=volatility, start_date=start_date, end_date=end_date)
+                            .repeat_scenarios(number_of_scenarios))
+
+        market_data_service.add_market_data_from_path(
+            path_data_frame=implied_vol_path.get_path_dataframe(),
+            market_id=VolatilityId(security_id=1))
+
+        risk_free_path = (LinearPath(daily_value=0.04, start_date=start_date, end_date=end_date)
+                          .repeat_scenarios(number_of_scenarios))
+
+        market_data_service.add_market_data_from_path(
+            path_data_frame=risk_free_path.get_path_dataframe(),
+            market_id=RiskFreeRateId(security_id=1))
+    yield pd.DataFrame(cum_values, index=dates, copy=False), market_data_service
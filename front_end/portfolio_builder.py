@@ -21,6 +21,7 @@ class PortfolioBuilder:
 
         # self.portfolio is public so that it can be accessed by Portfolio Results.
         self.portfolio = Portfolio()
+        self.__position_labels = []
 
         inputs_frame = tk.Frame(frame)
         self._show_portfolio_screen = tk.Frame(frame)
@@ -50,28 +51,45 @@ class PortfolioBuilder:
 
         tk.Button(inputs_frame, text='Exit', command=frame.quit).grid(row=6, column=0, sticky=tk.W, pady=4)
         tk.Button(inputs_frame, text='Add Item', command=self._add_position).grid(row=7, column=0, sticky=tk.W, pady=4)
-        tk.Button(inputs_frame, text='Delete Portfolio', command=self._delete_portfolio).grid(row=8, column=0,
+        tk.Button(inputs_frame, text='Remove Item', command=self._remove_position).grid(row=8, column=0, sticky=tk.W,
+                                                                                        pady=4)
+        tk.Button(inputs_frame, text='Delete Portfolio', command=self._delete_portfolio).grid(row=9, column=0,
                                                                                               sticky=tk.W, pady=4)
 
-    def _add_position(self):
+    def _get_position(self):
         type_of_position = str(self.__type_of_position.get())
         number = float(self.__quantity.get())
         strike = float(self.__strike.get())
 
         if type_of_position == "common stock":
-            self.portfolio.add_position(position=common_stock.CommonStock(security_id=1, quantity=number))
-            tk.Label(self._show_portfolio_screen, text=str(number) + type_of_position).pack()
-        else:
-            self.portfolio.add_position(position=option.Option(
-                security_id=1,
-                quantity=number,
-                expiry=datetime.datetime(2025, 1, 15, 0, 0),
-                strike=strike,
-                option_type=type_of_position))
-            tk.Label(self._show_portfolio_screen,
-                     text=str(number) + type_of_position + ", strike=" + str(strike)).pack()
+            return (common_stock.CommonStock(security_id=1, quantity=number),
+                    str(number) + type_of_position)
+        return (option.Option(
+            security_id=1,
+            quantity=number,
+            expiry=datetime.datetime(2025, 1, 15, 0, 0),
+            strike=strike,
+            option_type=type_of_position),
+            str(number) + type_of_position + ", strike=" + str(strike))
+
+    def _add_position(self):
+        position, description = self._get_position()
+        self.portfolio.add_position(position=position)
+        label = tk.Label(self._show_portfolio_screen, text=description)
+        label.pack()
+        self.__position_labels.append((position, label))
+
+    def _remove_position(self):
+        position, _ = self._get_position()
+        for index, (held_position, label) in enumerate(self.__position_labels):
+            if held_position == position:
+                self.portfolio.remove_position(position=position)
+                label.destroy()
+                del self.__position_labels[index]
+                return
 
     def _delete_portfolio(self):
         for widget in self._show_portfolio_screen.winfo_children():
             widget.destroy()
         self.portfolio = Portfolio()
+        self.__position_labels = []
@@ -1,11 +1,12 @@
 import tkinter as tk
-from statistics import mean
 
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+from front_end.job_scheduler import JobScheduler
+from portfolio.portfolio import Portfolio
+from valuation.valuation_cache import ValuationCache
 
-from valuation.portfolio_valuation import PortfolioValuation
-from valuation.scenario_valuation import ScenarioValuation
+FAN_CHART_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+RESULT_LABELS = ('Mean Sharpe Ratio', 'Sharpe Ratio 5%', 'Sharpe Ratio 95%', '95% Value at Risk',
+                 '95% Expected Shortfall')
 
 
 class PortfolioResults:
@@ -25,26 +26,76 @@ class PortfolioResults:
         self.__market_scenarios = market_scenarios
         self.__portfolio_builder = portfolio_builder
         self.__frame = frame
+        self.__valuation_cache = ValuationCache()
+        self.__job_scheduler = JobScheduler(frame)
+        self.__scenario_chart = None
+        self.__status = tk.StringVar(frame, value='')
+        self.__result_values = [tk.StringVar(frame, value='') for _ in RESULT_LABELS]
+        for row, (label, value) in enumerate(zip(RESULT_LABELS, self.__result_values)):
+            tk.Label(frame, text=label).grid(row=row, column=1)
+            tk.Label(frame, textvariable=value).grid(row=row, column=2)
         tk.Button(frame, text='Exit', command=frame.quit).grid(row=1, column=0, sticky=tk.W, pady=4)
         tk.Button(frame, text='Show', command=self._show_results).grid(row=0, column=0, sticky=tk.W, pady=4)
+        tk.Button(frame, text='Cancel', command=self._cancel_results).grid(row=2, column=0, sticky=tk.W, pady=4)
+        tk.Label(frame, textvariable=self.__status).grid(row=3, column=0, sticky=tk.W)
 
     def _show_results(self):
         market_data_service = self.__market_scenarios.market_data_service
         if market_data_service is not None:
-            portfolio_valuation = ScenarioValuation(
-                portfolio=self.__portfolio_builder.portfolio,
-                market_data_service=market_data_service
-            )
-            scenario_1_valuation = portfolio_valuation.get_all_portfolio_valuations()
-            fig = Figure(figsize=(5, 4), dpi=100)  # create the figure
-            ax = fig.add_subplot(111)  # create the subplot
-            scenario_1_valuation.plot(ax=ax)
-
-            graph_1 = FigureCanvasTkAgg(fig, master=self.__frame)
-            graph_1.get_tk_widget().grid(row=2, column=0)
-            graph_1.draw()
-
-            mean_sharpe_ratio = mean(portfolio_valuation.get_all_sharpe_ratios_max_period())
-            tk.Label(self.__frame, text='Mean Sharpe Ratio').grid(row=0, column=1)
-            tk.Label(self.__frame, text=str(mean_sharpe_ratio)).grid(row=0, column=2)
+            # the positions are copied as the builder may change its portfolio while the valuation runs
+            portfolio = Portfolio()
+            for position in self.__portfolio_builder.portfolio.get_positions():
+                portfolio.add_position(position=position)
+            # the valuation runs on a worker thread, and the chart is drawn from the first scenarios while the rest
+            # are valued
+            self.__job_scheduler.submit(
+                steps=lambda: self.__valuation_cache.get_scenario_valuation_in_chunks(
+                    portfolio=portfolio,
+                    market_data_service=market_data_service),
+                on_progress=self._show_progress,
+                on_error=lambda error: self.__status.set('Valuation failed: {}'.format(error)),
+                on_cancel=lambda: self.__status.set('Valuation cancelled'))
 
+    def _cancel_results(self):
+        self.__job_scheduler.cancel()
+
+    def _show_progress(self, progress):
+        """
+        Draws the statistics of the scenarios valued so far.
+
+        :param progress: ValuationProgress
+        :return: none
+        """
+        if progress.is_complete():
+            self.__status.set('Valued {} scenarios'.format(progress.get_number_of_scenarios()))
+        else:
+            self.__status.set('Valued {} of {} scenarios'.format(
+                progress.get_number_valued(), progress.get_number_of_scenarios()))
+
+        scenario_statistics = progress.get_scenario_statistics()
+        dates = progress.get_dates()
+        quantiles = scenario_statistics.get_quantiles(FAN_CHART_QUANTILES)
+        if self.__scenario_chart is None:
+            # matplotlib and its Tk backend are only loaded once there is a chart to show
+            from front_end.scenario_chart import ScenarioChart
+            self.__scenario_chart = ScenarioChart(self.__frame)
+            self.__scenario_chart.get_tk_widget().grid(row=5, column=0, columnspan=3)
+        # fan chart of the outer and inner percentile bands around the median
+        self.__scenario_chart.show_bands(
+            dates=dates,
+            lower=quantiles[:, 0],
+            upper=quantiles[:, 4],
+            inner_lower=quantiles[:, 1],
+            inner_upper=quantiles[:, 3],
+            median=quantiles[:, 2],
+            mean=scenario_statistics.get_mean())
+
+        sharpe_ratio_quantiles = scenario_statistics.get_sharpe_ratio_quantiles([0.05, 0.95])
+        results = (
+            scenario_statistics.get_sharpe_ratio_mean(),
+            sharpe_ratio_quantiles[0],
+            sharpe_ratio_quantiles[1],
+            scenario_statistics.get_value_at_risk()[-1],
+            scenario_statistics.get_expected_shortfall()[-1])
+        for result_value, value in zip(self.__result_values, results):
+            result_value.set('{:.4f}'.format(value))
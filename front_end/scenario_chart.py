@@ -0,0 +1,222 @@
+import numpy as np
+from matplotlib import dates as mdates
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+
+MAX_DRAWN_PATHS = 500
+LIMIT_MARGIN = 0.05
+
+
+def get_buckets(number_of_points, width):
+    """
+    Splits point positions into at most width buckets of equal size, the last bucket padded with the last position.
+
+    Parameters
+    ----------
+    number_of_points: int
+    width: int, number of buckets, such as the pixel width of the axes
+
+    Returns ndarray of int shaped (bucket, position in bucket)
+    -------
+    """
+    bucket_size = -(-number_of_points // max(width, 1))
+    number_of_buckets = -(-number_of_points // bucket_size)
+    positions = np.arange(number_of_buckets * bucket_size).reshape(number_of_buckets, bucket_size)
+    return np.minimum(positions, number_of_points - 1)
+
+
+def downsample_paths(values, *, width):
+    """
+    Gets the positions of the points of each path to draw so that no more than about two points fall in each pixel.
+
+    The lowest and highest point of each path in each pixel are kept in date order, so spikes stay visible, and the
+    first and last points are always kept.
+
+    Parameters
+    ----------
+    values: ndarray shaped (date, path)
+    width: int, the pixel width of the axes
+
+    Returns ndarray of int shaped (point, path), the date positions to draw for each path
+    -------
+    """
+    number_of_dates, number_of_paths = values.shape
+    if number_of_dates <= 2 * width:
+        return np.broadcast_to(np.arange(number_of_dates).reshape(-1, 1), values.shape)
+
+    buckets = get_buckets(number_of_dates, width)
+    bucket_values = values[buckets]
+    lowest = np.take_along_axis(buckets[..., np.newaxis], np.nanargmin(bucket_values, axis=1)[:, np.newaxis], axis=1)
+    highest = np.take_along_axis(buckets[..., np.newaxis], np.nanargmax(bucket_values, axis=1)[:, np.newaxis], axis=1)
+    # each pixel holds its low and high point in date order
+    points = np.sort(np.concatenate((lowest, highest), axis=1), axis=1).reshape(-1, number_of_paths)
+    ends = np.full((1, number_of_paths), number_of_dates - 1)
+    return np.concatenate((np.zeros((1, number_of_paths), dtype=points.dtype), points, ends))
+
+
+class ScenarioChart:
+    """ Scenario Chart Class
+    A single reused canvas which draws a fan of scenario paths as one line collection, or percentile bands of the
+    scenarios, for any number of scenarios.
+
+    Repeated updates, such as the first scenarios while the rest are found, only redraw the changed artists over a
+    saved background by blitting. The axes are redrawn in full only when the data leaves the axis limits.
+    """
+
+    def __init__(self, master, *, figsize=(5, 4), dpi=100):
+        """
+        Initialize the Scenario Chart Class.
+
+        Parameters
+        ----------
+        master: the tkinter widget holding the canvas
+        figsize: tuple of the width and height in inches
+        dpi: int
+        """
+        self.__figure = Figure(figsize=figsize, dpi=dpi)
+        self.__axes = self.__figure.add_subplot(111)
+        self.__canvas = FigureCanvasTkAgg(self.__figure, master=master)
+        self.__canvas.mpl_connect('draw_event', self.__on_draw)
+        self.__background = None
+        self.__kind = None
+        self.__artists = ()
+
+    def get_tk_widget(self):
+        return self.__canvas.get_tk_widget()
+
+    def show_paths(self, *, dates, values, central_values=None):
+        """
+        Draws scenario paths, with the central path on top if given.
+
+        At most MAX_DRAWN_PATHS evenly spaced scenarios are drawn, each downsampled to the pixel width of the axes.
+
+        Parameters
+        ----------
+        dates: sequence of datetime
+        values: array like shaped (date, scenario)
+        central_values: optional array like shaped (date,)
+
+        Returns none
+        -------
+        """
+        x = mdates.date2num(dates)
+        values = np.asarray(values, dtype=np.float64).reshape(len(x), -1)
+        if values.shape[1] > MAX_DRAWN_PATHS:
+            values = values[:, np.linspace(0, values.shape[1] - 1, MAX_DRAWN_PATHS).astype(int)]
+
+        if self.__kind != 'paths':
+            self.__axes.clear()
+            paths = LineCollection([], color='tab:blue', linewidths=0.8, animated=True)
+            self.__axes.add_collection(paths)
+            central, = self.__axes.plot([], [], color='black', linewidth=1.5, animated=True)
+            self.__set_artists('paths', (paths, central))
+        paths, central = self.__artists
+
+        points = downsample_paths(values, width=self.__get_pixel_width())
+        drawn_values = np.take_along_axis(values, points, axis=0)
+        paths.set_segments(np.stack((x[points], drawn_values), axis=-1).transpose(1, 0, 2))
+        paths.set_alpha(min(1.0, max(0.05, 20 / max(values.shape[1], 1))))
+        y_low, y_high = np.nanmin(drawn_values), np.nanmax(drawn_values)
+        if central_values is None:
+            central.set_data([], [])
+        else:
+            central_values = np.asarray(central_values, dtype=np.float64)
+            central.set_data(x, central_values)
+            y_low, y_high = min(y_low, np.nanmin(central_values)), max(y_high, np.nanmax(central_values))
+        self.__render(x=x, y_low=y_low, y_high=y_high)
+
+    def show_bands(self, *, dates, lower, upper, inner_lower, inner_upper, median, mean):
+        """
+        Draws a fan chart of an outer and inner percentile band, with the median and the mean.
+
+        When there are more dates than pixels, each pixel holds the widest band and the average lines of its dates.
+
+        Parameters
+        ----------
+        dates: sequence of datetime
+        lower: array like shaped (date,), the lower bound of the outer band
+        upper: array like shaped (date,), the upper bound of the outer band
+        inner_lower: array like shaped (date,)
+        inner_upper: array like shaped (date,)
+        median: array like shaped (date,)
+        mean: array like shaped (date,)
+
+        Returns none
+        -------
+        """
+        x = mdates.date2num(dates)
+        if self.__kind != 'bands':
+            self.__axes.clear()
+            outer = PolyCollection([], alpha=0.25, color='tab:blue', label='5% - 95%', animated=True)
+            inner = PolyCollection([], alpha=0.45, color='tab:blue', label='25% - 75%', animated=True)
+            self.__axes.add_collection(outer)
+            self.__axes.add_collection(inner)
+            median_line, = self.__axes.plot([], [], color='tab:blue', label='median', animated=True)
+            mean_line, = self.__axes.plot([], [], color='black', linestyle='--', label='mean', animated=True)
+            self.__axes.legend(loc='upper left')
+            self.__set_artists('bands', (outer, inner, median_line, mean_line))
+        outer, inner, median_line, mean_line = self.__artists
+
+        if len(x) > 2 * self.__get_pixel_width():
+            buckets = get_buckets(len(x), self.__get_pixel_width())
+            x = x[buckets[:, 0]]
+            lower, inner_lower = (np.nanmin(np.asarray(band)[buckets], axis=1) for band in (lower, inner_lower))
+            upper, inner_upper = (np.nanmax(np.asarray(band)[buckets], axis=1) for band in (upper, inner_upper))
+            median, mean = (np.nanmean(np.asarray(line)[buckets], axis=1) for line in (median, mean))
+        outer.set_verts([np.concatenate((np.column_stack((x, lower)), np.column_stack((x, upper))[::-1]))])
+        inner.set_verts([np.concatenate((np.column_stack((x, inner_lower)), np.column_stack((x, inner_upper))[::-1]))])
+        median_line.set_data(x, median)
+        mean_line.set_data(x, mean)
+        self.__render(x=x, y_low=np.nanmin(lower), y_high=np.nanmax(upper))
+
+    def __set_artists(self, kind, artists):
+        self.__kind = kind
+        self.__artists = artists
+        self.__axes.xaxis_date()
+        self.__figure.autofmt_xdate()
+        self.__background = None
+
+    def __get_pixel_width(self):
+        return max(int(self.__axes.bbox.width), 1)
+
+    def __render(self, *, x, y_low, y_high):
+        """
+        Draws the artists over the saved background, redrawing the whole figure first if the limits must change.
+        """
+        if self.__update_limits(x_low=x[0], x_high=x[-1], y_low=y_low, y_high=y_high) or self.__background is None:
+            # the draw event saves the new background and draws the artists over it
+            self.__canvas.draw()
+        else:
+            self.__canvas.restore_region(self.__background)
+            self.__draw_artists()
+        self.__canvas.blit(self.__figure.bbox)
+        self.__canvas.flush_events()
+
+    def __update_limits(self, *, x_low, x_high, y_low, y_high):
+        """
+        Sets new axis limits if the data is outside the current limits or fills less than half of them.
+
+        :return: bool, True if the limits changed
+        """
+        if not np.isfinite([y_low, y_high]).all():
+            return False
+        current_x = self.__axes.get_xlim()
+        current_y = self.__axes.get_ylim()
+        margin = max(y_high - y_low, abs(y_high) * LIMIT_MARGIN, 1e-12) * LIMIT_MARGIN
+        fits = (current_y[0] <= y_low and y_high <= current_y[1]
+                and 2 * (y_high - y_low + 2 * margin) >= current_y[1] - current_y[0]
+                and current_x == (x_low, x_high))
+        if fits:
+            return False
+        self.__axes.set_xlim(x_low, x_high)
+        self.__axes.set_ylim(y_low - margin, y_high + margin)
+        return True
+
+    def __draw_artists(self):
+        for artist in self.__artists:
+            self.__axes.draw_artist(artist)
+
+    def __on_draw(self, event):
+        self.__background = self.__canvas.copy_from_bbox(self.__figure.bbox)
+        self.__draw_artists()
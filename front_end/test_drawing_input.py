@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from front_end.drawing_input import resample_drawing, stretch_and_translate
+
+BASELINE = 100
+
+
+def to_canvas(xs, values):
+    """
+    Gets the canvas coordinates x0, y0, x1, y1, ... of values drawn at canvas x positions.
+    """
+    return np.column_stack((xs, BASELINE - np.asarray(values, dtype=np.float64))).ravel()
+
+
+class TestDrawingInput(unittest.TestCase):
+    """
+    Test Class for the resampling and scaling of lines drawn on the canvas.
+    """
+
+    def test_resample_drawing(self):
+        points = to_canvas([0, 1, 2, 3, 4], [0, 2, 4, 6, 8])
+
+        # Check that the evenly spaced values after the start of the line are interpolated up to its last point.
+        np.testing.assert_allclose(resample_drawing(points, number_of_points=4, baseline=BASELINE), [2, 4, 6, 8])
+        np.testing.assert_allclose(resample_drawing(points, number_of_points=8, baseline=BASELINE),
+                                   np.arange(1, 9))
+
+    def test_resample_repeated_and_unsorted_points(self):
+        # Check that where the line doubles back the first point drawn at each x is kept.
+        doubled_back = to_canvas([0, 1, 1, 2], [0, 10, 50, 20])
+        np.testing.assert_allclose(resample_drawing(doubled_back, number_of_points=2, baseline=BASELINE), [10, 20])
+
+        # Check that a line drawn from right to left is resampled from left to right.
+        right_to_left = to_canvas([4, 2, 0], [8, 4, 0])
+        np.testing.assert_allclose(resample_drawing(right_to_left, number_of_points=4, baseline=BASELINE),
+                                   [2, 4, 6, 8])
+
+        # Check that a single point gives a flat line and that no points cannot be resampled.
+        np.testing.assert_allclose(resample_drawing(to_canvas([3], [7]), number_of_points=3, baseline=BASELINE),
+                                   [7, 7, 7])
+        with self.assertRaises(ValueError):
+            resample_drawing([], number_of_points=3)
+
+    def test_stretch_and_translate(self):
+        values = np.array([0.0, 5.0, -2.0, 3.0])
+        stretched = stretch_and_translate(values, target_start=10, target_peak=20, target_trough=6)
+
+        # Check that the line starts at the target and its peak and trough reach their targets.
+        np.testing.assert_allclose(stretched, [10, 20, 6, 16])
+        self.assertEqual(stretched[0], 10)
+        self.assertEqual(stretched.max(), 20)
+        self.assertEqual(stretched.min(), 6)
+
+        # Check that a flat line stays flat at the target start.
+        np.testing.assert_allclose(
+            stretch_and_translate(np.full(3, 4.0), target_start=1, target_peak=2, target_trough=0), [1, 1, 1])
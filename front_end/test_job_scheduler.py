@@ -0,0 +1,138 @@
+import threading
+import unittest
+
+from front_end.job_scheduler import BackgroundJob, JobScheduler
+
+TIMEOUT = 5
+
+
+class ManualWidget:
+    """
+    Stands in for a Tk widget, holding the callbacks given to after() until they are run by the test.
+    """
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, delay, callback, *args):
+        self.pending.append((callback, args))
+
+    def run_pending(self):
+        pending, self.pending = self.pending, []
+        for callback, args in pending:
+            callback(*args)
+
+
+def blocking_steps(release, closed):
+    """
+    Yields once, then waits for the release event before yielding again, noting when the generator is closed.
+    """
+    try:
+        yield 1
+        release.wait(TIMEOUT)
+        yield 2
+        yield 3
+    finally:
+        closed.set()
+
+
+def failing_steps():
+    yield 1
+    raise RuntimeError("failed")
+
+
+class TestJobScheduler(unittest.TestCase):
+    """
+    Test Class for the Background Job and Job Scheduler Classes, driven without a display.
+    """
+
+    def test_background_job(self):
+        job = BackgroundJob(steps=lambda: (value for value in range(5)))
+        job.start()
+        job.join(TIMEOUT)
+
+        # Check that every update is passed on in order once the job has finished.
+        self.assertTrue(job.is_finished())
+        self.assertIsNone(job.get_error())
+        self.assertEqual(job.get_updates(), [0, 1, 2, 3, 4])
+        self.assertEqual(job.get_updates(), [])
+
+    def test_cancel_background_job(self):
+        release = threading.Event()
+        closed = threading.Event()
+        job = BackgroundJob(steps=lambda: blocking_steps(release, closed))
+        job.start()
+        job.cancel()
+        release.set()
+        job.join(TIMEOUT)
+
+        # Check that a cancelled job stops at the next update and closes its generator.
+        self.assertTrue(job.is_cancelled())
+        self.assertTrue(job.is_finished())
+        self.assertTrue(closed.is_set())
+        self.assertLessEqual(len(job.get_updates()), 1)
+
+    def test_background_job_error(self):
+        job = BackgroundJob(steps=failing_steps)
+        job.start()
+        job.join(TIMEOUT)
+
+        # Check that the error raised by the generator is kept after the updates before it.
+        self.assertTrue(job.is_finished())
+        self.assertIsInstance(job.get_error(), RuntimeError)
+        self.assertEqual(job.get_updates(), [1])
+
+    def test_scheduler_shows_latest_update(self):
+        widget = ManualWidget()
+        progress, done = [], []
+        scheduler = JobScheduler(widget)
+        job = scheduler.submit(steps=lambda: (value for value in (1, 2, 3)), on_progress=progress.append,
+                               on_done=done.append)
+        job.join(TIMEOUT)
+        widget.run_pending()
+
+        # Check that only the latest update is shown, then the job is done with it.
+        self.assertEqual(progress, [3])
+        self.assertEqual(done, [3])
+        self.assertFalse(scheduler.is_running())
+        self.assertEqual(widget.pending, [])
+
+    def test_scheduler_cancel(self):
+        widget = ManualWidget()
+        progress, cancelled = [], []
+        release = threading.Event()
+        closed = threading.Event()
+        scheduler = JobScheduler(widget)
+        job = scheduler.submit(steps=lambda: blocking_steps(release, closed), on_progress=progress.append,
+                               on_cancel=lambda: cancelled.append(True))
+        scheduler.cancel()
+        release.set()
+        job.join(TIMEOUT)
+        widget.run_pending()
+
+        # Check that a cancelled job calls on_cancel once and shows no more updates.
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(progress, [])
+        self.assertFalse(scheduler.is_running())
+        self.assertTrue(closed.is_set())
+
+    def test_scheduler_error(self):
+        widget = ManualWidget()
+        progress, errors, done = [], [], []
+        scheduler = JobScheduler(widget)
+        job = scheduler.submit(steps=failing_steps, on_progress=progress.append, on_done=done.append,
+                               on_error=errors.append)
+        job.join(TIMEOUT)
+        widget.run_pending()
+
+        # Check that the updates before the error are shown and the error is passed to on_error rather than on_done.
+        self.assertEqual(progress, [1])
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], RuntimeError)
+        self.assertEqual(done, [])
+
+        # Check that without on_error the error is raised on the main thread.
+        job = scheduler.submit(steps=failing_steps, on_progress=progress.append)
+        job.join(TIMEOUT)
+        with self.assertRaises(RuntimeError):
+            widget.run_pending()
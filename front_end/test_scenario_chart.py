@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+
+from front_end.scenario_chart import downsample_paths, get_buckets
+
+
+class TestScenarioChart(unittest.TestCase):
+    """
+    Test Class for the downsampling of scenario paths to the pixel width of a chart.
+    """
+
+    def test_get_buckets(self):
+        for number_of_points, width in ((10, 3), (12, 4), (1000, 7), (5, 10), (1, 1)):
+            buckets = get_buckets(number_of_points, width)
+
+            # Check that there are at most width buckets and together they cover every date in order.
+            self.assertLessEqual(len(buckets), width)
+            np.testing.assert_array_equal(np.unique(buckets), np.arange(number_of_points))
+            self.assertTrue((np.diff(buckets.ravel()) >= 0).all())
+            self.assertEqual(buckets[0, 0], 0)
+            self.assertEqual(buckets[-1, -1], number_of_points - 1)
+
+    def test_downsample_paths(self):
+        values = np.random.default_rng(3).standard_normal((1000, 4)).cumsum(axis=0)
+        values[517, 2] = 1e6
+        width = 50
+        points = downsample_paths(values, width=width)
+        drawn_values = np.take_along_axis(values, points, axis=0)
+
+        # Check that about two points are drawn for each pixel, in date order from the first to the last date.
+        self.assertLessEqual(len(points), 2 * width + 2)
+        self.assertTrue((np.diff(points, axis=0) >= 0).all())
+        np.testing.assert_array_equal(points[0], 0)
+        np.testing.assert_array_equal(points[-1], len(values) - 1)
+
+        # Check that the extremes of each path in each pixel are drawn, so spikes stay visible.
+        for bucket in get_buckets(len(values), width):
+            for path in range(values.shape[1]):
+                drawn = values[points[:, path], path]
+                self.assertIn(values[bucket, path].min(), drawn)
+                self.assertIn(values[bucket, path].max(), drawn)
+        np.testing.assert_array_equal(drawn_values.max(axis=0), values.max(axis=0))
+        np.testing.assert_array_equal(drawn_values.min(axis=0), values.min(axis=0))
+        self.assertEqual(drawn_values[:, 2].max(), 1e6)
+
+    def test_short_paths_are_not_downsampled(self):
+        values = np.arange(12.0).reshape(6, 2)
+
+        # Check that every date is drawn when there are no more than two dates for each pixel.
+        every_date = np.repeat(np.arange(6).reshape(-1, 1), 2, axis=1)
+        np.testing.assert_array_equal(downsample_paths(values, width=3), every_date)
@@ -1,19 +1,29 @@
-import copy
+from types import MappingProxyType
+
+import numpy as np
+
+from marketData.market_id import market_id_registry
 
 
 class MarketData:
     """Market Data Class
     Holds all market data for a specific date
+
+    Values are held as read only arrays, so they are returned without copying. They are keyed by the registry index
+    of their market id.
     """
 
-    def __init__(self, *, date):
+    __slots__ = ('__date', '__market_data')
+
+    def __init__(self, *, date, market_data=None):
         """
         Initialize Market Data Class for give date
 
         :param date: datetime
+        :param market_data: optional dict of market id registry index to read only scenario values, not copied
         """
-        self.__date = copy.deepcopy(date)
-        self.__market_data = {}
+        self.__date = date
+        self.__market_data = {} if market_data is None else market_data
 
     def add_market_data(self, *, key, value):
         """
@@ -25,7 +35,9 @@ class MarketData:
         """
 
         if [isinstance(v, key.instance_type) for v in value]:
-            self.__market_data[copy.deepcopy(key)] = copy.deepcopy(value)
+            values = np.array(value, dtype=np.float64)
+            values.flags.writeable = False
+            self.__market_data[key.get_index()] = values
         else:
             raise ValueError("Value {} is not instance type {}".format(value, key.instance_type))
 
@@ -50,8 +62,7 @@ class MarketData:
         :param market_id: MarketId
         :return: any
         """
-        data = copy.deepcopy(self.__market_data[market_id][scenario_number])
-        return data
+        return self.__market_data[market_id.get_index()][scenario_number]
 
     def get_number_scenarios(self, *, market_id):
         """
@@ -65,16 +76,17 @@ class MarketData:
         -------
 
         """
-        data = self.__market_data[market_id]
+        data = self.__market_data[market_id.get_index()]
         return len(data)
 
     def get_all_market_data(self):
         """
-        Gets all market data
+        Gets a read only view of all market data
 
-        :return: MarketData
+        :return: mapping of MarketId to read only values
         """
-        return copy.deepcopy(self.__market_data)
+        return MappingProxyType({market_id_registry.get_market_id(market_index): values
+                                 for market_index, values in self.__market_data.items()})
 
     def get_date(self):
         """
@@ -82,4 +94,4 @@ class MarketData:
 
         :return: datetime
         """
-        return copy.deepcopy(self.__date)
+        return self.__date
@@ -1,20 +1,21 @@
-import copy
-
 import pandas as pd
 
 from marketData.market_data import MarketData
+from marketData.scenario_cube import ScenarioCube, open_scenario_cube, save_scenario_cube
 
 
 class MarketDataService:
     """ Market Data Service Class
-    Holds market data for each date.
+    Holds market data for each date in a dense scenario cube shaped (market id, date, scenario).
     """
 
-    def __init__(self):
+    def __init__(self, *, scenario_cube=None):
         """
         Initialize Market Data Service class.
+
+        :param scenario_cube: optional ScenarioCube to serve market data from, an empty one is made if not given
         """
-        self.__date_to_market_data = {}
+        self.__scenario_cube = ScenarioCube() if scenario_cube is None else scenario_cube
 
     def add_market_data(self, *, market_data):
         """
@@ -25,29 +26,82 @@ class MarketDataService:
         """
         if isinstance(market_data, MarketData):
             date = market_data.get_date()
-            if date in self.__date_to_market_data:
-                existing_market_data = self.__date_to_market_data[date]
-                existing_market_data.add_all_market_data(market_data=market_data)
-            else:
-                self.__date_to_market_data[date] = market_data
+            all_market_data = market_data.get_all_market_data()
+            for market_id in all_market_data:
+                self.__scenario_cube.add_values(
+                    market_id=market_id,
+                    dates=[date],
+                    values=[all_market_data[market_id]])
         else:
-            raise ValueError("")
+            raise ValueError("Must be of type {} but was {}".format(MarketData, market_data))
 
     def add_market_data_from_path(self, *, path_data_frame, market_id):
         """
-        Adds the market data from a path generator.
+        Adds the market data from a path generator in a single bulk operation.
 
-        :param path_data_frame: Path
+        :param path_data_frame: DataFrame of date to scenario values
         :param market_id: MarketId
         :return: none
         """
         if isinstance(path_data_frame, pd.DataFrame):
-            for date, row in path_data_frame.iterrows():
-                data = MarketData(date=date)
-                data.add_market_data(key=market_id, value=row)
-                self.add_market_data(market_data=data)
+            self.__scenario_cube.add_values(
+                market_id=market_id,
+                dates=path_data_frame.index,
+                values=path_data_frame.to_numpy(dtype=float))
         else:
-            raise ValueError()
+            raise ValueError("Must be of type {} but was {}".format(pd.DataFrame, path_data_frame))
+
+    def get_scenario_cube(self):
+        """
+        Gets the scenario cube backing the Market Data Service.
+
+        :return: ScenarioCube
+        """
+        return self.__scenario_cube
+
+    def save(self, *, file_path):
+        """
+        Saves the market data to a binary file, which open_market_data_service memory maps.
+
+        :param file_path: str or path
+        :return: none
+        """
+        save_scenario_cube(self.__scenario_cube, file_path)
+
+    def get_fingerprint(self):
+        """
+        Gets a fingerprint of the content of the market data held.
+
+        :return: str
+        """
+        return self.__scenario_cube.get_fingerprint()
+
+    def get_dates(self):
+        """
+        Gets the sorted dates for which market data is held.
+
+        :return: Index
+        """
+        return self.__scenario_cube.get_dates()
+
+    def get_market_data_values(self, *, market_id):
+        """
+        Gets a read only view of the values for a market id, shaped (date, scenario).
+
+        :param market_id: MarketId
+        :return: ndarray
+        """
+        return self.__scenario_cube.get_values(market_id=market_id)
+
+    def get_market_data(self, *, date):
+        """
+        Gets a MarketData view of all market data held for a date.
+
+        :param date: datetime
+        :return: MarketData
+        """
+        date_index = self.get_dates().get_loc(date)
+        return MarketData(date=date, market_data=self.__scenario_cube.get_date_values(date_index=date_index))
 
     def get_date_to_market_data(self):
         """
@@ -55,7 +109,11 @@ class MarketDataService:
 
         :return: dataframe
         """
-        return copy.deepcopy(pd.DataFrame.from_dict(self.__date_to_market_data, orient='index'))
+        dates = self.get_dates()
+        date_to_market_data = [
+            MarketData(date=date, market_data=self.__scenario_cube.get_date_values(date_index=date_index))
+            for date_index, date in enumerate(dates)]
+        return pd.DataFrame({0: date_to_market_data}, index=dates)
 
     def get_number_scenarios(self, *, market_id):
         """
@@ -72,11 +130,15 @@ class MarketDataService:
         -------
 
         """
-        number_of_scenarios = []
-        for date, row in self.get_date_to_market_data().iterrows():
-            scenarios = row[0].get_number_scenarios(market_id=market_id)
-            number_of_scenarios.append(scenarios)
+        return self.__scenario_cube.get_number_scenarios(market_id=market_id)
 
-        return min(number_of_scenarios)
 
+def open_market_data_service(file_path):
+    """
+    Opens market data saved by MarketDataService.save without reading it, the values being read from the file only
+    when they are used.
 
+    :param file_path: str or path
+    :return: MarketDataService
+    """
+    return MarketDataService(scenario_cube=open_scenario_cube(file_path))
@@ -1,7 +1,60 @@
+import threading
+
+
+class MarketIdRegistry:
+    """ Market Id Registry Class
+    Interns market ids, giving each distinct (market type, security id, instance type) a dense integer index once.
+
+    Market ids may be made on worker threads, a lock guarding the registration.
+    """
+
+    def __init__(self):
+        self.__key_to_index = {}
+        self.__market_ids = []
+        self.__lock = threading.Lock()
+
+    def register(self, market_id):
+        """
+        Gets the index of a market id, registering it if it has not been seen before.
+
+        :param market_id: MarketId
+        :return: int
+        """
+        key = (market_id.market_type, market_id.security_id, market_id.instance_type)
+        with self.__lock:
+            index = self.__key_to_index.get(key)
+            if index is None:
+                index = len(self.__market_ids)
+                self.__key_to_index[key] = index
+                self.__market_ids.append(market_id)
+            return index
+
+    def get_market_id(self, index):
+        """
+        Gets the market id first registered with an index.
+
+        :param index: int
+        :return: MarketId
+        """
+        return self.__market_ids[index]
+
+    def __len__(self):
+        return len(self.__market_ids)
+
+
+market_id_registry = MarketIdRegistry()
+
+
 class MarketId:
     """ Market Id Class
     Keys used to lookup pieces of market information from MarketData objects.
+
+    Each market id holds its index in the market id registry, so hashing and equality are integer operations. Market
+    ids are immutable, so they cannot change after their index is found.
     """
+
+    __slots__ = ('market_type', 'security_id', 'instance_type', '__index')
+
     def __init__(self, *, market_type, security_id, instance_type):
         """
         Initialize Market Id Class.
@@ -10,21 +63,54 @@ class MarketId:
         :param security_id: any
         :param instance_type: float
         """
-        self.market_type = market_type
-        self.security_id = security_id
-        self.instance_type = instance_type
+        object.__setattr__(self, 'market_type', market_type)
+        object.__setattr__(self, 'security_id', security_id)
+        object.__setattr__(self, 'instance_type', instance_type)
+        object.__setattr__(self, '_MarketId__index', market_id_registry.register(self))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __reduce__(self):
+        # the index is registered again when unpickled, as another process has its own registry
+        return _restore_market_id, (type(self), self.market_type, self.security_id, self.instance_type)
 
     def __hash__(self):
-        return hash((self.market_type, self.security_id, self.instance_type))
+        return self.__index
 
     def __eq__(self, other):
-        return (self.market_type, self.security_id, self.instance_type) == (other.market_type, other.security_id, self.instance_type)
+        if not isinstance(other, MarketId):
+            return NotImplemented
+        return self.__index == other.__index
+
+    def __repr__(self):
+        return "{}(security_id={!r})".format(type(self).__name__, self.security_id)
+
+    def get_index(self):
+        """
+        Gets the dense index of the market id in the market id registry.
+
+        :return: int
+        """
+        return self.__index
+
+
+def _restore_market_id(market_id_type, market_type, security_id, instance_type):
+    market_id = object.__new__(market_id_type)
+    MarketId.__init__(market_id, market_type=market_type, security_id=security_id, instance_type=instance_type)
+    return market_id
 
 
 class VolatilityId(MarketId):
     """ Volatility Id Class
     Key used to lookup volatility market data.
     """
+
+    __slots__ = ()
+
     def __init__(self, *, security_id):
         """
         Initialize the Volatility Id Class.
@@ -38,6 +124,9 @@ class RiskFreeRateId(MarketId):
     """ Risk Free Rate Id Class
     Key used to lookup risk free rate market data.
     """
+
+    __slots__ = ()
+
     def __init__(self, *, security_id):
         """
         Initialize the Risk Free Rate Id Class.
@@ -51,6 +140,9 @@ class PriceId(MarketId):
     """ PriceId Class
     Key used to lookup price market data.
     """
+
+    __slots__ = ()
+
     def __init__(self, *, security_id):
         """
         Initialize the Price Id Class.
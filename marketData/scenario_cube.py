@@ -0,0 +1,377 @@
+import hashlib
+import json
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from marketData.market_id import MarketId, market_id_registry
+
+FILE_MAGIC = b'SCNCUBE1'
+FILE_ALIGNMENT = 64
+INSTANCE_TYPES = {'float': float, 'int': int}
+
+
+class ScenarioCube:
+    """ Scenario Cube Class
+    Dense store of market data values shaped (market id, date, scenario).
+
+    Values which have not been provided are held as NaN. Rows are found from the registry index of each market id.
+    """
+
+    def __init__(self, *, dates=None, market_ids=None, values=None, scenario_counts=None, fingerprint=None):
+        """
+        Initialize a Scenario Cube, empty or held over existing arrays without copying them.
+
+        Parameters
+        ----------
+        dates: optional sorted Index of dates
+        market_ids: optional list of MarketId, one per leading entry of values
+        values: optional ndarray shaped (market id, date, scenario), such as a view of shared or mapped memory
+        scenario_counts: optional ndarray shaped (market id, date) of the number of scenarios provided
+        fingerprint: optional fingerprint already known for the values, so that they need not be read to find it
+        """
+        if values is None:
+            self.__dates = pd.Index([])
+            self.__market_index_to_row = {}
+            self.__scenario_counts = np.zeros((0, 0), dtype=np.int64)
+            self.__values = np.empty((0, 0, 0), dtype=np.float64)
+        else:
+            if values.shape[:2] != (len(market_ids), len(dates)) or scenario_counts.shape != values.shape[:2]:
+                raise ValueError("Values shaped {} do not match {} market ids and {} dates".format(
+                    values.shape, len(market_ids), len(dates)))
+            self.__dates = pd.Index(dates)
+            self.__market_index_to_row = {market_id.get_index(): row for row, market_id in enumerate(market_ids)}
+            self.__scenario_counts = scenario_counts
+            self.__values = values
+        self.__fingerprint = fingerprint
+
+    def add_values(self, *, market_id, dates, values):
+        """
+        Adds a block of values for a market id in one bulk operation.
+
+        Existing values for the same market id and date are overwritten.
+
+        Parameters
+        ----------
+        market_id: MarketId
+        dates: sequence of datetime, one per row of values
+        values: array like of shape (dates, scenarios)
+
+        Returns none
+        -------
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values.reshape(-1, 1)
+        dates = pd.Index(dates)
+        if values.ndim != 2 or values.shape[0] != len(dates):
+            raise ValueError("Values of shape {} do not match {} dates".format(values.shape, len(dates)))
+        if dates.has_duplicates:
+            raise ValueError("Dates must be unique")
+
+        self.__resize(market_id=market_id, dates=dates, number_of_scenarios=values.shape[1])
+
+        row = self.__market_index_to_row[market_id.get_index()]
+        date_positions = self.__dates.get_indexer(dates)
+        number_of_scenarios = values.shape[1]
+        self.__values[row, date_positions, :number_of_scenarios] = values
+        self.__values[row, date_positions, number_of_scenarios:] = np.nan
+        self.__scenario_counts[row, date_positions] = number_of_scenarios
+        self.__fingerprint = None
+
+    def __resize(self, *, market_id, dates, number_of_scenarios):
+        """
+        Grows the cube so that it can hold the market id, dates and number of scenarios given.
+        """
+        if len(self.__dates) == 0:
+            new_dates = dates.sort_values()
+        elif dates.isin(self.__dates).all():
+            new_dates = self.__dates
+        else:
+            new_dates = self.__dates.union(dates)
+        new_market_index_to_row = dict(self.__market_index_to_row)
+        new_market_index_to_row.setdefault(market_id.get_index(), len(new_market_index_to_row))
+        new_scenarios = max(self.__values.shape[2], number_of_scenarios)
+
+        new_shape = (len(new_market_index_to_row), len(new_dates), new_scenarios)
+        if new_shape == self.__values.shape:
+            return
+
+        values = np.full(new_shape, np.nan, dtype=np.float64)
+        scenario_counts = np.zeros(new_shape[:2], dtype=np.int64)
+        old_market_ids, old_dates, old_scenarios = self.__values.shape
+        if old_market_ids and old_dates:
+            date_positions = new_dates.get_indexer(self.__dates)
+            values[:old_market_ids, date_positions, :old_scenarios] = self.__values
+            scenario_counts[:old_market_ids, date_positions] = self.__scenario_counts
+
+        self.__dates = new_dates
+        self.__market_index_to_row = new_market_index_to_row
+        self.__values = values
+        self.__scenario_counts = scenario_counts
+
+    def get_scenario_slice(self, *, start, stop):
+        """
+        Gets a cube holding scenarios start to stop of this cube, as a read only view without copying the values.
+
+        The view is read only so that the values, and so the fingerprint, of this cube cannot change through it.
+
+        :param start: int
+        :param stop: int
+        :return: ScenarioCube
+        """
+        values = self.__values[:, :, start:stop]
+        values.flags.writeable = False
+        return ScenarioCube(
+            dates=self.__dates,
+            market_ids=self.get_market_ids(),
+            values=values,
+            scenario_counts=np.clip(self.__scenario_counts - start, 0, stop - start))
+
+    def get_values_array(self):
+        """
+        Gets a read only view of all values shaped (market id, date, scenario).
+
+        :return: ndarray
+        """
+        view = self.__values.view()
+        view.flags.writeable = False
+        return view
+
+    def get_scenario_counts(self):
+        """
+        Gets a read only view of the number of scenarios provided, shaped (market id, date).
+
+        :return: ndarray
+        """
+        view = self.__scenario_counts.view()
+        view.flags.writeable = False
+        return view
+
+    def has_market_id(self, *, market_id):
+        """
+        Checks whether the cube holds values for a market id.
+
+        :param market_id: MarketId
+        :return: bool
+        """
+        return market_id.get_index() in self.__market_index_to_row
+
+    def get_dates(self):
+        """
+        Gets the sorted dates held by the cube.
+
+        :return: Index
+        """
+        return self.__dates
+
+    def get_market_ids(self):
+        """
+        Gets the market ids held by the cube, in cube order.
+
+        :return: list of MarketId
+        """
+        return [market_id_registry.get_market_id(market_index) for market_index in self.__market_index_to_row]
+
+    def get_values(self, *, market_id):
+        """
+        Gets a read only view of the values for a market id, shaped (date, scenario).
+
+        :param market_id: MarketId
+        :return: ndarray
+        """
+        view = self.__values[self.__market_index_to_row[market_id.get_index()]]
+        view.flags.writeable = False
+        return view
+
+    def get_date_values(self, *, date_index):
+        """
+        Gets read only views of the values of every market id for a single date, trimmed to the number of scenarios
+        provided for that date.
+
+        :param date_index: int
+        :return: dict of market id registry index to ndarray
+        """
+        date_values = {}
+        for market_index, row in self.__market_index_to_row.items():
+            count = self.__scenario_counts[row, date_index]
+            if count:
+                view = self.__values[row, date_index, :count]
+                view.flags.writeable = False
+                date_values[market_index] = view
+        return date_values
+
+    def get_number_scenarios(self, *, market_id):
+        """
+        Gets the minimum number of scenarios provided for a market id over the dates where it has values.
+
+        :param market_id: MarketId
+        :return: int
+        """
+        counts = self.__scenario_counts[self.__market_index_to_row[market_id.get_index()]]
+        counts = counts[counts > 0]
+        if counts.size == 0:
+            return 0
+        return int(counts.min())
+
+    def get_fingerprint(self):
+        """
+        Gets a fingerprint of the content of the cube, its dates, market ids and values.
+
+        The values are hashed one market id at a time from their buffers, so the cube is never copied whole.
+
+        :return: str
+        """
+        if self.__fingerprint is None:
+            fingerprint = hashlib.blake2b(digest_size=16)
+            fingerprint.update(repr(self.__dates.tolist()).encode())
+            fingerprint.update(repr([(market_id.market_type, market_id.security_id)
+                                     for market_id in self.get_market_ids()]).encode())
+            fingerprint.update(self.__scenario_counts.tobytes())
+            for market_values in self.__values:
+                fingerprint.update(memoryview(np.ascontiguousarray(market_values)))
+            self.__fingerprint = fingerprint.hexdigest()
+        return self.__fingerprint
+
+
+def to_shared_memory(scenario_cube):
+    """
+    Copies the values of a scenario cube into a new block of shared memory, which other processes can attach to with
+    from_shared_memory without copying.
+
+    The caller owns the block and must close and unlink it once every process is finished with it.
+
+    Parameters
+    ----------
+    scenario_cube: ScenarioCube
+
+    Returns tuple of SharedMemory and a picklable description of the cube
+    -------
+    """
+    values = scenario_cube.get_values_array()
+    shared_memory = SharedMemory(create=True, size=max(values.nbytes, 1))
+    shared_values = np.ndarray(values.shape, dtype=values.dtype, buffer=shared_memory.buf)
+    shared_values[...] = values
+    description = {
+        'name': shared_memory.name,
+        'shape': values.shape,
+        'dtype': values.dtype.str,
+        'dates': scenario_cube.get_dates(),
+        'market_ids': scenario_cube.get_market_ids(),
+        'scenario_counts': np.array(scenario_cube.get_scenario_counts())}
+    return shared_memory, description
+
+
+def from_shared_memory(description):
+    """
+    Attaches to a scenario cube held in shared memory by to_shared_memory.
+
+    The SharedMemory returned must be kept open while the cube is used and closed afterwards.
+
+    Parameters
+    ----------
+    description: dict made by to_shared_memory
+
+    Returns tuple of SharedMemory and ScenarioCube
+    -------
+    """
+    shared_memory = SharedMemory(name=description['name'])
+    values = np.ndarray(description['shape'], dtype=np.dtype(description['dtype']), buffer=shared_memory.buf)
+    values.flags.writeable = False
+    scenario_cube = ScenarioCube(
+        dates=description['dates'],
+        market_ids=description['market_ids'],
+        values=values,
+        scenario_counts=description['scenario_counts'])
+    return shared_memory, scenario_cube
+
+
+def save_scenario_cube(scenario_cube, file_path):
+    """
+    Saves a scenario cube to a binary file which open_scenario_cube can memory map.
+
+    The file holds an identifying magic string, the length of a JSON header describing the dates, market ids, shape and
+    block offsets, then the scenario counts as an int64 block and the values as a float64 block, each starting on a 64
+    byte boundary.
+
+    Parameters
+    ----------
+    scenario_cube: ScenarioCube
+    file_path: str or path
+
+    Returns none
+    -------
+    """
+    values = scenario_cube.get_values_array()
+    scenario_counts = np.ascontiguousarray(scenario_cube.get_scenario_counts(), dtype='<i8')
+    header = {
+        'dates': [pd.Timestamp(date).isoformat() for date in scenario_cube.get_dates()],
+        'market_ids': [[market_id.market_type, market_id.security_id, market_id.instance_type.__name__]
+                       for market_id in scenario_cube.get_market_ids()],
+        'shape': list(values.shape),
+        'fingerprint': scenario_cube.get_fingerprint()}
+    # the offsets depend on the header length, so it is laid out once to find them
+    prefix_length = len(FILE_MAGIC) + 8 + len(json.dumps(dict(header, counts_offset=0, values_offset=0))) + 64
+    header['counts_offset'] = _align(prefix_length)
+    header['values_offset'] = _align(header['counts_offset'] + scenario_counts.nbytes)
+    header_bytes = json.dumps(header).encode()
+
+    with open(file_path, 'wb') as file:
+        file.write(FILE_MAGIC)
+        file.write(np.array(len(header_bytes), dtype='<u8').tobytes())
+        file.write(header_bytes)
+        file.write(bytes(header['counts_offset'] - file.tell()))
+        file.write(scenario_counts.tobytes())
+        file.write(bytes(header['values_offset'] - file.tell()))
+        # one market id at a time, so a cube which is a view of another is never copied whole
+        for market_values in values:
+            np.ascontiguousarray(market_values, dtype='<f8').tofile(file)
+
+
+def open_scenario_cube(file_path):
+    """
+    Opens a scenario cube saved by save_scenario_cube without reading its values.
+
+    The values are memory mapped copy on write, so pages are read from the file only when they are used and changes
+    made to the cube are never written back to the file.
+
+    Parameters
+    ----------
+    file_path: str or path
+
+    Returns ScenarioCube
+    -------
+    """
+    with open(file_path, 'rb') as file:
+        if file.read(len(FILE_MAGIC)) != FILE_MAGIC:
+            raise ValueError("{} is not a scenario cube file".format(file_path))
+        header_length = int(np.frombuffer(file.read(8), dtype='<u8')[0])
+        header = json.loads(file.read(header_length))
+
+    shape = tuple(header['shape'])
+    scenario_counts = np.fromfile(file_path, dtype='<i8', count=shape[0] * shape[1],
+                                  offset=header['counts_offset']).reshape(shape[:2])
+    if np.prod(shape) > 0:
+        values = np.memmap(file_path, dtype='<f8', mode='c', offset=header['values_offset'], shape=shape)
+    else:
+        values = np.empty(shape, dtype=np.float64)
+    return ScenarioCube(
+        dates=pd.DatetimeIndex(header['dates']),
+        market_ids=[MarketId(market_type=market_type, security_id=_to_tuple(security_id),
+                             instance_type=INSTANCE_TYPES[instance_type])
+                    for market_type, security_id, instance_type in header['market_ids']],
+        values=values,
+        scenario_counts=scenario_counts,
+        fingerprint=header['fingerprint'])
+
+
+def _to_tuple(value):
+    # JSON holds tuples as lists, which would not be hashable security ids
+    if isinstance(value, list):
+        return tuple(_to_tuple(item) for item in value)
+    return value
+
+
+def _align(offset):
+    return -(-offset // FILE_ALIGNMENT) * FILE_ALIGNMENT
@@ -1,8 +1,14 @@
 import datetime
+import os
+import pickle
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
-from marketData.market_data_service import MarketDataService
-from marketData.market_id import PriceId
+import numpy as np
+
+from marketData.market_data_service import MarketDataService, open_market_data_service
+from marketData.market_id import PriceId, RiskFreeRateId, VolatilityId, market_id_registry
 from path_generators.correlated_path import CorrelatedPath
 from path_generators.linear_path import LinearPath
 from path_generators.volatile_path import VolatilePath
@@ -27,7 +33,7 @@ class TestMarketDataService(unittest.TestCase):
         market_data_service_df = market_data_service.get_date_to_market_data()
 
         # Check that correct number of days market data has been produced.
-        self.assertEqual(market_data_service_df.shape[0], 368)
+        self.assertEqual(market_data_service_df.shape[0], 261)
 
     def test_volatile_and_correlated_path(self):
         annual_drift = 0.1
@@ -51,7 +57,119 @@ class TestMarketDataService(unittest.TestCase):
         first_day_market_data_dict = first_day_market_data.get_all_market_data()
 
         # Check that the correct number of days market data is available.
-        self.assertEqual(market_data_service_dataframe.shape[0], 368)
+        self.assertEqual(market_data_service_dataframe.shape[0], 261)
 
         # Check that the right number of pieces of information are available for a given day.
         self.assertEqual(len(first_day_market_data_dict), 2)
+
+    def test_scenario_cube_views(self):
+        __linear_path = LinearPath(daily_value=0.01, start_date=self.__start_date, end_date=self.__end_date)
+        __volatile_path = VolatilePath(volatility=0.2, number_of_paths=5, central_path=__linear_path)
+        __cumulative_path = __volatile_path.get_cumulative_path(start_value=100.0)
+        market_data_service = MarketDataService()
+        market_data_service.add_market_data_from_path(path_data_frame=__cumulative_path,
+                                                      market_id=PriceId(security_id=1))
+        values = market_data_service.get_market_data_values(market_id=PriceId(security_id=1))
+        date = __cumulative_path.index[10]
+        market_data = market_data_service.get_market_data(date=date)
+
+        # Check that the cube holds the whole path and that a single date view matches it.
+        self.assertEqual(values.shape, __cumulative_path.shape)
+        self.assertEqual(market_data_service.get_number_scenarios(market_id=PriceId(security_id=1)), 5)
+        self.assertEqual(market_data.get_market_data(market_id=PriceId(security_id=1), scenario_number=3),
+                         __cumulative_path.iloc[10, 3])
+
+        # Check that the views cannot be used to modify the stored market data.
+        with self.assertRaises(ValueError):
+            values[0, 0] = 0.0
+
+        # Check that a scenario slice cannot be used to modify the values, or so the fingerprint, of the whole cube.
+        scenario_cube = market_data_service.get_scenario_cube()
+        fingerprint = scenario_cube.get_fingerprint()
+        scenario_slice = scenario_cube.get_scenario_slice(start=1, stop=3)
+        with self.assertRaises(ValueError):
+            scenario_slice.add_values(market_id=PriceId(security_id=1), dates=__cumulative_path.index[:1],
+                                      values=[[0.0, 0.0]])
+        self.assertEqual(scenario_cube.get_fingerprint(), fingerprint)
+
+    def test_number_scenarios_is_minimum(self):
+        __linear_path = LinearPath(daily_value=0.01, start_date=self.__start_date, end_date=self.__end_date)
+        market_data_service = MarketDataService()
+        market_data_service.add_market_data_from_path(
+            path_data_frame=__linear_path.repeat_scenarios(6).get_path_dataframe(),
+            market_id=PriceId(security_id=1))
+        market_data_service.add_market_data_from_path(
+            path_data_frame=__linear_path.repeat_scenarios(3).get_path_dataframe().iloc[:5],
+            market_id=PriceId(security_id=1))
+
+        self.assertEqual(market_data_service.get_number_scenarios(market_id=PriceId(security_id=1)), 3)
+
+    def test_market_ids_are_interned(self):
+        price_id = PriceId(security_id="interned")
+        volatility_id = VolatilityId(security_id="interned")
+
+        # Check that equal market ids share one registry index and that ids of another market type are not equal.
+        self.assertEqual(price_id, PriceId(security_id="interned"))
+        self.assertEqual(price_id.get_index(), PriceId(security_id="interned").get_index())
+        self.assertNotEqual(price_id, volatility_id)
+        self.assertNotEqual(price_id.get_index(), volatility_id.get_index())
+        self.assertEqual(len({price_id: 1, PriceId(security_id="interned"): 2, volatility_id: 3}), 2)
+        self.assertEqual(market_id_registry.get_market_id(price_id.get_index()), price_id)
+
+        # Check that a market id is registered again when unpickled.
+        unpickled = pickle.loads(pickle.dumps(price_id))
+        self.assertIsInstance(unpickled, PriceId)
+        self.assertEqual(unpickled, price_id)
+
+        # Check that a market id cannot be changed after its index is found.
+        with self.assertRaises(AttributeError):
+            price_id.security_id = "changed"
+        with self.assertRaises(AttributeError):
+            del price_id.market_type
+        self.assertEqual(price_id.security_id, "interned")
+
+        # Check that market ids made on several threads at once are each given one index, stored at that index.
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            indices = list(executor.map(
+                lambda thread: [PriceId(security_id=("threaded", number)).get_index() for number in range(200)],
+                range(8)))
+        self.assertTrue(all(thread_indices == indices[0] for thread_indices in indices))
+        for number, index in enumerate(indices[0]):
+            self.assertEqual(market_id_registry.get_market_id(index).security_id, ("threaded", number))
+
+    def test_save_and_open(self):
+        linear_path = LinearPath(daily_value=0.0004, start_date=self.__start_date, end_date=self.__end_date)
+        market_data_service = MarketDataService()
+        market_data_service.add_market_data_from_path(
+            path_data_frame=VolatilePath(volatility=0.2, number_of_paths=5, central_path=linear_path, seed=2)
+            .get_cumulative_path(start_value=100.0),
+            market_id=PriceId(security_id=1))
+        market_data_service.add_market_data_from_path(
+            path_data_frame=linear_path.repeat_scenarios(3).get_path_dataframe(),
+            market_id=VolatilityId(security_id="AAPL"))
+        market_data_service.add_market_data_from_path(
+            path_data_frame=linear_path.repeat_scenarios(2).get_path_dataframe(),
+            market_id=RiskFreeRateId(security_id=("AAPL", "USD")))
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'scenarios.cube')
+            market_data_service.save(file_path=file_path)
+            opened = open_market_data_service(file_path)
+
+            # Check that the opened market data matches what was saved.
+            self.assertTrue(opened.get_dates().equals(market_data_service.get_dates()))
+            self.assertEqual(opened.get_fingerprint(), market_data_service.get_fingerprint())
+            self.assertEqual(opened.get_number_scenarios(market_id=VolatilityId(security_id="AAPL")), 3)
+            self.assertEqual(opened.get_number_scenarios(market_id=RiskFreeRateId(security_id=("AAPL", "USD"))), 2)
+            for market_id in (PriceId(security_id=1), VolatilityId(security_id="AAPL")):
+                np.testing.assert_array_equal(opened.get_market_data_values(market_id=market_id),
+                                              market_data_service.get_market_data_values(market_id=market_id))
+
+            # Check that changes to the opened market data are not written to the file.
+            opened.add_market_data_from_path(
+                path_data_frame=linear_path.repeat_scenarios(5).get_path_dataframe(),
+                market_id=PriceId(security_id=1))
+            np.testing.assert_array_equal(
+                open_market_data_service(file_path).get_market_data_values(market_id=PriceId(security_id=1)),
+                market_data_service.get_market_data_values(market_id=PriceId(security_id=1)))
+            del opened
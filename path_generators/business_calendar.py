@@ -0,0 +1,169 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+WEEKDAYS = '1111100'
+MAX_CACHED_GRIDS = 64
+
+_grid_cache = OrderedDict()
+
+
+class BusinessCalendar:
+    """ Business Calendar Class
+    The working days of a market, given by a mask of working weekdays and a set of holidays.
+
+    Calendars with the same weekmask and holidays are equal and hash alike, so they can key cached date grids.
+    """
+
+    def __init__(self, *, holidays=(), weekmask=WEEKDAYS):
+        """
+        Initialize the Business Calendar Class.
+
+        :param holidays: iterable of dates which are not working days
+        :param weekmask: str of seven 0s and 1s from Monday to Sunday, 1 for a working weekday
+        """
+        self.__holidays = np.unique(np.array([to_day(holiday) for holiday in holidays], dtype='datetime64[D]'))
+        self.__holidays.flags.writeable = False
+        self.__weekmask = weekmask
+        self.__busday_calendar = np.busdaycalendar(weekmask=weekmask, holidays=self.__holidays)
+        self.__key = (weekmask, self.__holidays.tobytes())
+
+    def __eq__(self, other):
+        return isinstance(other, BusinessCalendar) and self.__key == other.__key
+
+    def __hash__(self):
+        return hash(self.__key)
+
+    def __repr__(self):
+        return "BusinessCalendar(weekmask={!r}, holidays={})".format(self.__weekmask, len(self.__holidays))
+
+    def get_holidays(self):
+        return self.__holidays
+
+    def get_weekmask(self):
+        return self.__weekmask
+
+    def is_business_day(self, days):
+        """
+        Gets whether each day is a working day.
+
+        :param days: date or array like of dates
+        :return: bool or ndarray of bool
+        """
+        return np.is_busday(to_days(days), busdaycal=self.__busday_calendar)
+
+    def get_next_business_day(self, day):
+        """
+        Gets the first working day after the given day.
+
+        :param day: datetime
+        :return: datetime
+        """
+        return self.__offset(day, 1, 'backward')
+
+    def get_previous_business_day(self, day):
+        """
+        Gets the last working day before the given day.
+
+        :param day: datetime
+        :return: datetime
+        """
+        return self.__offset(day, -1, 'forward')
+
+    def count_business_days(self, *, start_dates, end_date):
+        """
+        Counts the working days from each start date up to but not including the end date, negative if the end date is
+        before the start date.
+
+        :param start_dates: date or array like of dates
+        :param end_date: date
+        :return: int or ndarray of int
+        """
+        return np.busday_count(to_days(start_dates), to_day(end_date), busdaycal=self.__busday_calendar)
+
+    def get_business_days(self, *, start_date, end_date):
+        """
+        Gets the working days from the start date to the end date inclusive, found in one vectorized call.
+
+        :param start_date: datetime
+        :param end_date: datetime
+        :return: DatetimeIndex
+        """
+        days = np.arange(to_day(start_date), to_day(end_date) + np.timedelta64(1, 'D'), dtype='datetime64[D]')
+        return pd.DatetimeIndex(days[np.is_busday(days, busdaycal=self.__busday_calendar)].astype('datetime64[ns]'))
+
+    def __offset(self, day, offsets, roll):
+        # rolling to the nearest working day on the other side first makes the offset strictly after or before the day
+        business_day = np.busday_offset(to_day(day), offsets, roll=roll, busdaycal=self.__busday_calendar)
+        return pd.Timestamp(business_day).to_pydatetime()
+
+
+WEEKDAY_CALENDAR = BusinessCalendar()
+
+
+def to_day(day):
+    """
+    Converts a date to a numpy day.
+
+    :param day: date, datetime, Timestamp, str or datetime64
+    :return: datetime64[D]
+    """
+    return np.datetime64(pd.Timestamp(day).normalize().to_datetime64(), 'D')
+
+
+def to_days(days):
+    """
+    Converts a date or dates to numpy days.
+
+    :param days: date or array like of dates
+    :return: datetime64[D] or ndarray of datetime64[D]
+    """
+    if np.ndim(days) == 0 and not isinstance(days, pd.Index):
+        return to_day(days)
+    return pd.DatetimeIndex(days).to_numpy().astype('datetime64[D]')
+
+
+def get_business_day_grid(*, start_date, end_date, calendar=WEEKDAY_CALENDAR):
+    """
+    Gets the working days of a calendar from the start date to the end date inclusive.
+
+    Grids are cached by start date, end date and calendar, so every path generated over the same dates shares one index.
+
+    Parameters
+    ----------
+    start_date: datetime
+    end_date: datetime
+    calendar: BusinessCalendar
+
+    Returns DatetimeIndex
+    -------
+    """
+    key = (to_day(start_date), to_day(end_date), calendar)
+    if key in _grid_cache:
+        _grid_cache.move_to_end(key)
+        return _grid_cache[key]
+
+    grid = calendar.get_business_days(start_date=start_date, end_date=end_date)
+    _grid_cache[key] = grid
+    if len(_grid_cache) > MAX_CACHED_GRIDS:
+        _grid_cache.popitem(last=False)
+    return grid
+
+
+def get_day_counts(*, dates, end_date, calendar=None):
+    """
+    Counts the days from each date to the end date.
+
+    Parameters
+    ----------
+    dates: sequence of datetime
+    end_date: datetime
+    calendar: optional BusinessCalendar, working days are counted if given and calendar days otherwise
+
+    Returns ndarray of int
+    -------
+    """
+    if calendar is None:
+        return (to_day(end_date) - to_days(dates)).astype(np.int64)
+    return calendar.count_business_days(start_dates=dates, end_date=end_date)
@@ -0,0 +1,82 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+MAX_CACHED_FACTORS = 32
+MIN_EIGENVALUE = 1e-8
+
+_factor_cache = OrderedDict()
+
+
+def get_correlation_factor(correlation_matrix):
+    """
+    Gets a lower triangular factor L of a correlation matrix C, such that L L^T = C.
+
+    Factors are cached by a hash of the matrix, so repeated generation with the same correlations factorizes only once.
+    When the matrix is not positive definite its eigenvalues are clipped to a small positive value and the diagonal is
+    rescaled to one before factorizing.
+
+    Parameters
+    ----------
+    correlation_matrix: array like, square and symmetric
+
+    Returns ndarray, read only
+    -------
+    """
+    correlation_matrix = np.ascontiguousarray(correlation_matrix, dtype=np.float64)
+    if correlation_matrix.ndim != 2 or correlation_matrix.shape[0] != correlation_matrix.shape[1]:
+        raise ValueError("Correlation matrix must be square but was shaped {}".format(correlation_matrix.shape))
+
+    key = hashlib.blake2b(correlation_matrix.tobytes(), digest_size=16)
+    key.update(repr(correlation_matrix.shape).encode())
+    key = key.hexdigest()
+    if key in _factor_cache:
+        _factor_cache.move_to_end(key)
+        return _factor_cache[key]
+
+    try:
+        factor = np.linalg.cholesky(correlation_matrix)
+    except np.linalg.LinAlgError:
+        factor = np.linalg.cholesky(get_nearest_correlation_matrix(correlation_matrix))
+    factor.flags.writeable = False
+
+    _factor_cache[key] = factor
+    if len(_factor_cache) > MAX_CACHED_FACTORS:
+        _factor_cache.popitem(last=False)
+    return factor
+
+
+def get_nearest_correlation_matrix(correlation_matrix):
+    """
+    Gets a positive definite correlation matrix close to the one given, by clipping its eigenvalues.
+
+    Parameters
+    ----------
+    correlation_matrix: ndarray
+
+    Returns ndarray
+    -------
+    """
+    symmetric = (correlation_matrix + correlation_matrix.T) / 2
+    eigenvalues, eigenvectors = np.linalg.eigh(symmetric)
+    clipped = (eigenvectors * np.maximum(eigenvalues, MIN_EIGENVALUE)) @ eigenvectors.T
+    scale = 1 / np.sqrt(np.diag(clipped))
+    return clipped * np.outer(scale, scale)
+
+
+def get_uniform_correlation_matrix(*, size, correlation):
+    """
+    Gets a correlation matrix where every pair of variables has the same correlation.
+
+    Parameters
+    ----------
+    size: int
+    correlation: float
+
+    Returns ndarray
+    -------
+    """
+    correlation_matrix = np.full((size, size), correlation, dtype=np.float64)
+    np.fill_diagonal(correlation_matrix, 1.0)
+    return correlation_matrix
@@ -1,29 +1,24 @@
-from datetime import datetime, timedelta
-
-from path_generators.path import Path, get_next_working_day
+import numpy as np
 import pandas as pd
 
+from path_generators.business_calendar import WEEKDAY_CALENDAR, get_business_day_grid
+from path_generators.path import Path
+
 
 class LinearPath(Path):
     """ Linear Path Class
-    A path which has a uniform daily return from start date to end date.
+    A path which has a uniform daily return on each working day from start date to end date.
     """
 
-    def __init__(self, *, daily_value, start_date, end_date):
+    def __init__(self, *, daily_value, start_date, end_date, calendar=WEEKDAY_CALENDAR):
         """
         Initialize a linear path.
 
         :param daily_value: float
         :param start_date: datetime
         :param end_date: datetime
+        :param calendar: BusinessCalendar, the working days of the path
         """
-
-        path = {}
-        delta = timedelta(days=1)
-        d = start_date - delta
-        while d <= end_date:
-            d = get_next_working_day(d)
-            path[d] = daily_value
-        path = pd.DataFrame.from_dict(path, orient='index')
+        dates = get_business_day_grid(start_date=start_date, end_date=end_date, calendar=calendar)
+        path = pd.DataFrame(np.full((len(dates), 1), daily_value, dtype=np.float64), index=dates)
         super().__init__(path_dataframe=path)
-
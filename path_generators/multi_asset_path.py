@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from path_generators.correlation_factor import get_correlation_factor
+from path_generators.path import Path
+
+
+class MultiAssetPath:
+    """ Multi Asset Path Class
+    Produces volatile paths for several securities at once, correlated across securities by a full correlation matrix.
+    """
+
+    DAYS_IN_YEAR = Path.DAYS_IN_YEAR
+
+    def __init__(self, *, central_paths, volatilities, correlation_matrix, number_of_paths, seed=None):
+        """
+        Initialize the Multi Asset Path Class.
+
+        Parameters
+        ----------
+        central_paths: list of Path, one single column central path per security, all with the same dates
+        volatilities: list of float, the annual volatility of each security
+        correlation_matrix: array like shaped (security, security)
+        number_of_paths: int
+        seed: optional int for reproducible paths
+        """
+        central_path_data_frames = [central_path.get_path_dataframe() for central_path in central_paths]
+        if len(volatilities) != len(central_paths):
+            raise ValueError("There must be one volatility for each of the {} central paths".format(len(central_paths)))
+        if any(not data_frame.index.equals(central_path_data_frames[0].index)
+               for data_frame in central_path_data_frames):
+            raise ValueError("Central paths must all have the same dates")
+
+        # shaped (date, security)
+        central_returns = np.column_stack([data_frame.iloc[:, 0].to_numpy() for data_frame in central_path_data_frames])
+        daily_volatilities = np.asarray(volatilities, dtype=np.float64) / pow(self.DAYS_IN_YEAR, 0.5)
+        factor = get_correlation_factor(correlation_matrix)
+        if factor.shape[0] != len(central_paths):
+            raise ValueError("Correlation matrix shaped {} does not match {} securities".format(
+                factor.shape, len(central_paths)))
+
+        random_generator = np.random.default_rng(seed)
+        draws = random_generator.standard_normal((number_of_paths, len(central_returns), len(central_paths)))
+        # all securities are correlated in a single matmul, shaped (path, date, security)
+        returns = draws @ factor.T
+        returns *= daily_volatilities
+        returns += central_returns
+
+        self.__index = central_path_data_frames[0].index
+        self.__returns = returns
+
+    def get_paths(self):
+        """
+        Gets the paths of each security, in the order of the central paths.
+
+        :return: list of Path
+        """
+        return [Path(path_dataframe=pd.DataFrame(self.__returns[:, :, security].T, index=self.__index))
+                for security in range(self.__returns.shape[2])]
@@ -1,11 +1,69 @@
-import copy
-from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 
+from path_generators.business_calendar import WEEKDAY_CALENDAR
+
+
+class PathSource:
+    """ Path Source Class
+    The base daily returns of a path, taken from a dataframe of returns or of cumulative values. The returns of
+    cumulative values are only found when first needed.
+
+    A source is shared by a path and every path repeating its scenarios, so its values are found at most once.
+    """
+
+    __slots__ = ('__cumulative_values', '__values', '__index', '__columns')
+
+    def __init__(self, *, data_frame, is_cumulative=False):
+        """
+        Initialise the Path Source Class.
+
+        The values of the dataframe are copied, so later changes to the dataframe do not change the path.
+
+        :param data_frame: dataframe of datetime to paths
+        :param is_cumulative: bool, if True the dataframe holds cumulative values rather than daily returns
+        """
+        values = np.array(data_frame.to_numpy(dtype=np.float64))
+        values.flags.writeable = False
+        self.__cumulative_values = values if is_cumulative else None
+        self.__values = None if is_cumulative else values
+        self.__index = data_frame.index
+        self.__columns = data_frame.columns
+
+    def get_index(self):
+        return self.__index
+
+    def get_columns(self):
+        return self.__columns
+
+    def get_values(self):
+        """
+        Gets the read only daily returns shaped (date, path), found on the first call.
+
+        The returns of cumulative values are their percentage changes, the first date having a return of zero.
+
+        :return: ndarray
+        """
+        if self.__values is None:
+            values = self.__cumulative_values
+            returns = np.zeros(values.shape)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns[1:] = values[1:] / values[:-1] - 1
+            returns = np.where(np.isnan(returns), 0.0, returns)
+            returns.flags.writeable = False
+            self.__values = returns
+            # the cumulative values are no longer needed once their returns are held
+            self.__cumulative_values = None
+        return self.__values
+
 
 class Path:
     """ Path Class
     Holds dictionary of datetime to value for financial instrument.
+
+    A path is a lazy expression of a source of daily returns and a number of times its scenarios are repeated. Nothing
+    is computed until the values are asked for, and repeated scenarios of a single path are a broadcast view of it
+    rather than copies.
     """
 
     DAYS_IN_YEAR = 255
@@ -14,44 +72,100 @@ class Path:
         """
         Initialise Path Class.
 
+        The values of the dataframe are copied, so it may be modified afterwards without changing the path.
+
         :param path_dataframe: dataframe of datetime to paths
+        :param path_cumulative_data_frame: dataframe of datetime to cumulative values of paths, used instead of
+            path_dataframe
         """
         if path_cumulative_data_frame is not None:
-            self.__path_dataframe = copy.deepcopy(path_cumulative_data_frame.pct_change().fillna(0))
+            self.__source = PathSource(data_frame=path_cumulative_data_frame, is_cumulative=True)
         else:
-            self.__path_dataframe = copy.deepcopy(path_dataframe)
+            self.__source = PathSource(data_frame=path_dataframe)
+        self.__repeat = 1
+
+    def __get_columns(self):
+        if self.__repeat == 1:
+            return self.__source.get_columns()
+        return pd.RangeIndex(len(self.__source.get_columns()) * self.__repeat)
+
+    def __repeat_values(self, values):
+        """
+        Repeats the columns of base values, as a broadcast view when there is a single column.
+        """
+        if self.__repeat == 1:
+            return values
+        if values.shape[1] == 1:
+            return np.broadcast_to(values, (values.shape[0], self.__repeat))
+        repeated = np.tile(values, (1, self.__repeat))
+        repeated.flags.writeable = False
+        return repeated
+
+    def get_number_of_paths(self):
+        """
+        Gets the number of paths, without computing their values.
+
+        :return: int
+        """
+        return len(self.__source.get_columns()) * self.__repeat
+
+    def get_path_values(self):
+        """
+        Gets the read only daily returns of the paths, shaped (date, path).
+
+        :return: ndarray
+        """
+        return self.__repeat_values(self.__source.get_values())
 
     def get_path_dataframe(self):
         """
         Gets dataframe from datetime to value for the paths.
 
+        The dataframe is backed by the read only path values, so its values cannot be modified in place.
+
         :return: dataframe of datetime to paths
         """
-        return copy.deepcopy(self.__path_dataframe)
+        return pd.DataFrame(self.get_path_values(), index=self.__source.get_index(), columns=self.__get_columns(),
+                            copy=False)
 
-    def get_cumulative_path(self, *, start_value):
+    def get_cumulative_path(self, *, start_value, dtype=np.float64, memmap_file=None, chunk_size=1024):
         """
         Gets the cumulative path dataframe starting from a given value.
 
+        The first return is ignored and each later value is the previous value grown by that day's return, computed as
+        a cumulative product over the whole array. Repeated scenarios are only computed once.
+
         Parameters
         ----------
         start_value: float
+        dtype: float dtype of the values, float32 halves the memory used
+        memmap_file: optional file, the values are then written to a memory mapped array in the file a chunk of
+            columns at a time, for path sets which do not fit in memory
+        chunk_size: int, the number of columns computed at a time when writing to a memory mapped file
 
         Returns DataFrame
         -------
         """
-        dataframe = self.__path_dataframe
-
-        __running__value = [start_value] * len(dataframe.columns)
-        cumulative_path_dict = {dataframe.index[0]: __running__value}
-        for index, row in dataframe.iloc[1:].iterrows():
-            daily_return = row
-            __running__value = [r * (1 + d) for r, d in zip(__running__value, daily_return)]
-            today_value = copy.deepcopy(__running__value)
-            cumulative_path_dict[index] = today_value
+        if memmap_file is None:
+            values = self.__source.get_values()
+            cumulative = np.empty(values.shape, dtype=dtype)
+            column_chunks = [slice(None)]
+        else:
+            values = self.get_path_values()
+            cumulative = np.lib.format.open_memmap(memmap_file, mode='w+', dtype=dtype, shape=values.shape)
+            column_chunks = [slice(start, start + chunk_size) for start in range(0, values.shape[1], chunk_size)]
+
+        for columns in column_chunks:
+            chunk = cumulative[:, columns]
+            chunk[0] = start_value
+            np.add(values[1:, columns], 1, out=chunk[1:], casting='same_kind')
+            np.multiply.accumulate(chunk, axis=0, out=chunk)
+        if memmap_file is not None:
+            cumulative.flush()
+        else:
+            cumulative = self.__repeat_values(cumulative)
 
-        data_frame = pd.DataFrame.from_dict(cumulative_path_dict, orient='index', columns=dataframe.columns.values)
-        return data_frame
+        return pd.DataFrame(cumulative, index=self.__source.get_index(), columns=self.__get_columns(), copy=False)
 
     def repeat_scenarios(self, multiplier):
         """
@@ -59,7 +173,7 @@ class Path:
         object.
 
         E.g. if there is a single scenario and a multiple of 10 is given. A Path object with a dataframe with 10
-        identical scenarios will be returned
+        identical scenarios will be returned. The new path shares the values of this path rather than copying them.
         Parameters
         ----------
         multiplier: int
@@ -67,44 +181,37 @@ class Path:
         Returns Path
         -------
         """
-        return Path(path_dataframe=pd.concat([self.__path_dataframe] * multiplier, axis=1, ignore_index=True))
+        repeated = object.__new__(Path)
+        repeated.__source = self.__source
+        repeated.__repeat = self.__repeat * multiplier
+        return repeated
 
 
-def get_previous_working_day(day):
+def get_previous_working_day(day, *, calendar=WEEKDAY_CALENDAR):
     """
     Gets the most recent working day previous to the given day.
 
     Parameters
     ----------
     day: datetime
+    calendar: BusinessCalendar
 
     Returns datetime
     -------
 
     """
-    delta = timedelta(days=1)
-    d = day
-    d -= delta
-    weekend = {5, 6}
-    while d in weekend:
-        d -= delta
-    return d
+    return calendar.get_previous_business_day(day)
 
 
-def get_next_working_day(day):
+def get_next_working_day(day, *, calendar=WEEKDAY_CALENDAR):
     """
     Get the mot soon working day, next after the given day.
     Parameters
     ----------
     day: datetime
+    calendar: BusinessCalendar
 
     Returns datetime
     -------
     """
-    delta = timedelta(days=1)
-    d = day
-    d += delta
-    weekend = {5, 6}
-    while d in weekend:
-        d += delta
-    return d
+    return calendar.get_next_business_day(day)
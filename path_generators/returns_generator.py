@@ -0,0 +1,69 @@
+import numpy as np
+
+
+class ReturnsGenerator:
+    """ Returns Generator Class
+    Generates daily returns shaped (date, path) which are normally distributed around a central path of daily returns.
+
+    Each path is drawn from the random stream in turn, so a seeded generator gives the same paths whether they are
+    generated all at once or in chunks of any size.
+    """
+
+    DAYS_IN_YEAR = 255
+
+    def __init__(self, *, central_returns, volatility, seed=None, antithetic=False):
+        """
+        Initialize the Returns Generator Class.
+
+        Parameters
+        ----------
+        central_returns: array like of the daily returns of the central path
+        volatility: float, annual volatility
+        seed: optional int or numpy SeedSequence for reproducible paths
+        antithetic: bool, if True each pair of paths uses a draw and its negation, halving the draws needed
+        """
+        self.__central_returns = np.asarray(central_returns, dtype=np.float64).reshape(-1, 1)
+        self.__daily_volatility = volatility / pow(self.DAYS_IN_YEAR, 0.5)
+        self.__random_generator = np.random.default_rng(seed)
+        self.__antithetic = antithetic
+
+    def generate(self, *, number_of_paths):
+        """
+        Generates the returns of a number of paths in one broadcast operation.
+
+        Parameters
+        ----------
+        number_of_paths: int
+
+        Returns ndarray shaped (date, path)
+        -------
+        """
+        number_of_draws = -(-number_of_paths // 2) if self.__antithetic else number_of_paths
+        draws = self.__random_generator.standard_normal((number_of_draws, len(self.__central_returns)))
+        if self.__antithetic:
+            # interleave each draw with its negation so that chunks of paths line up with a single generation
+            draws = np.stack((draws, -draws), axis=1).reshape(-1, draws.shape[1])[:number_of_paths]
+        returns = draws.T
+        returns *= self.__daily_volatility
+        returns += self.__central_returns
+        return returns
+
+    def generate_chunks(self, *, number_of_paths, chunk_size):
+        """
+        Generates the returns of a number of paths a chunk of paths at a time, so memory use is fixed by the chunk
+        size rather than the number of paths.
+
+        Parameters
+        ----------
+        number_of_paths: int
+        chunk_size: int, rounded up to an even number in antithetic mode to keep pairs of paths together
+
+        Returns iterator of ndarray shaped (date, path)
+        -------
+        """
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive but was {}".format(chunk_size))
+        if self.__antithetic:
+            chunk_size += chunk_size % 2
+        for start in range(0, number_of_paths, chunk_size):
+            yield self.generate(number_of_paths=min(chunk_size, number_of_paths - start))
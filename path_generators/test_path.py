@@ -1,11 +1,17 @@
 import datetime
+import os
+import tempfile
 import unittest
 import pandas as pd
 import numpy as np
 
+from path_generators.business_calendar import BusinessCalendar, get_business_day_grid
 from path_generators.correlated_path import CorrelatedPath
+from path_generators.correlation_factor import get_correlation_factor
 from path_generators.linear_path import LinearPath
-from path_generators.path import Path
+from path_generators.multi_asset_path import MultiAssetPath
+from path_generators.path import Path, get_next_working_day, get_previous_working_day
+from path_generators.returns_generator import ReturnsGenerator
 from path_generators.volatile_path import VolatilePath
 
 
@@ -36,12 +42,85 @@ class TestPath(unittest.TestCase):
 
         pd.testing.assert_frame_equal(original_cum_path, remade_cum_path)
 
+    def test_cumulative_path_modes(self):
+        linear_path = LinearPath(daily_value=0.001, start_date=self.__start_date, end_date=self.__end_date)
+        volatile_path = VolatilePath(volatility=0.2, number_of_paths=7, central_path=linear_path)
+        cumulative_path = volatile_path.get_cumulative_path(start_value=100)
+        expected = 100 * (1 + volatile_path.get_path_dataframe().iloc[1:]).cumprod()
+
+        # Check that the first value is the start value and later values grow by each day's return.
+        self.assertTrue((cumulative_path.iloc[0] == 100).all())
+        pd.testing.assert_frame_equal(cumulative_path.iloc[1:], expected)
+
+        float32_path = volatile_path.get_cumulative_path(start_value=100, dtype=np.float32)
+        self.assertEqual(float32_path.to_numpy().dtype, np.float32)
+        np.testing.assert_allclose(float32_path.to_numpy(), cumulative_path.to_numpy(), rtol=1e-5)
+
+        with tempfile.TemporaryDirectory() as directory:
+            memmap_path = volatile_path.get_cumulative_path(
+                start_value=100, memmap_file=os.path.join(directory, "cumulative.npy"), chunk_size=3)
+            pd.testing.assert_frame_equal(memmap_path, cumulative_path)
+            del memmap_path
+
+    def test_path_dataframe_is_read_only(self):
+        path = LinearPath(daily_value=0.01, start_date=self.__start_date, end_date=self.__end_date)
+        path_data_frame = path.get_path_dataframe()
+
+        # Check that the dataframe returned cannot be used to modify the path.
+        with self.assertRaises(ValueError):
+            path_data_frame.iloc[0, 0] = 1.0
+        path_data_frame.rename(columns={0: "Renamed"}, inplace=True)
+        self.assertEqual(path.get_path_dataframe().iloc[0, 0], 0.01)
+        self.assertEqual(list(path.get_path_dataframe().columns), [0])
+
+    def test_repeat_scenarios(self):
+        linear_path = LinearPath(daily_value=0.01, start_date=self.__start_date, end_date=self.__end_date)
+        repeated = linear_path.repeat_scenarios(4).repeat_scenarios(5)
+
+        # Check that a single path is repeated as a view of its values rather than copies.
+        self.assertEqual(repeated.get_number_of_paths(), 20)
+        self.assertTrue(np.shares_memory(repeated.get_path_values(), linear_path.get_path_values()))
+        pd.testing.assert_frame_equal(
+            repeated.get_path_dataframe(),
+            pd.concat([linear_path.get_path_dataframe()] * 20, axis=1, ignore_index=True))
+        pd.testing.assert_frame_equal(
+            repeated.get_cumulative_path(start_value=100),
+            pd.concat([linear_path.get_cumulative_path(start_value=100)] * 20, axis=1, ignore_index=True))
+
+        # Check that several paths are repeated in order.
+        volatile_path = VolatilePath(volatility=0.2, number_of_paths=3, central_path=linear_path, seed=6)
+        pd.testing.assert_frame_equal(
+            volatile_path.repeat_scenarios(2).get_path_dataframe(),
+            pd.concat([volatile_path.get_path_dataframe()] * 2, axis=1, ignore_index=True))
+
+    def test_cumulative_input_is_lazy(self):
+        cumulative = pd.DataFrame({0: [100.0, 110.0, 99.0, 99.0]},
+                                  index=pd.date_range(self.__start_date, periods=4))
+        path = Path(path_cumulative_data_frame=cumulative)
+
+        # Check that returns are found from the cumulative values when first asked for.
+        np.testing.assert_allclose(path.get_path_values()[:, 0], [0.0, 0.1, -0.1, 0.0])
+        self.assertEqual(path.get_number_of_paths(), 1)
+
+    def test_input_dataframe_is_copied(self):
+        returns = pd.DataFrame({0: [0.0, 0.1, -0.1]}, index=pd.date_range(self.__start_date, periods=3))
+        cumulative = pd.DataFrame({0: [100.0, 110.0, 99.0]}, index=pd.date_range(self.__start_date, periods=3))
+        path = Path(path_dataframe=returns)
+        cumulative_path = Path(path_cumulative_data_frame=cumulative)
+
+        # Check that modifying the dataframes after building the paths does not change the paths.
+        returns.iloc[1, 0] = 5.0
+        cumulative.iloc[1, 0] = 500.0
+        np.testing.assert_allclose(path.get_path_dataframe()[0].to_numpy(), [0.0, 0.1, -0.1])
+        np.testing.assert_allclose(cumulative_path.get_path_values()[:, 0], [0.0, 0.1, -0.1])
+
     def test_volatile_path(self):
         volatility = 0.5
         annual_drift = 0.4
         daily_drift = pow(1 + annual_drift, 1 / 255) - 1
         linear_path = LinearPath(daily_value=daily_drift, start_date=self.__start_date, end_date=self.__end_date)
-        volatile_path = VolatilePath(volatility=volatility, number_of_paths=10000, central_path=linear_path)
+        volatile_path = VolatilePath(volatility=volatility, number_of_paths=10000, central_path=linear_path,
+                                     seed=1000)
         path_data_frame = volatile_path.get_path_dataframe()
         std = path_data_frame.std().mean() * pow(255, 0.5)
         mean = pow(1 + path_data_frame.mean().mean(), 255) - 1
@@ -49,6 +128,28 @@ class TestPath(unittest.TestCase):
         self.assertAlmostEqual(std, volatility, 2)
         self.assertAlmostEqual(mean, annual_drift, 2)
 
+    def test_volatile_path_seed(self):
+        linear_path = LinearPath(daily_value=0.001, start_date=self.__start_date, end_date=self.__end_date)
+        first = VolatilePath(volatility=0.2, number_of_paths=5, central_path=linear_path, seed=42)
+        second = VolatilePath(volatility=0.2, number_of_paths=5, central_path=linear_path, seed=42)
+
+        pd.testing.assert_frame_equal(first.get_path_dataframe(), second.get_path_dataframe())
+
+    def test_returns_generator_chunks(self):
+        central_returns = np.full(260, 0.001)
+        for antithetic in [False, True]:
+            all_at_once = ReturnsGenerator(central_returns=central_returns, volatility=0.2, seed=7,
+                                           antithetic=antithetic).generate(number_of_paths=11)
+            chunks = list(ReturnsGenerator(central_returns=central_returns, volatility=0.2, seed=7,
+                                           antithetic=antithetic).generate_chunks(number_of_paths=11, chunk_size=3))
+
+            # Check that generating in chunks gives the same paths as generating them all at once.
+            self.assertTrue(all(chunk.shape[1] <= 4 for chunk in chunks))
+            np.testing.assert_array_equal(np.concatenate(chunks, axis=1), all_at_once)
+
+        # Check that antithetic pairs of paths mirror each other around the central path.
+        np.testing.assert_allclose(all_at_once[:, 0:10:2] + all_at_once[:, 1:10:2], 2 * 0.001)
+
     def test_correlated_path(self):
         volatility = 0.1
         annual_drift = 0.20
@@ -56,19 +157,23 @@ class TestPath(unittest.TestCase):
         correlated_vols = 0.1
         correlation = 0.8
         linear_path = LinearPath(daily_value=daily_drift, start_date=self.__start_date, end_date=self.__end_date)
-        path_to_correlate_with = VolatilePath(volatility=volatility, number_of_paths=1, central_path=linear_path)
+        path_to_correlate_with = VolatilePath(volatility=volatility, number_of_paths=1, central_path=linear_path,
+                                              seed=1000)
 
         correlated_path = CorrelatedPath(
             correlation=correlation,
             annual_volatility=correlated_vols,
             number_of_paths=2000,
-            central_path=path_to_correlate_with)
+            central_path=path_to_correlate_with,
+            seed=1001)
 
         correlations = correlated_path.get_correlations()
         correlation_mean = correlations.mean()
         std_mean = correlated_path.get_path_dataframe().std().mean() * pow(255, 0.5)
 
-        self.assertAlmostEqual(correlation_mean, correlation, 2)
+        # every path shares the common factor of the uniform correlation matrix, so the mean sample correlation over a
+        # year of working days has a standard error of about 0.01, and is checked to within three standard errors
+        self.assertAlmostEqual(correlation_mean, correlation, delta=0.03)
         self.assertAlmostEqual(std_mean, correlated_vols, 2)
 
     def test_multi_volatile_to_correlated_path(self):
@@ -78,15 +183,75 @@ class TestPath(unittest.TestCase):
         correlated_vols = 0.05
         correlation = 0.5
         linear_path = LinearPath(daily_value=daily_drift, start_date=self.__start_date, end_date=self.__end_date)
-        path_to_correlate_with = VolatilePath(volatility=volatility, number_of_paths=2, central_path=linear_path)
+        path_to_correlate_with = VolatilePath(volatility=volatility, number_of_paths=2, central_path=linear_path,
+                                              seed=1000)
 
         correlated_path = CorrelatedPath(
             correlation=correlation,
             annual_volatility=correlated_vols,
             number_of_paths=2,
-            central_path=path_to_correlate_with)
+            central_path=path_to_correlate_with,
+            seed=1001)
         correlated_path_data_frame = correlated_path.get_path_dataframe()
 
         std_mean = correlated_path_data_frame.std().mean() * pow(255, 0.5)
 
         self.assertAlmostEqual(std_mean, correlated_vols, 2)
+
+    def test_multi_asset_path(self):
+        correlation_matrix = np.array([[1.0, 0.6, -0.3], [0.6, 1.0, 0.2], [-0.3, 0.2, 1.0]])
+        volatilities = [0.1, 0.2, 0.3]
+        central_paths = [LinearPath(daily_value=0.0, start_date=self.__start_date, end_date=self.__end_date)] * 3
+        paths = MultiAssetPath(
+            central_paths=central_paths,
+            volatilities=volatilities,
+            correlation_matrix=correlation_matrix,
+            number_of_paths=400,
+            seed=1000).get_paths()
+        returns = np.stack([path.get_path_dataframe().to_numpy() for path in paths])
+
+        # Check the correlation between securities and the volatility of each security over all paths.
+        np.testing.assert_allclose(np.corrcoef(returns.reshape(3, -1)), correlation_matrix, atol=0.01)
+        np.testing.assert_allclose(returns.reshape(3, -1).std(axis=1) * pow(255, 0.5), volatilities, rtol=0.01)
+
+    def test_correlation_factor(self):
+        correlation_matrix = np.array([[1.0, 0.5], [0.5, 1.0]])
+        factor = get_correlation_factor(correlation_matrix)
+
+        # Check that the factor is cached and reproduces the matrix.
+        self.assertIs(factor, get_correlation_factor(correlation_matrix.copy()))
+        np.testing.assert_allclose(factor @ factor.T, correlation_matrix)
+
+        not_positive_definite = np.array([[1.0, 0.9, -0.9], [0.9, 1.0, 0.9], [-0.9, 0.9, 1.0]])
+        repaired_factor = get_correlation_factor(not_positive_definite)
+        repaired = repaired_factor @ repaired_factor.T
+
+        # Check that a matrix which is not positive definite is repaired to a valid correlation matrix.
+        np.testing.assert_allclose(np.diag(repaired), 1.0)
+        self.assertTrue((np.linalg.eigvalsh(repaired) > 0).all())
+
+    def test_business_calendar(self):
+        christmas = datetime.datetime(2023, 12, 25, 0, 0)
+        calendar = BusinessCalendar(holidays=[christmas, datetime.datetime(2023, 12, 26, 0, 0)])
+        dates = LinearPath(daily_value=0.001, start_date=self.__start_date, end_date=self.__end_date,
+                           calendar=calendar).get_path_dataframe().index
+
+        # Check that the dates are the working days only, without weekends or holidays.
+        self.assertEqual(len(dates), 259)
+        self.assertFalse((dates.dayofweek >= 5).any())
+        self.assertNotIn(christmas, dates)
+        self.assertEqual(dates[-1], datetime.datetime(2024, 12, 13, 0, 0))
+
+        # Check that grids are cached by dates and calendar, equal calendars sharing a grid.
+        same_calendar = BusinessCalendar(holidays=[datetime.datetime(2023, 12, 26, 0, 0), christmas])
+        self.assertEqual(same_calendar, calendar)
+        self.assertIs(get_business_day_grid(start_date=self.__start_date, end_date=self.__end_date,
+                                            calendar=same_calendar), dates)
+
+        # Check that the working days next to a weekend and a holiday skip them.
+        self.assertEqual(get_next_working_day(datetime.datetime(2023, 12, 15, 0, 0)),
+                         datetime.datetime(2023, 12, 18, 0, 0))
+        self.assertEqual(get_previous_working_day(datetime.datetime(2023, 12, 18, 0, 0)),
+                         datetime.datetime(2023, 12, 15, 0, 0))
+        self.assertEqual(get_next_working_day(datetime.datetime(2023, 12, 22, 0, 0), calendar=calendar),
+                         datetime.datetime(2023, 12, 27, 0, 0))
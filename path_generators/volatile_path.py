@@ -1,8 +1,6 @@
-import random
-
 from path_generators.path import Path
+from path_generators.returns_generator import ReturnsGenerator
 import pandas as pd
-import numpy as np
 
 
 class VolatilePath(Path):
@@ -10,7 +8,7 @@ class VolatilePath(Path):
     Produces a volatile path from a given central path.
     """
 
-    def __init__(self, *, volatility, number_of_paths, central_path):
+    def __init__(self, *, volatility, number_of_paths, central_path, seed=None, antithetic=False):
         """
         Initialize the Volatile Path Class
 
@@ -19,25 +17,22 @@ class VolatilePath(Path):
         volatility: float
         number_of_paths: int
         central_path: Path
+        seed: optional int for reproducible paths
+        antithetic: bool, if True pairs of paths use a draw and its negation
         """
         if isinstance(central_path, Path):
             central_path_data_frame = central_path.get_path_dataframe()
             central_path_data_frame.rename(columns={0: "Central Path"}, inplace=True)
             self.central_path = Path(path_dataframe=central_path_data_frame)
-            central_path_df = self.central_path.get_path_dataframe()
-            number_of_returns = len(central_path_df)
-
-            daily_volatility = volatility / pow(self.DAYS_IN_YEAR, 0.5)
-            uncorrelated = np.random.standard_normal((number_of_paths, number_of_returns)).transpose()
 
-            correlated_path_dict = {}
-            for i in range(central_path_df.shape[0]):
-                date = central_path_df.index[i]
-                selected = uncorrelated[i]
-                drift = central_path_df.loc[date, "Central Path"]
-                correlated_path_dict[date] = [s * daily_volatility + drift for s in selected]
+            returns_generator = ReturnsGenerator(
+                central_returns=central_path_data_frame["Central Path"].to_numpy(),
+                volatility=volatility,
+                seed=seed,
+                antithetic=antithetic)
+            returns = returns_generator.generate(number_of_paths=number_of_paths)
 
-            path = pd.DataFrame.from_dict(correlated_path_dict, orient='index')
+            path = pd.DataFrame(returns, index=central_path_data_frame.index)
             super().__init__(path_dataframe=path)
         else:
             raise ValueError("Path is wrong object")
@@ -0,0 +1,160 @@
+from datetime import datetime
+
+import numpy as np
+
+from marketData.market_id import PriceId, VolatilityId, RiskFreeRateId
+from portfolio.portfolio import Portfolio
+from positions import common_stock
+from positions import option
+
+STOCK = 0
+CALL = 1
+PUT = 2
+OPTION_TYPE_CODES = {'call': CALL, 'put': PUT}
+OPTION_TYPES = {CALL: 'call', PUT: 'put'}
+NO_EXPIRY = 0
+
+
+class ColumnarPortfolio:
+    """ Columnar Portfolio Class
+    Holds positions as a structure of arrays, one entry per position, so that large books can be valued in groups
+    rather than one position object at a time.
+
+    Stocks have a strike of NaN and an expiry ordinal of zero.
+    """
+
+    def __init__(self, *, security_ids, security_index, quantity, type_code, strike, expiry_ordinal):
+        """
+        Initialize the Columnar Portfolio Class.
+
+        Parameters
+        ----------
+        security_ids: sequence of the distinct security ids, indexed by the security index
+        security_index: array like of int, the position of each position's security id in security_ids
+        quantity: array like of float
+        type_code: array like of int, STOCK, CALL or PUT
+        strike: array like of float
+        expiry_ordinal: array like of int, the proleptic Gregorian ordinal of each expiry date
+        """
+        self.__security_ids = tuple(security_ids)
+        columns = (np.array(security_index, dtype=np.int64),
+                   np.array(quantity, dtype=np.float64),
+                   np.array(type_code, dtype=np.int8),
+                   np.array(strike, dtype=np.float64),
+                   np.array(expiry_ordinal, dtype=np.int64))
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("Every column must have one entry for each position")
+        for column in columns:
+            column.flags.writeable = False
+        self.__security_index, self.__quantity, self.__type_code, self.__strike, self.__expiry_ordinal = columns
+
+    def __len__(self):
+        return len(self.__quantity)
+
+    def get_security_ids(self):
+        return self.__security_ids
+
+    def get_security_index(self):
+        return self.__security_index
+
+    def get_quantity(self):
+        return self.__quantity
+
+    def get_type_code(self):
+        return self.__type_code
+
+    def get_strike(self):
+        return self.__strike
+
+    def get_expiry_ordinal(self):
+        return self.__expiry_ordinal
+
+    def get_market_ids(self):
+        """
+        Gets the market ids needed to value the positions.
+
+        :return: set of MarketId
+        """
+        market_ids = set()
+        for index, security_id in enumerate(self.__security_ids):
+            held = self.__security_index == index
+            if not held.any():
+                continue
+            market_ids.add(PriceId(security_id=security_id))
+            if (self.__type_code[held] != STOCK).any():
+                market_ids.add(VolatilityId(security_id=security_id))
+                market_ids.add(RiskFreeRateId(security_id=security_id))
+        return market_ids
+
+
+def to_columnar_portfolio(portfolio):
+    """
+    Converts a portfolio of position objects into columns.
+
+    Parameters
+    ----------
+    portfolio: Portfolio or iterable of Position
+
+    Returns ColumnarPortfolio
+    -------
+    """
+    positions = portfolio.get_positions() if isinstance(portfolio, Portfolio) else tuple(portfolio)
+    security_ids = list(dict.fromkeys(position.get_security_id() for position in positions))
+    security_to_index = {security_id: index for index, security_id in enumerate(security_ids)}
+
+    type_code = np.empty(len(positions), dtype=np.int8)
+    strike = np.full(len(positions), np.nan)
+    expiry_ordinal = np.full(len(positions), NO_EXPIRY, dtype=np.int64)
+    for index, position in enumerate(positions):
+        if isinstance(position, common_stock.CommonStock):
+            type_code[index] = STOCK
+        elif isinstance(position, option.Option):
+            if position.option_type not in OPTION_TYPE_CODES:
+                raise ValueError("Option type {} is not call or put".format(position.option_type))
+            type_code[index] = OPTION_TYPE_CODES[position.option_type]
+            strike[index] = position.strike
+            expiry_ordinal[index] = position.expiry.toordinal()
+        else:
+            raise ValueError("Position type {} cannot be held in columns".format(position.get_type()))
+
+    return ColumnarPortfolio(
+        security_ids=security_ids,
+        security_index=[security_to_index[position.get_security_id()] for position in positions],
+        quantity=[position.get_quantity() for position in positions],
+        type_code=type_code,
+        strike=strike,
+        expiry_ordinal=expiry_ordinal)
+
+
+def from_columnar_portfolio(columnar_portfolio):
+    """
+    Converts columns back into a portfolio of position objects.
+
+    Quantities come back as floats and expiries as midnight on the expiry date.
+
+    Parameters
+    ----------
+    columnar_portfolio: ColumnarPortfolio
+
+    Returns Portfolio
+    -------
+    """
+    security_ids = columnar_portfolio.get_security_ids()
+    portfolio = Portfolio()
+    for security_index, quantity, type_code, strike, expiry_ordinal in zip(
+            columnar_portfolio.get_security_index().tolist(),
+            columnar_portfolio.get_quantity().tolist(),
+            columnar_portfolio.get_type_code().tolist(),
+            columnar_portfolio.get_strike().tolist(),
+            columnar_portfolio.get_expiry_ordinal().tolist()):
+        if type_code == STOCK:
+            position = common_stock.CommonStock(security_id=security_ids[security_index], quantity=quantity)
+        else:
+            position = option.Option(
+                security_id=security_ids[security_index],
+                quantity=quantity,
+                expiry=datetime.fromordinal(expiry_ordinal),
+                strike=strike,
+                option_type=OPTION_TYPES[type_code])
+        portfolio.add_position(position=position)
+    return portfolio
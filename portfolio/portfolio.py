@@ -1,4 +1,4 @@
-import copy
+import hashlib
 
 from positions import financial_position
 
@@ -10,20 +10,47 @@ class Portfolio:
 
     def __init__(self):
         self.__positions = []
+        self.__fingerprint = None
 
     def add_position(self, *, position: financial_position.Position):
         """
         Adds position to the portfolio.
 
+        Positions are immutable, so the position is held without copying.
+
+        :param position: Position
+        :return: none
+        """
+        self.__positions.append(position)
+        self.__fingerprint = None
+
+    def remove_position(self, *, position: financial_position.Position):
+        """
+        Removes the first position in the portfolio equal to the position given.
+
         :param position: Position
         :return: none
         """
-        self.__positions.append(copy.deepcopy(position))
+        self.__positions.remove(position)
+        self.__fingerprint = None
 
     def get_positions(self):
         """
         Gets positions in the portfolio.
 
-        :return: List of Positions
+        :return: tuple of Positions
+        """
+        return tuple(self.__positions)
+
+    def get_fingerprint(self):
+        """
+        Gets a fingerprint of the content of the portfolio.
+
+        Two portfolios holding the same positions in the same order have the same fingerprint.
+
+        :return: str
         """
-        return copy.deepcopy(self.__positions)
+        if self.__fingerprint is None:
+            keys = repr([position.get_key() for position in self.__positions])
+            self.__fingerprint = hashlib.blake2b(keys.encode(), digest_size=16).hexdigest()
+        return self.__fingerprint
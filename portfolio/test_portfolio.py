@@ -23,3 +23,25 @@ class TestPortfolio(unittest.TestCase):
 
 
         self.assertEqual(len(portfolio), 2)
+
+    def test_positions_are_immutable(self):
+        portfolio = Portfolio()
+        position = option.Option(
+            security_id=1,
+            quantity=1,
+            expiry=datetime.datetime(2024, 1, 15, 0, 0),
+            strike=1.2,
+            option_type="call")
+        portfolio.add_position(position=position)
+
+        # Check that positions cannot be modified once held by the portfolio.
+        with self.assertRaises(AttributeError):
+            position.strike = 2.0
+        with self.assertRaises(AttributeError):
+            portfolio.get_positions()[0].option_type = "put"
+        with self.assertRaises(AttributeError):
+            portfolio.get_positions().append(position)
+
+        self.assertEqual(portfolio.get_positions()[0].strike, 1.2)
+        self.assertEqual(len(portfolio.get_positions()), 1)
+
@@ -3,6 +3,8 @@ from securities import equity
 
 
 class CommonStock(financial_position.Position):
+    __slots__ = ()
+
     def __init__(self, *, security_id, quantity):
         security = equity.Equity(security_id=security_id)
         super().__init__(security=security, quantity=quantity)
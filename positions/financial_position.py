@@ -1,20 +1,47 @@
-import copy
-
-
 class Position:
     """ Position Class
     An absract class representing a Financial Position.
+
+    Positions are immutable, so they can be shared without copying.
     """
 
+    __slots__ = ('__security', '__quantity')
+
     def __init__(self, *, security, quantity):
-        self.__security = copy.deepcopy(security)
-        self.__quantity = copy.deepcopy(quantity)
+        object.__setattr__(self, '_Position__security', security)
+        object.__setattr__(self, '_Position__quantity', quantity)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __setstate__(self, state):
+        # used by copy and pickle, which would otherwise restore slots through __setattr__
+        _, slot_state = state
+        for name, value in slot_state.items():
+            object.__setattr__(self, name, value)
+
+    def __eq__(self, other):
+        return isinstance(other, Position) and self.get_key() == other.get_key()
+
+    def __hash__(self):
+        return hash(self.get_key())
+
+    def get_key(self):
+        """
+        Gets a tuple identifying the content of the position, used for equality and fingerprints.
+
+        :return: tuple
+        """
+        return type(self).__name__, self.get_security_id(), self.get_quantity()
 
     def get_security_id(self):
         return self.__security.get_security_id()
 
     def get_quantity(self):
-        return copy.deepcopy(self.__quantity)
+        return self.__quantity
 
     def get_type(self):
         return 0
@@ -15,6 +15,8 @@ class Option(financial_position.Position):
 
     """
 
+    __slots__ = ('expiry', 'strike', 'option_type')
+
     def __init__(self, *, security_id, quantity, expiry, strike, option_type):
         """
         Initialise an Option
@@ -27,9 +29,12 @@ class Option(financial_position.Position):
         """
         security = equity.Equity(security_id=security_id)
         super().__init__(security=security, quantity=quantity)
-        self.expiry = expiry
-        self.strike = strike
-        self.option_type = option_type
+        object.__setattr__(self, 'expiry', expiry)
+        object.__setattr__(self, 'strike', strike)
+        object.__setattr__(self, 'option_type', option_type)
+
+    def get_key(self):
+        return super().get_key() + (self.expiry, self.strike, self.option_type)
 
     def get_type(self):
         return self.option_type
@@ -2,5 +2,7 @@ from securities import financial_security
 
 
 class Equity(financial_security.Security):
+    __slots__ = ()
+
     def __init__(self, *, security_id):
         super().__init__(security_id=security_id)
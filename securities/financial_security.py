@@ -1,18 +1,31 @@
-import copy
-
-
 class Security:
     """ Security Class
     An absract class representing a Security
+
+    Securities are immutable, so they can be shared without copying.
     """
 
+    __slots__ = ('__security_id',)
+
     def __init__(self, *, security_id):
         """
         Initialize the Security Class.
 
         :param security_id: MarketId
         """
-        self.__security_id = copy.deepcopy(security_id)
+        object.__setattr__(self, '_Security__security_id', security_id)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __setstate__(self, state):
+        # used by copy and pickle, which would otherwise restore slots through __setattr__
+        _, slot_state = state
+        for name, value in slot_state.items():
+            object.__setattr__(self, name, value)
 
     def get_security_id(self):
         """
@@ -20,4 +33,4 @@ class Security:
 
         :return: MarketId
         """
-        return copy.deepcopy(self.__security_id)
+        return self.__security_id
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+from path_generators.path import Path
+
+DATE_COLUMN = 'date'
+DEFAULT_ROW_GROUP_SIZE = 64
+
+
+def _import_pyarrow():
+    """
+    Imports pyarrow, which is only needed for Parquet files and so is not a requirement of the rest of the project.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow is needed to read and write Parquet files, install it with pip install pyarrow") \
+            from None
+    return pyarrow, pyarrow.parquet
+
+
+def write_scenario_frame(data_frame, file_path, *, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Writes a dataframe of date to scenario values to a Parquet file.
+
+    Each scenario is a float64 column named by its position, so readers can load a subset of scenarios without reading
+    the others. Dates are written in row groups of row_group_size, whose statistics let readers skip the row groups
+    outside a date range.
+
+    Parameters
+    ----------
+    data_frame: DataFrame indexed by date with one column per scenario
+    file_path: str or path
+    row_group_size: int, number of dates in each row group
+
+    Returns none
+    -------
+    """
+    pyarrow, parquet = _import_pyarrow()
+    values = data_frame.to_numpy(dtype=np.float64)
+    arrays = [pyarrow.array(pd.DatetimeIndex(data_frame.index))]
+    arrays.extend(pyarrow.array(values[:, scenario]) for scenario in range(values.shape[1]))
+    names = [DATE_COLUMN] + [str(scenario) for scenario in range(values.shape[1])]
+    parquet.write_table(pyarrow.Table.from_arrays(arrays, names=names), file_path, row_group_size=row_group_size)
+
+
+def read_scenario_frame(file_path, *, start_date=None, end_date=None, scenarios=None):
+    """
+    Reads a dataframe of date to scenario values written by write_scenario_frame.
+
+    Only the scenario columns asked for are read, and row groups outside the date range are skipped.
+
+    Parameters
+    ----------
+    file_path: str or path
+    start_date: optional datetime, the first date to read
+    end_date: optional datetime, the last date to read
+    scenarios: optional list of int, the scenario numbers to read, all scenarios are read if not given
+
+    Returns DataFrame indexed by date with a column for each scenario read, labelled by scenario number
+    -------
+    """
+    _, parquet = _import_pyarrow()
+    filters = []
+    if start_date is not None:
+        filters.append((DATE_COLUMN, '>=', pd.Timestamp(start_date)))
+    if end_date is not None:
+        filters.append((DATE_COLUMN, '<=', pd.Timestamp(end_date)))
+    columns = None if scenarios is None else [DATE_COLUMN] + [str(scenario) for scenario in scenarios]
+
+    table = parquet.read_table(file_path, columns=columns, filters=filters or None)
+    names = [name for name in table.column_names if name != DATE_COLUMN]
+    values = np.column_stack([table.column(name).to_numpy() for name in names]) if names \
+        else np.empty((table.num_rows, 0))
+    return pd.DataFrame(values,
+                        index=pd.DatetimeIndex(table.column(DATE_COLUMN).to_numpy()),
+                        columns=[int(name) for name in names])
+
+
+def save_path(path, file_path, *, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Saves the daily returns of a path to a Parquet file.
+
+    :param path: Path
+    :param file_path: str or path
+    :param row_group_size: int, number of dates in each row group
+    :return: none
+    """
+    write_scenario_frame(path.get_path_dataframe(), file_path, row_group_size=row_group_size)
+
+
+def open_path(file_path, *, start_date=None, end_date=None, scenarios=None):
+    """
+    Opens a path saved by save_path, reading only the dates and scenarios asked for.
+
+    :param file_path: str or path
+    :param start_date: optional datetime, the first date to read
+    :param end_date: optional datetime, the last date to read
+    :param scenarios: optional list of int, the scenario numbers to read
+    :return: Path
+    """
+    return Path(path_dataframe=read_scenario_frame(
+        file_path,
+        start_date=start_date,
+        end_date=end_date,
+        scenarios=scenarios))
+
+
+def save_portfolio_valuations(scenario_valuation, file_path, *, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    Saves the portfolio value of every scenario on every date to a Parquet file.
+
+    :param scenario_valuation: ScenarioValuation
+    :param file_path: str or path
+    :param row_group_size: int, number of dates in each row group
+    :return: none
+    """
+    write_scenario_frame(scenario_valuation.get_batch_valuation().get_portfolio_valuation(), file_path,
+                         row_group_size=row_group_size)
+
+
+def open_portfolio_valuations(file_path, *, start_date=None, end_date=None, scenarios=None):
+    """
+    Opens portfolio values saved by save_portfolio_valuations, reading only the dates and scenarios asked for.
+
+    :param file_path: str or path
+    :param start_date: optional datetime, the first date to read
+    :param end_date: optional datetime, the last date to read
+    :param scenarios: optional list of int, the scenario numbers to read
+    :return: DataFrame indexed by date with a column for each scenario read
+    """
+    return read_scenario_frame(file_path, start_date=start_date, end_date=end_date, scenarios=scenarios)
@@ -0,0 +1,54 @@
+import datetime
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from path_generators.linear_path import LinearPath
+from path_generators.volatile_path import VolatilePath
+from storage.parquet_store import open_path, read_scenario_frame, save_path, write_scenario_frame
+
+
+@unittest.skipIf(importlib.util.find_spec('pyarrow') is None, "pyarrow is not installed")
+class TestParquetStore(unittest.TestCase):
+
+    def setUp(self):
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__file_path = os.path.join(self.__directory.name, 'scenarios.parquet')
+        central_path = LinearPath(
+            daily_value=0.0004,
+            start_date=datetime.datetime(2023, 12, 15, 0, 0),
+            end_date=datetime.datetime(2024, 12, 15, 0, 0))
+        self.__path = VolatilePath(volatility=0.2, number_of_paths=6, central_path=central_path, seed=4)
+
+    def tearDown(self):
+        self.__directory.cleanup()
+
+    def test_save_and_open_path(self):
+        save_path(self.__path, self.__file_path)
+        path_data_frame = self.__path.get_path_dataframe()
+
+        # Check that the whole path is read back unchanged.
+        np.testing.assert_array_equal(open_path(self.__file_path).get_path_dataframe().to_numpy(),
+                                      path_data_frame.to_numpy())
+
+        # Check that only the dates and scenarios asked for are read.
+        start_date = datetime.datetime(2024, 3, 1, 0, 0)
+        end_date = datetime.datetime(2024, 4, 30, 0, 0)
+        subset = open_path(self.__file_path, start_date=start_date, end_date=end_date, scenarios=[1, 4])
+        expected = path_data_frame.loc[start_date:end_date, [1, 4]]
+        self.assertEqual(list(subset.get_path_dataframe().columns), [1, 4])
+        self.assertTrue(subset.get_path_dataframe().index.equals(expected.index))
+        np.testing.assert_array_equal(subset.get_path_dataframe().to_numpy(), expected.to_numpy())
+
+    def test_scenario_frame_columns_are_scenario_numbers(self):
+        data_frame = self.__path.get_cumulative_path(start_value=100)
+        data_frame.columns = ['portfolio'] * data_frame.shape[1]
+        write_scenario_frame(data_frame, self.__file_path, row_group_size=16)
+
+        # Check that scenarios are numbered by position whatever the labels written.
+        read = read_scenario_frame(self.__file_path, scenarios=[5])
+        self.assertEqual(list(read.columns), [5])
+        np.testing.assert_array_equal(read[5].to_numpy(), data_frame.iloc[:, 5].to_numpy())
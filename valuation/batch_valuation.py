@@ -0,0 +1,308 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from marketData.market_data_service import MarketDataService
+from marketData.market_id import PriceId, VolatilityId, RiskFreeRateId
+from portfolio.columnar_portfolio import to_columnar_portfolio
+from portfolio.portfolio import Portfolio
+from positions import financial_position
+from positions import common_stock
+from positions import option
+from valuation import portfolio_valuation
+from valuation.black_scholes import black_scholes_price, year_fractions
+from valuation.columnar_valuation import columnar_portfolio_values, forward_fill
+from valuation.window_statistics import WindowStatistics, get_window_indices
+
+
+def position_values(*, position_to_value, market_data_service, number_of_scenarios):
+    """
+    Values a position for every date and every scenario held by the market data service.
+
+    Dates after the expiry of an option hold the last value before expiry.
+
+    Parameters
+    ----------
+    position_to_value: Position
+    market_data_service: MarketDataService
+    number_of_scenarios: int
+
+    Returns ndarray shaped (date, scenario)
+    -------
+    """
+    if not isinstance(position_to_value, financial_position.Position):
+        raise ValueError("Must be a position to find present value")
+
+    security_id = position_to_value.get_security_id()
+    quantity = position_to_value.get_quantity()
+    price = market_data_service.get_market_data_values(
+        market_id=PriceId(security_id=security_id))[:, :number_of_scenarios]
+
+    if isinstance(position_to_value, common_stock.CommonStock):
+        return price * quantity
+    if isinstance(position_to_value, option.Option):
+        expiry = position_to_value.expiry
+        dates = market_data_service.get_dates()
+        volatility = market_data_service.get_market_data_values(
+            market_id=VolatilityId(security_id=security_id))[:, :number_of_scenarios]
+        risk_free_rate = market_data_service.get_market_data_values(
+            market_id=RiskFreeRateId(security_id=security_id))[:, :number_of_scenarios]
+
+        values = black_scholes_price(
+            option_type=position_to_value.option_type,
+            spot=price,
+            strike=position_to_value.strike,
+            volatility=volatility,
+            risk_free_rate=risk_free_rate,
+            time_to_expiry=year_fractions(dates=dates, expiry=expiry).reshape(-1, 1))
+
+        # use the final value of an option if it has expired
+        values = np.where(np.asarray(dates > expiry).reshape(-1, 1), np.nan, values)
+        return forward_fill(values * quantity)
+    raise ValueError("Position type {} cannot be valued".format(position_to_value.get_type()))
+
+
+def get_number_scenarios(*, portfolio, market_data_service):
+    """
+    Gets the number of scenarios available for all the market data required to value a portfolio.
+
+    Parameters
+    ----------
+    portfolio: Portfolio
+    market_data_service: MarketDataService
+
+    Returns int
+    -------
+    """
+    required_market_ids = portfolio_valuation.get_market_ids(portfolio)
+    return min([market_data_service.get_number_scenarios(market_id=market_id) for market_id in required_market_ids])
+
+
+def sharpe_ratios(values, *, start_index, end_index):
+    """
+    Gets the sharpe ratio of each scenario between two date positions.
+
+    Parameters
+    ----------
+    values: ndarray shaped (date, scenario)
+    start_index: int
+    end_index: int
+
+    Returns ndarray
+    -------
+    """
+    return WindowStatistics(values).get_sharpe_ratio(start_index=start_index, end_index=end_index)
+
+
+class BatchValuation:
+    """ Batch Valuation Class
+    Values every position of a portfolio for every date and every scenario in one pass.
+
+    The portfolio is valued with its positions grouped by security, type and expiry. The values of single positions are
+    not held, unless they are given, and a position is only priced alone when it is added or removed.
+    """
+
+    def __init__(self, *, portfolio, market_data_service: MarketDataService, number_of_scenarios=None,
+                 position_valuations=None, portfolio_values=None):
+        """
+        Initialize the Batch Valuation Class.
+
+        Parameters
+        ----------
+        portfolio: Portfolio
+        market_data_service: MarketDataService
+        number_of_scenarios: int, defaults to the number of scenarios available for all required market data
+        position_valuations: optional list of ndarray shaped (date, scenario), values already found for each position
+            of the portfolio, which are used instead of pricing the positions
+        portfolio_values: optional ndarray shaped (date, scenario), values already found for the whole portfolio, such
+            as by a process pool, which are used instead of pricing the positions
+        """
+        if not isinstance(portfolio, Portfolio):
+            raise ValueError("Must be of type {} but was {}".format(Portfolio, portfolio))
+        if number_of_scenarios is None:
+            number_of_scenarios = get_number_scenarios(portfolio=portfolio, market_data_service=market_data_service)
+
+        self.__market_data_service = market_data_service
+        self.__number_of_scenarios = number_of_scenarios
+        self.__dates = market_data_service.get_dates()
+        self.__positions = list(portfolio.get_positions())
+        if position_valuations is not None:
+            if len(position_valuations) != len(self.__positions):
+                raise ValueError("There must be one valuation for each of the {} positions".format(
+                    len(self.__positions)))
+            self.__position_values = list(position_valuations)
+            portfolio_values = np.zeros((len(self.__dates), number_of_scenarios))
+            for values in self.__position_values:
+                portfolio_values += np.nan_to_num(values)
+        else:
+            self.__position_values = [None] * len(self.__positions)
+            if portfolio_values is None:
+                portfolio_values = columnar_portfolio_values(
+                    columnar_portfolio=to_columnar_portfolio(self.__positions),
+                    market_data_service=market_data_service,
+                    number_of_scenarios=number_of_scenarios)
+            else:
+                portfolio_values = np.array(portfolio_values, dtype=np.float64)
+
+        portfolio_values.flags.writeable = False
+        self.__portfolio_values = portfolio_values
+        self.__window_statistics = None
+
+    def __copy__(self):
+        """
+        Copies the valuation, sharing the read only value matrices, so that positions can be added to or removed
+        from the copy without changing the original.
+        """
+        duplicate = object.__new__(BatchValuation)
+        duplicate.__dict__.update(self.__dict__)
+        duplicate.__positions = list(self.__positions)
+        duplicate.__position_values = list(self.__position_values)
+        return duplicate
+
+    def __value_position(self, position):
+        values = position_values(
+            position_to_value=position,
+            market_data_service=self.__market_data_service,
+            number_of_scenarios=self.__number_of_scenarios)
+        values.flags.writeable = False
+        return values
+
+    def __get_position_values(self, index):
+        if self.__position_values[index] is None:
+            return self.__value_position(self.__positions[index])
+        return self.__position_values[index]
+
+    def __set_portfolio_values(self, portfolio_values):
+        # a new matrix is made on each change so matrices already handed out are never modified
+        portfolio_values.flags.writeable = False
+        self.__portfolio_values = portfolio_values
+        self.__window_statistics = None
+
+    def add_position(self, *, position):
+        """
+        Adds a position, pricing only that position and adding it into the portfolio values.
+
+        :param position: Position
+        :return: none
+        """
+        values = self.__value_position(position)
+        self.__positions.append(position)
+        self.__position_values.append(None)
+        self.__set_portfolio_values(self.__portfolio_values + np.nan_to_num(values))
+
+    def remove_position(self, *, position):
+        """
+        Removes a position, subtracting its values from the portfolio values.
+
+        :param position: Position
+        :return: none
+        """
+        index = self.__positions.index(position)
+        values = self.__get_position_values(index)
+        del self.__position_values[index]
+        del self.__positions[index]
+        self.__set_portfolio_values(self.__portfolio_values - np.nan_to_num(values))
+
+    def update_portfolio(self, *, portfolio):
+        """
+        Brings the valuation in line with a portfolio, only pricing the positions which are not yet valued and
+        subtracting the positions which are no longer held.
+
+        :param portfolio: Portfolio
+        :return: none
+        """
+        to_add = Counter(portfolio.get_positions())
+        to_add.subtract(self.__positions)
+        for position, count in to_add.items():
+            for _ in range(-count):
+                self.remove_position(position=position)
+        for position, count in to_add.items():
+            for _ in range(count):
+                self.add_position(position=position)
+
+    def get_positions(self):
+        """
+        Gets the positions valued, in the order of their value matrices.
+
+        :return: tuple of Positions
+        """
+        return tuple(self.__positions)
+
+    def get_dates(self):
+        """
+        Gets the valuation dates.
+
+        :return: Index
+        """
+        return self.__dates
+
+    def get_number_scenarios(self):
+        """
+        Gets the number of scenarios valued.
+
+        :return: int
+        """
+        return self.__portfolio_values.shape[1]
+
+    def get_nbytes(self):
+        """
+        Gets the number of bytes held by the valuation arrays.
+
+        :return: int
+        """
+        return self.__portfolio_values.nbytes + sum(values.nbytes for values in self.__position_values
+                                                    if values is not None)
+
+    def get_position_valuations(self):
+        """
+        Gets the value of each position, each shaped (date, scenario), pricing alone each position not held.
+
+        :return: list of ndarray
+        """
+        return [self.__get_position_values(index) for index in range(len(self.__positions))]
+
+    def get_portfolio_valuation_matrix(self):
+        """
+        Gets a read only matrix of portfolio values shaped (date, scenario).
+
+        :return: ndarray
+        """
+        return self.__portfolio_values
+
+    def get_portfolio_valuation(self):
+        """
+        Gets the portfolio values as a dataframe with index as date and one column per scenario.
+
+        :return: DataFrame
+        """
+        return pd.DataFrame(self.__portfolio_values, index=self.__dates)
+
+    def get_window_statistics(self):
+        """
+        Gets the window statistics of every scenario, found once until the positions change.
+
+        :return: WindowStatistics
+        """
+        if self.__window_statistics is None:
+            self.__window_statistics = WindowStatistics(self.__portfolio_values)
+        return self.__window_statistics
+
+    def get_sharpe_ratios(self, *, start_date, end_date):
+        """
+        Gets the sharpe ratio of every scenario between two dates.
+
+        :param start_date: datetime
+        :param end_date: datetime
+        :return: ndarray
+        """
+        start_index, end_index = get_window_indices(dates=self.__dates, start_date=start_date, end_date=end_date)
+        return self.get_window_statistics().get_sharpe_ratio(start_index=start_index, end_index=end_index)
+
+    def get_sharpe_ratios_max_period(self):
+        """
+        Gets the sharpe ratio of every scenario over all valuation dates.
+
+        :return: ndarray
+        """
+        return self.get_window_statistics().get_sharpe_ratio(start_index=0, end_index=len(self.__dates) - 1)
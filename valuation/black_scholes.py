@@ -0,0 +1,124 @@
+import numpy as np
+
+from path_generators.business_calendar import get_day_counts
+
+DAYS_IN_YEAR = 365.0
+BUSINESS_DAYS_IN_YEAR = 255.0
+
+
+def _import_ndtr():
+    """
+    Imports the normal cdf from scipy, which takes a noticeable part of the start up time and is only needed once an
+    option is valued.
+    """
+    from scipy.special import ndtr
+    return ndtr
+
+
+def year_fractions(*, dates, expiry, calendar=None):
+    """
+    Gets the time to expiry in years from each date, counted in whole calendar days or in working days of a calendar.
+
+    Computed once for a whole date grid so that it can be shared by every scenario.
+
+    Parameters
+    ----------
+    dates: sequence of datetime
+    expiry: datetime
+    calendar: optional BusinessCalendar, if given working days are counted over BUSINESS_DAYS_IN_YEAR
+
+    Returns ndarray
+    -------
+    """
+    days_to_expiry = get_day_counts(dates=dates, end_date=expiry, calendar=calendar)
+    return days_to_expiry / (DAYS_IN_YEAR if calendar is None else BUSINESS_DAYS_IN_YEAR)
+
+
+def black_scholes_price(*, option_type, spot, strike, volatility, risk_free_rate, time_to_expiry):
+    """
+    Prices plain vanilla European options with the closed form Black-Scholes formula.
+
+    All numerical inputs are broadcast against each other, so a single call can price a whole
+    (date, scenario) grid. The put price is found from put-call parity. At expiry the payoff is returned.
+
+    Parameters
+    ----------
+    option_type: str, "call" or "put"
+    spot: float or ndarray
+    strike: float or ndarray
+    volatility: float or ndarray
+    risk_free_rate: float or ndarray
+    time_to_expiry: float or ndarray, in years
+
+    Returns ndarray
+    -------
+    """
+    if option_type not in ("call", "put"):
+        raise ValueError("Option type {} is not call or put".format(option_type))
+    ndtr = _import_ndtr()
+    spot, strike, volatility, risk_free_rate, time_to_expiry = np.broadcast_arrays(
+        *[np.asarray(value, dtype=np.float64) for value in (spot, strike, volatility, risk_free_rate, time_to_expiry)])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        discounted_strike = strike * np.exp(-risk_free_rate * time_to_expiry)
+        vol_sqrt_time = volatility * np.sqrt(time_to_expiry)
+        d1 = (np.log(spot / strike) + (risk_free_rate + 0.5 * volatility ** 2) * time_to_expiry) / vol_sqrt_time
+        d2 = d1 - vol_sqrt_time
+        call = spot * ndtr(d1) - discounted_strike * ndtr(d2)
+
+    at_expiry = time_to_expiry <= 0
+    if option_type == "call":
+        return np.where(at_expiry, np.maximum(spot - strike, 0.0), call)
+    return np.where(at_expiry, np.maximum(strike - spot, 0.0), call + discounted_strike - spot)
+
+
+def black_scholes_strip_value(*, option_type, spot, strikes, quantities, volatility, risk_free_rate, time_to_expiry,
+                              max_elements=2 ** 22):
+    """
+    Values a strip of options of one type and expiry on the same underlying, as the quantity weighted sum of their
+    Black-Scholes prices.
+
+    The terms which do not depend on the strike are found once for the whole grid, and the strikes are priced in
+    parts of at most max_elements values, so each option only adds a subtraction, a division and two normal cdfs.
+
+    Parameters
+    ----------
+    option_type: str, "call" or "put"
+    spot: ndarray shaped (date, scenario)
+    strikes: ndarray of float
+    quantities: ndarray of float, one for each strike
+    volatility: ndarray shaped like spot
+    risk_free_rate: ndarray shaped like spot
+    time_to_expiry: ndarray broadcastable to spot, in years and all above zero
+
+    Returns ndarray shaped like spot
+    -------
+    """
+    if option_type not in ("call", "put"):
+        raise ValueError("Option type {} is not call or put".format(option_type))
+    ndtr = _import_ndtr()
+    strikes = np.asarray(strikes, dtype=np.float64)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    spot, volatility, risk_free_rate, time_to_expiry = np.broadcast_arrays(
+        *[np.asarray(value, dtype=np.float64) for value in (spot, volatility, risk_free_rate, time_to_expiry)])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        discount = np.exp(-risk_free_rate * time_to_expiry)
+        vol_sqrt_time = (volatility * np.sqrt(time_to_expiry))[..., np.newaxis]
+        log_spot_drift = np.log(spot) + (risk_free_rate + 0.5 * volatility ** 2) * time_to_expiry
+        log_spot_drift = log_spot_drift[..., np.newaxis]
+
+        weighted_spot_cdf = np.zeros(spot.shape)
+        weighted_strike_cdf = np.zeros(spot.shape)
+        part_size = max(1, max_elements // max(spot.size, 1))
+        for start in range(0, len(strikes), part_size):
+            part = slice(start, start + part_size)
+            d1 = (log_spot_drift - np.log(strikes[part])) / vol_sqrt_time
+            d2 = d1 - vol_sqrt_time
+            weighted_spot_cdf += ndtr(d1) @ quantities[part]
+            weighted_strike_cdf += ndtr(d2) @ (quantities[part] * strikes[part])
+
+    calls = spot * weighted_spot_cdf - discount * weighted_strike_cdf
+    if option_type == "call":
+        return calls
+    return calls + discount * (quantities @ strikes) - spot * quantities.sum()
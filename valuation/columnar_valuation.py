@@ -0,0 +1,116 @@
+from datetime import datetime
+
+import numpy as np
+
+from marketData.market_id import PriceId, VolatilityId, RiskFreeRateId
+from portfolio.columnar_portfolio import STOCK, OPTION_TYPES
+from valuation.black_scholes import black_scholes_strip_value, year_fractions
+
+
+def forward_fill(values):
+    """
+    Fills NaN values with the last valid value before them along the date axis.
+
+    Parameters
+    ----------
+    values: ndarray shaped (date, scenario)
+
+    Returns ndarray
+    -------
+    """
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(values.shape[0]).reshape(-1, 1), 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    filled = np.take_along_axis(values, index, axis=0)
+    # leading values with nothing before them stay NaN
+    filled[~np.maximum.accumulate(valid, axis=0)] = np.nan
+    return filled
+
+
+def columnar_portfolio_values(*, columnar_portfolio, market_data_service, number_of_scenarios):
+    """
+    Values a columnar portfolio for every date and every scenario held by the market data service.
+
+    Stocks are summed by security and valued with one multiplication. Options are grouped by security, type and expiry,
+    and each group is valued as a strip in one vectorized call, only for the dates before expiry.
+
+    Missing market data is handled as when valuing positions one at a time: option values are forward filled over
+    dates without market data and after expiry, and values which are still missing count as zero.
+
+    Parameters
+    ----------
+    columnar_portfolio: ColumnarPortfolio
+    market_data_service: MarketDataService
+    number_of_scenarios: int
+
+    Returns ndarray shaped (date, scenario)
+    -------
+    """
+    dates = market_data_service.get_dates()
+    date_ordinals = np.array([date.toordinal() for date in dates])
+    security_ids = columnar_portfolio.get_security_ids()
+    security_index = columnar_portfolio.get_security_index()
+    quantity = columnar_portfolio.get_quantity()
+    type_code = columnar_portfolio.get_type_code()
+    strike = columnar_portfolio.get_strike()
+    expiry_ordinal = columnar_portfolio.get_expiry_ordinal()
+
+    portfolio_values = np.zeros((len(dates), number_of_scenarios))
+    if len(columnar_portfolio) == 0:
+        return portfolio_values
+    groups, group_of_position = np.unique(
+        np.column_stack((security_index, type_code, expiry_ordinal)), axis=0, return_inverse=True)
+    group_of_position = group_of_position.reshape(-1)
+
+    for group, (group_security_index, group_type_code, group_expiry_ordinal) in enumerate(groups):
+        in_group = group_of_position == group
+        security_id = security_ids[group_security_index]
+        price = market_data_service.get_market_data_values(
+            market_id=PriceId(security_id=security_id))[:, :number_of_scenarios]
+        if group_type_code == STOCK:
+            portfolio_values += np.nan_to_num(price * quantity[in_group].sum())
+            continue
+
+        # at expiry the options pay out, and dates after expiry hold the last value found
+        live = date_ordinals < group_expiry_ordinal
+        at_expiry = date_ordinals == group_expiry_ordinal
+        group_strike = strike[in_group]
+        group_quantity = quantity[in_group]
+        option_type = OPTION_TYPES[group_type_code]
+
+        group_values = np.full(price.shape, np.nan)
+        if live.any():
+            group_values[live] = black_scholes_strip_value(
+                option_type=option_type,
+                spot=price[live],
+                strikes=group_strike,
+                quantities=group_quantity,
+                volatility=market_data_service.get_market_data_values(
+                    market_id=VolatilityId(security_id=security_id))[live, :number_of_scenarios],
+                risk_free_rate=market_data_service.get_market_data_values(
+                    market_id=RiskFreeRateId(security_id=security_id))[live, :number_of_scenarios],
+                time_to_expiry=year_fractions(
+                    dates=dates[live],
+                    expiry=datetime.fromordinal(int(group_expiry_ordinal))).reshape(-1, 1))
+        if at_expiry.any():
+            group_values[at_expiry] = payoff_value(
+                option_type=option_type,
+                spot=price[at_expiry],
+                strikes=group_strike,
+                quantities=group_quantity)
+        portfolio_values += np.nan_to_num(forward_fill(group_values))
+    return portfolio_values
+
+
+def payoff_value(*, option_type, spot, strikes, quantities):
+    """
+    Gets the quantity weighted payoff at expiry of a strip of options of one type.
+
+    :param option_type: str, "call" or "put"
+    :param spot: ndarray
+    :param strikes: ndarray of float
+    :param quantities: ndarray of float, one for each strike
+    :return: ndarray shaped like spot
+    """
+    intrinsic = spot[..., np.newaxis] - strikes if option_type == "call" else strikes - spot[..., np.newaxis]
+    return np.maximum(intrinsic, 0.0) @ quantities
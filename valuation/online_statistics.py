@@ -0,0 +1,258 @@
+import numpy as np
+
+DEFAULT_COMPRESSION = 200
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+DEFAULT_CONFIDENCE_LEVEL = 0.95
+
+
+class RunningMoments:
+    """ Running Moments Class
+    Keeps the count, mean and variance of a stream of values, updated a batch at a time with Welford's method.
+    """
+
+    def __init__(self, *, shape=()):
+        """
+        Initialize the Running Moments Class.
+
+        :param shape: tuple, the shape of the statistics kept, values are given with an extra last axis of batch values
+        """
+        self.__count = 0
+        self.__mean = np.zeros(shape)
+        self.__sum_squared_deviations = np.zeros(shape)
+
+    def update(self, values):
+        """
+        Adds a batch of values, merging their moments with the moments held.
+
+        :param values: array like shaped (*shape, batch)
+        :return: none
+        """
+        values = np.asarray(values, dtype=np.float64)
+        batch_count = values.shape[-1]
+        if batch_count == 0:
+            return
+        batch_mean = values.mean(axis=-1)
+        batch_sum_squared_deviations = np.square(values - batch_mean[..., np.newaxis]).sum(axis=-1)
+
+        count = self.__count + batch_count
+        delta = batch_mean - self.__mean
+        self.__mean = self.__mean + delta * batch_count / count
+        self.__sum_squared_deviations = (self.__sum_squared_deviations + batch_sum_squared_deviations
+                                         + np.square(delta) * self.__count * batch_count / count)
+        self.__count = count
+
+    def get_count(self):
+        return self.__count
+
+    def get_mean(self):
+        return self.__mean
+
+    def get_variance(self, *, ddof=1):
+        """
+        Gets the variance of the values added.
+
+        :param ddof: int, delta degrees of freedom
+        :return: ndarray
+        """
+        if self.__count <= ddof:
+            return np.full(self.__mean.shape, np.nan)
+        return self.__sum_squared_deviations / (self.__count - ddof)
+
+    def get_std(self, *, ddof=1):
+        return np.sqrt(self.get_variance(ddof=ddof))
+
+
+class QuantileSketch:
+    """ Quantile Sketch Class
+    Estimates quantiles of a stream of values in fixed memory, in the manner of a merging t-digest.
+
+    Values are summarised as weighted centroids. Centroids are narrow in the tails and wide around the median, so the
+    tail quantiles used for value at risk are the most accurate.
+    """
+
+    def __init__(self, *, shape=(), compression=DEFAULT_COMPRESSION):
+        """
+        Initialize the Quantile Sketch Class.
+
+        :param shape: tuple, the shape of the statistics kept, values are given with an extra last axis of batch values
+        :param compression: int, the most centroids kept for each statistic
+        """
+        self.__shape = tuple(shape)
+        self.__compression = compression
+        number_of_rows = int(np.prod(self.__shape))
+        self.__means = np.empty((number_of_rows, 0))
+        self.__weights = np.empty((number_of_rows, 0))
+        self.__minimum = np.full(number_of_rows, np.inf)
+        self.__maximum = np.full(number_of_rows, -np.inf)
+        self.__count = 0
+
+    def update(self, values):
+        """
+        Adds a batch of values, merging them into the centroids held.
+
+        :param values: array like shaped (*shape, batch)
+        :return: none
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(len(self.__minimum), -1)
+        if values.shape[1] == 0:
+            return
+        self.__minimum = np.minimum(self.__minimum, values.min(axis=1))
+        self.__maximum = np.maximum(self.__maximum, values.max(axis=1))
+        self.__count += values.shape[1]
+
+        means = np.concatenate((self.__means, values), axis=1)
+        weights = np.concatenate((self.__weights, np.ones(values.shape)), axis=1)
+        self.__means, self.__weights = self.__compress(means, weights)
+
+    def __compress(self, means, weights):
+        order = np.argsort(means, axis=1)
+        means = np.take_along_axis(means, order, axis=1)
+        weights = np.take_along_axis(weights, order, axis=1)
+
+        # the arcsine scale gives each centroid an equal share of the scale, which is finest in the tails
+        cumulative_weights = np.cumsum(weights, axis=1)
+        mid_quantiles = (cumulative_weights - weights / 2) / self.__count
+        scale = self.__compression * (np.arcsin(np.clip(2 * mid_quantiles - 1, -1, 1)) / np.pi + 0.5)
+        centroid_index = np.minimum(scale.astype(int), self.__compression - 1)
+
+        flat_index = (centroid_index + np.arange(len(means)).reshape(-1, 1) * self.__compression).ravel()
+        size = len(means) * self.__compression
+        merged_weights = np.bincount(flat_index, weights=weights.ravel(), minlength=size)
+        merged_sums = np.bincount(flat_index, weights=(weights * np.where(weights > 0, means, 0)).ravel(),
+                                  minlength=size)
+        merged_weights = merged_weights.reshape(len(means), self.__compression)
+        merged_sums = merged_sums.reshape(len(means), self.__compression)
+        # empty centroids sort after the others and carry no weight
+        merged_means = np.divide(merged_sums, merged_weights, out=np.full(merged_sums.shape, np.inf),
+                                 where=merged_weights > 0)
+        return merged_means, merged_weights
+
+    def __get_sorted_centroids(self):
+        order = np.argsort(self.__means, axis=1)
+        return (np.take_along_axis(self.__means, order, axis=1),
+                np.take_along_axis(self.__weights, order, axis=1))
+
+    def get_count(self):
+        return self.__count
+
+    def get_quantiles(self, quantiles):
+        """
+        Gets estimates of quantiles of the values added.
+
+        Each centroid stands at the middle of its weight, and quantiles are interpolated between centroids and the
+        minimum and maximum values.
+
+        :param quantiles: array like of float between 0 and 1
+        :return: ndarray shaped (*shape, quantile)
+        """
+        quantiles = np.asarray(quantiles, dtype=np.float64)
+        if self.__count == 0:
+            return np.full(self.__shape + quantiles.shape, np.nan)
+        means, weights = self.__get_sorted_centroids()
+        positions = np.cumsum(weights, axis=1) - weights / 2
+        estimates = np.empty((len(means), len(quantiles)))
+        for row in range(len(means)):
+            held = weights[row] > 0
+            estimates[row] = np.interp(
+                quantiles * self.__count,
+                np.concatenate(([0], positions[row, held], [self.__count])),
+                np.concatenate(([self.__minimum[row]], means[row, held], [self.__maximum[row]])))
+        return estimates.reshape(self.__shape + quantiles.shape)
+
+    def get_tail_mean(self, probability):
+        """
+        Gets an estimate of the mean of the lowest fraction of the values added.
+
+        :param probability: float between 0 and 1, the fraction of values in the tail
+        :return: ndarray shaped like the statistics
+        """
+        if self.__count == 0:
+            return np.full(self.__shape, np.nan)
+        means, weights = self.__get_sorted_centroids()
+        tail_weight = probability * self.__count
+        weight_before = np.cumsum(weights, axis=1) - weights
+        tail_weights = np.clip(tail_weight - weight_before, 0, weights)
+        tail_sums = (tail_weights * np.where(weights > 0, means, 0)).sum(axis=1)
+        return (tail_sums / tail_weight).reshape(self.__shape)
+
+
+class ScenarioStatistics:
+    """ Scenario Statistics Class
+    Keeps the statistics of portfolio values over scenarios for each date, along with the distribution of scenario
+    sharpe ratios, in memory which does not grow with the number of scenarios.
+    """
+
+    def __init__(self, *, number_of_dates, compression=DEFAULT_COMPRESSION):
+        """
+        Initialize the Scenario Statistics Class.
+
+        :param number_of_dates: int
+        :param compression: int, the most centroids kept for each quantile sketch
+        """
+        self.__value_moments = RunningMoments(shape=(number_of_dates,))
+        self.__value_quantiles = QuantileSketch(shape=(number_of_dates,), compression=compression)
+        self.__pnl_quantiles = QuantileSketch(shape=(number_of_dates,), compression=compression)
+        self.__sharpe_ratio_moments = RunningMoments()
+        self.__sharpe_ratio_quantiles = QuantileSketch(compression=compression)
+
+    def update(self, values, *, sharpe_ratios):
+        """
+        Adds the values of a batch of scenarios.
+
+        :param values: ndarray of portfolio values shaped (date, scenario)
+        :param sharpe_ratios: ndarray of the sharpe ratio of each scenario
+        :return: none
+        """
+        self.__value_moments.update(values)
+        self.__value_quantiles.update(values)
+        # the pnl on each date is measured from the value on the first date
+        self.__pnl_quantiles.update(values - values[:1])
+        finite_sharpe_ratios = sharpe_ratios[np.isfinite(sharpe_ratios)]
+        self.__sharpe_ratio_moments.update(finite_sharpe_ratios)
+        self.__sharpe_ratio_quantiles.update(finite_sharpe_ratios)
+
+    def get_number_scenarios(self):
+        return self.__value_moments.get_count()
+
+    def get_mean(self):
+        return self.__value_moments.get_mean()
+
+    def get_std(self):
+        return self.__value_moments.get_std()
+
+    def get_quantiles(self, quantiles=DEFAULT_QUANTILES):
+        """
+        Gets quantiles of the portfolio value on each date.
+
+        :param quantiles: array like of float between 0 and 1
+        :return: ndarray shaped (date, quantile)
+        """
+        return self.__value_quantiles.get_quantiles(quantiles)
+
+    def get_value_at_risk(self, *, confidence_level=DEFAULT_CONFIDENCE_LEVEL):
+        """
+        Gets the value at risk on each date, the loss from the first date which is exceeded with a probability of one
+        minus the confidence level.
+
+        :param confidence_level: float between 0 and 1
+        :return: ndarray
+        """
+        return -self.__pnl_quantiles.get_quantiles([1 - confidence_level])[:, 0]
+
+    def get_expected_shortfall(self, *, confidence_level=DEFAULT_CONFIDENCE_LEVEL):
+        """
+        Gets the expected shortfall on each date, the mean loss from the first date beyond the value at risk.
+
+        :param confidence_level: float between 0 and 1
+        :return: ndarray
+        """
+        return -self.__pnl_quantiles.get_tail_mean(1 - confidence_level)
+
+    def get_sharpe_ratio_mean(self):
+        return float(self.__sharpe_ratio_moments.get_mean())
+
+    def get_sharpe_ratio_std(self):
+        return float(self.__sharpe_ratio_moments.get_std())
+
+    def get_sharpe_ratio_quantiles(self, quantiles=DEFAULT_QUANTILES):
+        return self.__sharpe_ratio_quantiles.get_quantiles(quantiles)
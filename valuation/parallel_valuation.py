@@ -0,0 +1,102 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from marketData.market_data_service import MarketDataService
+from marketData.scenario_cube import to_shared_memory, from_shared_memory
+from portfolio.columnar_portfolio import to_columnar_portfolio
+from valuation.columnar_valuation import columnar_portfolio_values
+
+
+def split_scenarios(*, number_of_scenarios, number_of_ranges):
+    """
+    Splits scenario numbers into contiguous ranges of near equal size.
+
+    Parameters
+    ----------
+    number_of_scenarios: int
+    number_of_ranges: int
+
+    Returns list of (start, stop) tuples
+    -------
+    """
+    bounds = np.linspace(0, number_of_scenarios, min(number_of_ranges, number_of_scenarios) + 1).astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def value_portfolio_in_parallel(*, portfolio, market_data_service, number_of_scenarios, workers):
+    """
+    Values a portfolio for every date and scenario, splitting the scenarios across a process pool.
+
+    The market data is placed in shared memory once and each worker reads it without copying. Each worker values the
+    positions in groups for its scenarios and writes the portfolio values into a shared output block, which is copied
+    out once every worker has finished.
+
+    Parameters
+    ----------
+    portfolio: Portfolio
+    market_data_service: MarketDataService
+    number_of_scenarios: int
+    workers: int, number of worker processes
+
+    Returns ndarray shaped (date, scenario)
+    -------
+    """
+    columnar_portfolio = to_columnar_portfolio(portfolio)
+    output_shape = (len(market_data_service.get_dates()), number_of_scenarios)
+    cube_memory, cube_description = to_shared_memory(market_data_service.get_scenario_cube())
+    output_memory = SharedMemory(create=True, size=max(int(np.prod(output_shape)) * 8, 1))
+    try:
+        output_description = {'name': output_memory.name, 'shape': output_shape}
+        scenario_ranges = split_scenarios(number_of_scenarios=number_of_scenarios, number_of_ranges=workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(
+                _value_scenario_range,
+                cube_description=cube_description,
+                output_description=output_description,
+                columnar_portfolio=columnar_portfolio,
+                start=start,
+                stop=stop) for start, stop in scenario_ranges]
+            for future in futures:
+                future.result()
+        return _copy_output(output_memory=output_memory, output_shape=output_shape)
+    finally:
+        cube_memory.close()
+        cube_memory.unlink()
+        output_memory.close()
+        output_memory.unlink()
+
+
+def _copy_output(*, output_memory, output_shape):
+    """
+    Copies the values out of the shared output block, so that the block can be released.
+    """
+    return np.array(np.ndarray(output_shape, dtype=np.float64, buffer=output_memory.buf))
+
+
+def _value_scenario_range(*, cube_description, output_description, columnar_portfolio, start, stop):
+    """
+    Values a portfolio for scenarios start to stop in a worker process, writing into the shared output block.
+    """
+    cube_memory, scenario_cube = from_shared_memory(cube_description)
+    output_memory = SharedMemory(name=output_description['name'])
+    try:
+        _write_scenario_range(
+            scenario_cube=scenario_cube.get_scenario_slice(start=start, stop=stop),
+            output=np.ndarray(output_description['shape'], dtype=np.float64, buffer=output_memory.buf),
+            columnar_portfolio=columnar_portfolio,
+            start=start,
+            stop=stop)
+    finally:
+        # views onto the blocks must be released before they can be closed
+        del scenario_cube
+        cube_memory.close()
+        output_memory.close()
+
+
+def _write_scenario_range(*, scenario_cube, output, columnar_portfolio, start, stop):
+    output[:, start:stop] = columnar_portfolio_values(
+        columnar_portfolio=columnar_portfolio,
+        market_data_service=MarketDataService(scenario_cube=scenario_cube),
+        number_of_scenarios=stop - start)
@@ -6,11 +6,11 @@ from portfolio.portfolio import Portfolio
 from positions import financial_position
 from positions import common_stock
 from positions import option
-from pyblackscholesanalytics.market.market import MarketEnvironment
-from pyblackscholesanalytics.options.options import PlainVanillaOption
+from valuation.black_scholes import black_scholes_price, year_fractions
+from valuation.window_statistics import WindowStatistics, get_window_indices
 
 
-def present_value(*, mkt_env, position_to_value, market_data, scenario_number):
+def present_value(*, position_to_value, market_data, scenario_number):
     if isinstance(position_to_value, financial_position.Position):
         security_id = position_to_value.get_security_id()
         quantity = position_to_value.get_quantity()
@@ -36,18 +36,13 @@ def present_value(*, mkt_env, position_to_value, market_data, scenario_number):
                 market_id=RiskFreeRateId(security_id=security_id),
                 scenario_number=scenario_number)
 
-            mkt_env.set_t(t=date.strftime('%d-%m-%Y'))
-            mkt_env.set_r(r=risk_free_rate)
-            mkt_env.set_S(S=price)
-            mkt_env.set_sigma(sigma=volatility)
-
-            plain_vanilla = PlainVanillaOption(
-                mkt_env,
+            price_option = black_scholes_price(
                 option_type=option_type,
-                K=strike,
-                T=expiry.strftime('%d-%m-%Y'))
-
-            price_option = plain_vanilla.get_initial_price()[0]
+                spot=price,
+                strike=strike,
+                volatility=volatility,
+                risk_free_rate=risk_free_rate,
+                time_to_expiry=year_fractions(dates=[date], expiry=expiry)[0])[()]
             return price_option * quantity
 
     else:
@@ -73,11 +68,10 @@ def get_market_ids(portfolio):
         return set(market_ids)
 
 
-def portfolio_present_value(mkt_env, portfolio, market_data, scenario_number):
+def portfolio_present_value(portfolio, market_data, scenario_number):
     if isinstance(portfolio, Portfolio):
         positions = portfolio.get_positions()
         position_present_values = [present_value(
-            mkt_env=mkt_env,
             position_to_value=position,
             market_data=market_data,
             scenario_number=scenario_number) for position in positions]
@@ -87,6 +81,9 @@ def portfolio_present_value(mkt_env, portfolio, market_data, scenario_number):
 class PortfolioValuation:
     """ Portfolio Valuation Class
     A class that performs valuation on a given portfolio.
+
+    The value of each position is kept in its own column, so positions can be added or removed without revaluing the
+    rest of the portfolio.
     """
 
     def __init__(self, *, portfolio, market_data_service: MarketDataService, scenario_number):
@@ -99,13 +96,14 @@ class PortfolioValuation:
         market_data_service: MarketDataService
         scenario_number: int
         """
-        self.__mkt_env = MarketEnvironment()
         market_data_data_frame = market_data_service.get_date_to_market_data()
+        self.__date_to_market_data = market_data_data_frame[0]
+        self.__scenario_number = scenario_number
+        self.__positions = list(portfolio.get_positions())
         portfolio_value_dict = {}
         for date, row in market_data_data_frame.iterrows():
             market_data = row[0]
             temp_value = portfolio_present_value(
-                mkt_env=self.__mkt_env,
                 portfolio=portfolio,
                 market_data=market_data,
                 scenario_number=scenario_number)
@@ -115,6 +113,37 @@ class PortfolioValuation:
         portfolio_value_df.fillna(method='pad', inplace=True)
 
         self.portfolio_securities_valuation = portfolio_value_df
+        self.__window_statistics = None
+
+    def add_position(self, *, position):
+        """
+        Adds a position, valuing only that position.
+
+        :param position: Position
+        :return: none
+        """
+        position_values = pd.Series({date: present_value(
+            position_to_value=position,
+            market_data=market_data,
+            scenario_number=self.__scenario_number) for date, market_data in self.__date_to_market_data.items()},
+            dtype=float)
+        self.portfolio_securities_valuation[len(self.__positions)] = position_values.ffill()
+        self.__positions.append(position)
+        self.__window_statistics = None
+
+    def remove_position(self, *, position):
+        """
+        Removes a position, dropping its column of values.
+
+        :param position: Position
+        :return: none
+        """
+        index = self.__positions.index(position)
+        del self.__positions[index]
+        remaining = self.portfolio_securities_valuation.drop(columns=index)
+        remaining.columns = range(remaining.shape[1])
+        self.portfolio_securities_valuation = remaining
+        self.__window_statistics = None
 
     def get_portfolio_securities_valuation(self):
         return self.portfolio_securities_valuation
@@ -127,26 +156,32 @@ class PortfolioValuation:
         pnls = vals / vals.shift(1, fill_value=vals[0]) - 1
         return pnls
 
+    def get_window_statistics(self):
+        """
+        Gets the window statistics of the portfolio values, found once until the positions change.
+
+        :return: WindowStatistics
+        """
+        if self.__window_statistics is None:
+            self.__window_statistics = WindowStatistics(self.portfolio_securities_valuation.sum(axis=1).to_numpy())
+        return self.__window_statistics
+
+    def __get_date_indices(self, start_date, end_date):
+        return get_window_indices(
+            dates=self.portfolio_securities_valuation.index, start_date=start_date, end_date=end_date)
+
     def get_portfolio_return(self, *, start_date, end_date):
-        vals = self.get_portfolio_valuation()
-        start_val = vals.loc[start_date][0]
-        end_val = vals.loc[end_date][0]
-        return end_val / start_val - 1
+        start_index, end_index = self.__get_date_indices(start_date, end_date)
+        return self.get_window_statistics().get_return(start_index=start_index, end_index=end_index)
 
     def get_portfolio_volatility(self, *, start_date, end_date):
-        pnls = self.get_portfolio_pnl()
-        return pnls.std() * pow(255, 0.5)
+        start_index, end_index = self.__get_date_indices(start_date, end_date)
+        return self.get_window_statistics().get_volatility(start_index=start_index, end_index=end_index)
 
     def get_portfolio_sharpe_ratio(self, *, start_date, end_date):
-        portfolio_return = self.get_portfolio_return(start_date=start_date, end_date=end_date)
-        portfolio_vol = self.get_portfolio_volatility(start_date=start_date, end_date=end_date)
-
-        return portfolio_return / portfolio_vol
+        start_index, end_index = self.__get_date_indices(start_date, end_date)
+        return self.get_window_statistics().get_sharpe_ratio(start_index=start_index, end_index=end_index)
 
     def get_portfolio_sharpe_ratio_max_period(self):
-        start_date = self.get_portfolio_valuation().index[0]
-        end_date = self.get_portfolio_valuation().index[-1]
-        portfolio_return = self.get_portfolio_return(start_date=start_date, end_date=end_date)
-        portfolio_vol = self.get_portfolio_volatility(start_date=start_date, end_date=end_date)
-
-        return portfolio_return / portfolio_vol
+        window_statistics = self.get_window_statistics()
+        return window_statistics.get_sharpe_ratio(start_index=0, end_index=window_statistics.get_number_dates() - 1)
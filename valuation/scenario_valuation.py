@@ -1,8 +1,15 @@
-import pandas as pd
+import copy
+
+import numpy as np
 
 from marketData.market_data_service import MarketDataService
+from portfolio.columnar_portfolio import to_columnar_portfolio
+from valuation.batch_valuation import BatchValuation, get_number_scenarios, sharpe_ratios
+from valuation.columnar_valuation import columnar_portfolio_values
+from valuation.online_statistics import ScenarioStatistics
+from valuation.parallel_valuation import value_portfolio_in_parallel
 
-from valuation import portfolio_valuation
+STATISTICS_CHUNK_SIZE = 1000
 
 
 class ScenarioValuation:
@@ -10,32 +17,188 @@ class ScenarioValuation:
     Performs multiple scenario valuation on a given portfolio.
     """
 
-    def __init__(self, *, portfolio, market_data_service: MarketDataService):
+    def __init__(self, *, portfolio, market_data_service: MarketDataService, workers=None, position_valuations=None,
+                 portfolio_values=None, scenario_statistics=None):
         """
         Initialize the Scenario Valuation Class.
 
+        Every scenario is valued at once by a BatchValuation, or split into ranges of scenarios valued by a pool of
+        worker processes which read the market data from shared memory.
+
         Parameters
         ----------
         portfolio: Portfolio
         market_data_service: MarketDataService
+        workers: optional int, the number of worker processes, scenarios are valued in this process if not above one
+        position_valuations: optional list of ndarray shaped (date, scenario), values already found for each position
+        portfolio_values: optional ndarray shaped (date, scenario), values already found for the whole portfolio
+        scenario_statistics: optional ScenarioStatistics already found for the valuations given
         """
-        required_market_ids = portfolio_valuation.get_market_ids(portfolio)
-        list_of_scenario_numbers = [market_data_service.get_number_scenarios(market_id=market_id) for market_id in required_market_ids]
-        number_of_scenarios = min(list_of_scenario_numbers)
-
-        self.__valuation_list = [portfolio_valuation.PortfolioValuation(
+        given = position_valuations is not None or portfolio_values is not None
+        if not given and workers is not None and workers > 1:
+            portfolio_values = value_portfolio_in_parallel(
+                portfolio=portfolio,
+                market_data_service=market_data_service,
+                number_of_scenarios=get_number_scenarios(portfolio=portfolio, market_data_service=market_data_service),
+                workers=workers)
+        self.__batch_valuation = BatchValuation(
             portfolio=portfolio,
             market_data_service=market_data_service,
-            scenario_number=scenario_number) for scenario_number in range(number_of_scenarios)]
+            position_valuations=position_valuations,
+            portfolio_values=portfolio_values)
+        self.__scenario_statistics = scenario_statistics if given else None
+
+    def __copy__(self):
+        duplicate = object.__new__(ScenarioValuation)
+        duplicate.__batch_valuation = copy.copy(self.__batch_valuation)
+        duplicate.__scenario_statistics = self.__scenario_statistics
+        return duplicate
+
+    def add_position(self, *, position):
+        self.__batch_valuation.add_position(position=position)
+        self.__scenario_statistics = None
+
+    def remove_position(self, *, position):
+        self.__batch_valuation.remove_position(position=position)
+        self.__scenario_statistics = None
+
+    def update_portfolio(self, *, portfolio):
+        self.__batch_valuation.update_portfolio(portfolio=portfolio)
+        self.__scenario_statistics = None
+
+    def get_batch_valuation(self):
+        return self.__batch_valuation
+
+    def get_number_scenarios(self):
+        return self.__batch_valuation.get_number_scenarios()
+
+    def get_nbytes(self):
+        return self.__batch_valuation.get_nbytes()
 
     def get_all_portfolio_valuations(self):
-        return pd.concat([val.get_portfolio_valuation() for val in self.__valuation_list], axis=1)
+        valuations = self.__batch_valuation.get_portfolio_valuation()
+        valuations.columns = ['portfolio'] * valuations.shape[1]
+        return valuations
 
     def get_all_sharpe_ratios(self, start_date, end_date):
-        return [val.get_portfolio_sharpe_ratio(start_date=start_date, end_date=end_date)
-                for val in self.__valuation_list]
+        return self.__batch_valuation.get_sharpe_ratios(start_date=start_date, end_date=end_date).tolist()
 
     def get_all_sharpe_ratios_max_period(self):
-        return [val.get_portfolio_sharpe_ratio_max_period() for val in self.__valuation_list]
+        return self.__batch_valuation.get_sharpe_ratios_max_period().tolist()
+
+    def get_scenario_statistics(self):
+        """
+        Gets the mean, quantiles, value at risk and expected shortfall of the portfolio on each date, and the
+        distribution of scenario sharpe ratios.
+
+        The scenarios are fed to the running statistics a chunk at a time in a single pass. The statistics are kept
+        until the portfolio changes.
+
+        :return: ScenarioStatistics
+        """
+        if self.__scenario_statistics is None:
+            values = self.__batch_valuation.get_portfolio_valuation_matrix()
+            scenario_statistics = ScenarioStatistics(number_of_dates=values.shape[0])
+            for start in range(0, values.shape[1], STATISTICS_CHUNK_SIZE):
+                chunk = values[:, start:start + STATISTICS_CHUNK_SIZE]
+                scenario_statistics.update(
+                    chunk,
+                    sharpe_ratios=sharpe_ratios(chunk, start_index=0, end_index=values.shape[0] - 1))
+            self.__scenario_statistics = scenario_statistics
+        return self.__scenario_statistics
 
 
+class ValuationProgress:
+    """ Valuation Progress Class
+    The state of a valuation run a chunk of scenarios at a time, holding the statistics of the scenarios valued so far.
+    """
+
+    def __init__(self, *, number_valued, number_of_scenarios, dates, scenario_statistics, scenario_valuation=None):
+        """
+        Initialize the Valuation Progress Class.
+
+        Parameters
+        ----------
+        number_valued: int, the number of scenarios valued so far, always the first scenarios
+        number_of_scenarios: int
+        dates: Index of valuation dates
+        scenario_statistics: ScenarioStatistics of the scenarios valued so far, which is not changed afterwards
+        scenario_valuation: optional ScenarioValuation, given once every scenario is valued
+        """
+        self.__number_valued = number_valued
+        self.__number_of_scenarios = number_of_scenarios
+        self.__dates = dates
+        self.__scenario_statistics = scenario_statistics
+        self.__scenario_valuation = scenario_valuation
+
+    def get_number_valued(self):
+        return self.__number_valued
+
+    def get_number_of_scenarios(self):
+        return self.__number_of_scenarios
+
+    def get_dates(self):
+        return self.__dates
+
+    def get_scenario_statistics(self):
+        return self.__scenario_statistics
+
+    def get_scenario_valuation(self):
+        return self.__scenario_valuation
+
+    def is_complete(self):
+        return self.__scenario_valuation is not None
+
+
+def value_scenarios_in_chunks(*, portfolio, market_data_service, chunk_size=STATISTICS_CHUNK_SIZE):
+    """
+    Values a portfolio a chunk of scenarios at a time, yielding the statistics of the scenarios valued so far after
+    each chunk.
+
+    Each chunk is valued from a view of the scenario cube, so the first scenarios can be shown while the rest are
+    valued. Closing the generator stops the valuation after the chunk being valued. The last progress holds the
+    ScenarioValuation of every scenario, with the same statistics as get_scenario_statistics would find.
+
+    Parameters
+    ----------
+    portfolio: Portfolio
+    market_data_service: MarketDataService
+    chunk_size: int, number of scenarios in each chunk
+
+    Yields ValuationProgress
+    -------
+    """
+    number_of_scenarios = get_number_scenarios(portfolio=portfolio, market_data_service=market_data_service)
+    dates = market_data_service.get_dates()
+    columnar_portfolio = to_columnar_portfolio(portfolio)
+    scenario_cube = market_data_service.get_scenario_cube()
+    portfolio_values = np.empty((len(dates), number_of_scenarios))
+    scenario_statistics = ScenarioStatistics(number_of_dates=len(dates))
+
+    for start in range(0, number_of_scenarios, chunk_size):
+        stop = min(start + chunk_size, number_of_scenarios)
+        chunk_service = MarketDataService(scenario_cube=scenario_cube.get_scenario_slice(start=start, stop=stop))
+        chunk = portfolio_values[:, start:stop]
+        chunk[...] = columnar_portfolio_values(
+            columnar_portfolio=columnar_portfolio,
+            market_data_service=chunk_service,
+            number_of_scenarios=stop - start)
+        scenario_statistics.update(chunk, sharpe_ratios=sharpe_ratios(chunk, start_index=0, end_index=len(dates) - 1))
+        if stop < number_of_scenarios:
+            # a copy is handed out as the statistics carry on changing while the next chunk is valued
+            yield ValuationProgress(
+                number_valued=stop,
+                number_of_scenarios=number_of_scenarios,
+                dates=dates,
+                scenario_statistics=copy.deepcopy(scenario_statistics))
+
+    yield ValuationProgress(
+        number_valued=number_of_scenarios,
+        number_of_scenarios=number_of_scenarios,
+        dates=dates,
+        scenario_statistics=scenario_statistics,
+        scenario_valuation=ScenarioValuation(
+            portfolio=portfolio,
+            market_data_service=market_data_service,
+            portfolio_values=portfolio_values,
+            scenario_statistics=scenario_statistics))
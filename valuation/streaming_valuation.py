@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+from marketData.market_data_service import MarketDataService
+from marketData.market_id import PriceId, VolatilityId, RiskFreeRateId
+from path_generators.path import Path
+from path_generators.returns_generator import ReturnsGenerator
+from valuation.batch_valuation import BatchValuation
+from valuation.online_statistics import (ScenarioStatistics, DEFAULT_COMPRESSION, DEFAULT_CONFIDENCE_LEVEL,
+                                         DEFAULT_QUANTILES)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def volatile_market_data_chunks(*, central_path, volatility, number_of_scenarios, chunk_size=DEFAULT_CHUNK_SIZE,
+                                start_value=100, risk_free_rate=0.04, security_id=1, seed=None):
+    """
+    Generates volatile price scenarios around a central path a chunk of scenarios at a time, each chunk held by its
+    own Market Data Service along with a flat implied volatility and risk free rate.
+
+    A seeded generator gives the same scenarios as a VolatilePath with the same seed, whatever the chunk size.
+
+    Parameters
+    ----------
+    central_path: Path, single column of daily returns
+    volatility: float, annual volatility of the prices and the implied volatility of options
+    number_of_scenarios: int
+    chunk_size: int, the most scenarios held at a time
+    start_value: float, the price on the first date
+    risk_free_rate: float
+    security_id: int
+    seed: optional int for reproducible scenarios
+
+    Returns iterator of MarketDataService
+    -------
+    """
+    central_path_data_frame = central_path.get_path_dataframe()
+    dates = central_path_data_frame.index
+    returns_generator = ReturnsGenerator(
+        central_returns=central_path_data_frame.iloc[:, 0].to_numpy(),
+        volatility=volatility,
+        seed=seed)
+    for returns in returns_generator.generate_chunks(number_of_paths=number_of_scenarios, chunk_size=chunk_size):
+        market_data_service = MarketDataService()
+        market_data_service.add_market_data_from_path(
+            path_data_frame=Path(path_dataframe=pd.DataFrame(returns, index=dates))
+            .get_cumulative_path(start_value=start_value),
+            market_id=PriceId(security_id=security_id))
+        market_data_service.add_market_data_from_path(
+            path_data_frame=pd.DataFrame(np.full(returns.shape, volatility), index=dates),
+            market_id=VolatilityId(security_id=security_id))
+        market_data_service.add_market_data_from_path(
+            path_data_frame=pd.DataFrame(np.full(returns.shape, risk_free_rate), index=dates),
+            market_id=RiskFreeRateId(security_id=security_id))
+        yield market_data_service
+
+
+class StreamingValuation:
+    """ Streaming Valuation Class
+    Values a portfolio over chunks of scenarios, reducing each chunk into running statistics before the next is made.
+
+    Only the statistics are kept, so memory use is set by the chunk size and the number of dates rather than by the
+    number of scenarios.
+    """
+
+    def __init__(self, *, portfolio, market_data_chunks, compression=DEFAULT_COMPRESSION):
+        """
+        Initialize the Streaming Valuation Class.
+
+        Parameters
+        ----------
+        portfolio: Portfolio
+        market_data_chunks: iterable of MarketDataService, each holding a chunk of scenarios for the same dates
+        compression: int, the most centroids kept for each quantile estimate
+        """
+        self.__dates = None
+        self.__scenario_statistics = None
+        for market_data_service in market_data_chunks:
+            batch_valuation = BatchValuation(portfolio=portfolio, market_data_service=market_data_service)
+            if self.__dates is None:
+                self.__dates = batch_valuation.get_dates()
+                self.__scenario_statistics = ScenarioStatistics(
+                    number_of_dates=len(self.__dates),
+                    compression=compression)
+            elif not batch_valuation.get_dates().equals(self.__dates):
+                raise ValueError("Every chunk of market data must hold the same dates")
+            self.__scenario_statistics.update(
+                batch_valuation.get_portfolio_valuation_matrix(),
+                sharpe_ratios=batch_valuation.get_sharpe_ratios_max_period())
+        if self.__dates is None:
+            raise ValueError("There must be at least one chunk of market data")
+
+    def get_dates(self):
+        return self.__dates
+
+    def get_number_scenarios(self):
+        return self.__scenario_statistics.get_number_scenarios()
+
+    def get_scenario_statistics(self):
+        return self.__scenario_statistics
+
+    def get_mean_portfolio_valuation(self):
+        """
+        Gets the mean portfolio value over scenarios on each date.
+
+        :return: DataFrame
+        """
+        return pd.DataFrame({'portfolio': self.__scenario_statistics.get_mean()}, index=self.__dates)
+
+    def get_portfolio_valuation_quantiles(self, *, quantiles=DEFAULT_QUANTILES):
+        """
+        Gets quantiles of the portfolio value over scenarios on each date.
+
+        :param quantiles: list of float between 0 and 1
+        :return: DataFrame with a column for each quantile
+        """
+        return pd.DataFrame(self.__scenario_statistics.get_quantiles(quantiles), index=self.__dates,
+                            columns=list(quantiles))
+
+    def get_value_at_risk(self, *, confidence_level=DEFAULT_CONFIDENCE_LEVEL):
+        """
+        Gets the value at risk of the portfolio on each date, measured from its value on the first date.
+
+        :param confidence_level: float between 0 and 1
+        :return: Series
+        """
+        return pd.Series(self.__scenario_statistics.get_value_at_risk(confidence_level=confidence_level),
+                         index=self.__dates)
+
+    def get_expected_shortfall(self, *, confidence_level=DEFAULT_CONFIDENCE_LEVEL):
+        """
+        Gets the expected shortfall of the portfolio on each date, measured from its value on the first date.
+
+        :param confidence_level: float between 0 and 1
+        :return: Series
+        """
+        return pd.Series(self.__scenario_statistics.get_expected_shortfall(confidence_level=confidence_level),
+                         index=self.__dates)
+
+    def get_mean_sharpe_ratio(self):
+        return self.__scenario_statistics.get_sharpe_ratio_mean()
+
+    def get_sharpe_ratio_quantiles(self, *, quantiles=DEFAULT_QUANTILES):
+        """
+        Gets quantiles of the sharpe ratio over all valuation dates of each scenario.
+
+        :param quantiles: list of float between 0 and 1
+        :return: Series indexed by quantile
+        """
+        return pd.Series(self.__scenario_statistics.get_sharpe_ratio_quantiles(quantiles), index=list(quantiles))
@@ -9,7 +9,12 @@ from positions import common_stock
 from positions import option
 import datetime
 
-from valuation.scenario_valuation import ScenarioValuation
+import numpy as np
+
+from valuation.portfolio_valuation import PortfolioValuation
+from valuation.scenario_valuation import ScenarioValuation, value_scenarios_in_chunks
+from valuation.streaming_valuation import StreamingValuation, volatile_market_data_chunks
+from valuation.valuation_cache import ValuationCache
 
 
 class TestScenarioValuation(unittest.TestCase):
@@ -135,4 +140,251 @@ class TestScenarioValuation(unittest.TestCase):
 
         self.assertEqual(expected_sharpe_ratios, sharpe_ratios)
 
+    def test_batch_matches_portfolio_valuation(self):
+        number_of_scenarios = 3
+        market_data_service = build_market_data_service(number_of_scenarios=number_of_scenarios)
+        portfolio = build_portfolio()
+
+        batch_valuations = ScenarioValuation(
+            portfolio=portfolio,
+            market_data_service=market_data_service).get_all_portfolio_valuations()
+        single_valuations = [PortfolioValuation(
+            portfolio=portfolio,
+            market_data_service=market_data_service,
+            scenario_number=scenario_number).get_portfolio_valuation().iloc[:, 0]
+            for scenario_number in range(number_of_scenarios)]
+
+        # Check that every scenario valued in one batch matches valuing it on its own.
+        np.testing.assert_allclose(batch_valuations.to_numpy(), np.column_stack(single_valuations))
+
+    def test_valuation_cache(self):
+        market_data_service = build_market_data_service(number_of_scenarios=3)
+        valuation_cache = ValuationCache()
+
+        first = valuation_cache.get_scenario_valuation(portfolio=build_portfolio(),
+                                                       market_data_service=market_data_service)
+        second = valuation_cache.get_scenario_valuation(portfolio=build_portfolio(),
+                                                        market_data_service=market_data_service)
+
+        # Check that a portfolio with the same content is found in the cache, as a copy sharing the cached values.
+        self.assertIsNot(first, second)
+        self.assertIs(first.get_batch_valuation().get_portfolio_valuation_matrix(),
+                      second.get_batch_valuation().get_portfolio_valuation_matrix())
+        self.assertEqual((valuation_cache.get_hits(), valuation_cache.get_misses()), (1, 1))
+
+        # Check that changing a valuation returned does not change the cached entry or its size.
+        nbytes = valuation_cache.get_nbytes()
+        second.add_position(position=common_stock.CommonStock(security_id=1, quantity=5))
+        np.testing.assert_array_equal(
+            valuation_cache.get_scenario_valuation(portfolio=build_portfolio(), market_data_service=market_data_service)
+            .get_batch_valuation().get_portfolio_valuation_matrix(),
+            first.get_batch_valuation().get_portfolio_valuation_matrix())
+        self.assertEqual(valuation_cache.get_nbytes(), nbytes)
+        self.assertEqual((valuation_cache.get_hits(), valuation_cache.get_misses()), (2, 1))
+
+        changed_portfolio = build_portfolio()
+        changed_portfolio.add_position(position=common_stock.CommonStock(security_id=1, quantity=1))
+        third = valuation_cache.get_scenario_valuation(portfolio=changed_portfolio,
+                                                       market_data_service=market_data_service)
+
+        self.assertIsNot(first, third)
+        self.assertEqual((valuation_cache.get_hits(), valuation_cache.get_misses()), (2, 2))
+
+    def test_valuation_cache_memory_cap(self):
+        market_data_service = build_market_data_service(number_of_scenarios=3)
+        single_valuation_bytes = ScenarioValuation(portfolio=build_portfolio(),
+                                                   market_data_service=market_data_service).get_nbytes()
+        valuation_cache = ValuationCache(max_bytes=single_valuation_bytes)
+
+        valuation_cache.get_scenario_valuation(portfolio=build_portfolio(), market_data_service=market_data_service)
+        valuation_cache.get_scenario_valuation(portfolio=build_portfolio(stock_quantity=4),
+                                               market_data_service=market_data_service)
+
+        # Check that the least recently used valuation has been evicted to stay under the memory cap.
+        self.assertEqual(len(valuation_cache), 1)
+        self.assertLessEqual(valuation_cache.get_nbytes(), single_valuation_bytes)
+        valuation_cache.get_scenario_valuation(portfolio=build_portfolio(), market_data_service=market_data_service)
+        self.assertEqual(valuation_cache.get_misses(), 3)
+
+    def test_incremental_position_updates(self):
+        market_data_service = build_market_data_service(number_of_scenarios=3)
+        portfolio = build_portfolio()
+        scenario_valuation = ScenarioValuation(portfolio=portfolio, market_data_service=market_data_service)
+        new_position = option.Option(
+            security_id=1,
+            quantity=5,
+            expiry=datetime.datetime(2024, 9, 13, 0, 0),
+            strike=95,
+            option_type="put")
+        removed_position = portfolio.get_positions()[0]
+
+        scenario_valuation.add_position(position=new_position)
+        scenario_valuation.remove_position(position=removed_position)
+        portfolio.add_position(position=new_position)
+        portfolio.remove_position(position=removed_position)
+        full_valuation = ScenarioValuation(portfolio=portfolio, market_data_service=market_data_service)
+
+        # Check that adding and removing positions matches valuing the updated portfolio from scratch.
+        np.testing.assert_allclose(scenario_valuation.get_all_portfolio_valuations().to_numpy(),
+                                   full_valuation.get_all_portfolio_valuations().to_numpy())
+
+    def test_valuation_cache_updates_incrementally(self):
+        market_data_service = build_market_data_service(number_of_scenarios=3)
+        valuation_cache = ValuationCache()
+        portfolio = build_portfolio()
+        first = valuation_cache.get_scenario_valuation(portfolio=portfolio, market_data_service=market_data_service)
+        first_valuations = first.get_all_portfolio_valuations().to_numpy()
+
+        portfolio.add_position(position=common_stock.CommonStock(security_id=1, quantity=2))
+        second = valuation_cache.get_scenario_valuation(portfolio=portfolio, market_data_service=market_data_service)
+
+        # Check that the cached valuation is left alone and the new one only adds the new position.
+        self.assertIsNot(first, second)
+        np.testing.assert_allclose(first.get_all_portfolio_valuations().to_numpy(), first_valuations)
+        np.testing.assert_allclose(second.get_all_portfolio_valuations().to_numpy(),
+                                   ScenarioValuation(portfolio=portfolio, market_data_service=market_data_service)
+                                   .get_all_portfolio_valuations().to_numpy())
+        self.assertEqual(len(second.get_batch_valuation().get_positions()), 4)
+
+    def test_parallel_valuation(self):
+        market_data_service = build_market_data_service(number_of_scenarios=5)
+        portfolio = build_portfolio()
+
+        # Check that splitting the scenarios across worker processes gives the same valuations.
+        np.testing.assert_array_equal(
+            ScenarioValuation(portfolio=portfolio, market_data_service=market_data_service, workers=2)
+            .get_all_portfolio_valuations().to_numpy(),
+            ScenarioValuation(portfolio=portfolio, market_data_service=market_data_service)
+            .get_all_portfolio_valuations().to_numpy())
+
+    def test_streaming_valuation(self):
+        central_path = LinearPath(
+            daily_value=0.0004,
+            start_date=datetime.datetime(2023, 12, 15, 0, 0),
+            end_date=datetime.datetime(2024, 12, 15, 0, 0))
+        portfolio = build_portfolio()
+        streaming_valuation = StreamingValuation(
+            portfolio=portfolio,
+            market_data_chunks=volatile_market_data_chunks(
+                central_path=central_path, volatility=0.2, number_of_scenarios=500, chunk_size=120, seed=3))
+        market_data_service, = volatile_market_data_chunks(
+            central_path=central_path, volatility=0.2, number_of_scenarios=500, chunk_size=500, seed=3)
+        scenario_valuation = ScenarioValuation(portfolio=portfolio, market_data_service=market_data_service)
+        values = scenario_valuation.get_all_portfolio_valuations().to_numpy()
+
+        # Check that statistics reduced a chunk at a time match those of all the scenarios valued together.
+        self.assertEqual(streaming_valuation.get_number_scenarios(), 500)
+        np.testing.assert_allclose(streaming_valuation.get_mean_portfolio_valuation()['portfolio'], values.mean(axis=1))
+        self.assertAlmostEqual(streaming_valuation.get_mean_sharpe_ratio(),
+                               np.mean(scenario_valuation.get_all_sharpe_ratios_max_period()))
+        tolerance = 0.1 * values.std(axis=1).max()
+        np.testing.assert_allclose(streaming_valuation.get_portfolio_valuation_quantiles(quantiles=[0.05, 0.5]),
+                                   np.quantile(values, [0.05, 0.5], axis=1).T, atol=tolerance)
+        np.testing.assert_allclose(streaming_valuation.get_value_at_risk(),
+                                   -np.quantile(values - values[:1], 0.05, axis=1), atol=tolerance)
+
+    def test_scenario_statistics(self):
+        market_data_service = build_market_data_service(number_of_scenarios=50)
+        scenario_valuation = ScenarioValuation(portfolio=build_portfolio(), market_data_service=market_data_service)
+        values = scenario_valuation.get_all_portfolio_valuations().to_numpy()
+        scenario_statistics = scenario_valuation.get_scenario_statistics()
+
+        # Check that the statistics fed by the scenario valuation are those of its values.
+        self.assertEqual(scenario_statistics.get_number_scenarios(), 50)
+        np.testing.assert_allclose(scenario_statistics.get_mean(), values.mean(axis=1))
+        np.testing.assert_allclose(scenario_statistics.get_std(), values.std(axis=1, ddof=1))
+        np.testing.assert_allclose(scenario_statistics.get_quantiles([0, 1]),
+                                   np.stack((values.min(axis=1), values.max(axis=1)), axis=1))
+        self.assertAlmostEqual(scenario_statistics.get_sharpe_ratio_mean(),
+                               np.mean(scenario_valuation.get_all_sharpe_ratios_max_period()))
+        self.assertIs(scenario_valuation.get_scenario_statistics(), scenario_statistics)
+
+        # Check that the statistics are found again once the portfolio changes.
+        scenario_valuation.add_position(position=common_stock.CommonStock(security_id=1, quantity=2))
+        np.testing.assert_allclose(scenario_valuation.get_scenario_statistics().get_mean(),
+                                   scenario_valuation.get_all_portfolio_valuations().to_numpy().mean(axis=1))
+
+    def test_value_scenarios_in_chunks(self):
+        market_data_service = build_market_data_service(number_of_scenarios=50)
+        portfolio = build_portfolio()
+        progresses = list(value_scenarios_in_chunks(
+            portfolio=portfolio, market_data_service=market_data_service, chunk_size=20))
+        scenario_valuation = ScenarioValuation(portfolio=portfolio, market_data_service=market_data_service)
+        values = scenario_valuation.get_all_portfolio_valuations().to_numpy()
+
+        # Check that each progress holds the statistics of the first scenarios, only the last being complete.
+        self.assertEqual([progress.get_number_valued() for progress in progresses], [20, 40, 50])
+        self.assertEqual([progress.is_complete() for progress in progresses], [False, False, True])
+        np.testing.assert_allclose(progresses[0].get_scenario_statistics().get_mean(), values[:, :20].mean(axis=1))
+
+        # Check that the complete valuation and its statistics match valuing every scenario at once.
+        np.testing.assert_array_equal(
+            progresses[-1].get_scenario_valuation().get_all_portfolio_valuations().to_numpy(), values)
+        self.assertIs(progresses[-1].get_scenario_valuation().get_scenario_statistics(),
+                      progresses[-1].get_scenario_statistics())
+        np.testing.assert_allclose(progresses[-1].get_scenario_statistics().get_quantiles(),
+                                   scenario_valuation.get_scenario_statistics().get_quantiles())
+
+        # Check that the cache only keeps valuations run to completion.
+        valuation_cache = ValuationCache()
+        chunks = valuation_cache.get_scenario_valuation_in_chunks(
+            portfolio=portfolio, market_data_service=market_data_service, chunk_size=20)
+        next(chunks)
+        chunks.close()
+        self.assertEqual(len(valuation_cache), 0)
+        *_, progress = valuation_cache.get_scenario_valuation_in_chunks(
+            portfolio=portfolio, market_data_service=market_data_service, chunk_size=20)
+        self.assertIs(
+            valuation_cache.get_scenario_valuation(portfolio=portfolio, market_data_service=market_data_service)
+            .get_batch_valuation().get_portfolio_valuation_matrix(),
+            progress.get_scenario_valuation().get_batch_valuation().get_portfolio_valuation_matrix())
+
+        # Check that two runs valuing the same portfolio at the same time cache and count it once.
+        valuation_cache = ValuationCache()
+        runs = [valuation_cache.get_scenario_valuation_in_chunks(
+            portfolio=portfolio, market_data_service=market_data_service, chunk_size=20) for _ in range(2)]
+        for run in runs:
+            next(run)
+        for run in runs:
+            *_, progress = run
+        self.assertEqual(len(valuation_cache), 1)
+        self.assertEqual(valuation_cache.get_nbytes(), progress.get_scenario_valuation().get_nbytes())
+
+
+def build_market_data_service(*, number_of_scenarios, security_id=1):
+    start_date = datetime.datetime(2023, 12, 15, 0, 0)
+    end_date = datetime.datetime(2024, 12, 15, 0, 0)
+    linear_path = LinearPath(daily_value=0.0004, start_date=start_date, end_date=end_date)
+    price_paths = VolatilePath(volatility=0.2, number_of_paths=number_of_scenarios, central_path=linear_path)
+
+    market_data_service = MarketDataService()
+    market_data_service.add_market_data_from_path(
+        path_data_frame=price_paths.get_cumulative_path(start_value=100),
+        market_id=market_id.PriceId(security_id=security_id))
+    market_data_service.add_market_data_from_path(
+        path_data_frame=LinearPath(daily_value=0.2, start_date=start_date, end_date=end_date)
+        .repeat_scenarios(number_of_scenarios).get_path_dataframe(),
+        market_id=market_id.VolatilityId(security_id=security_id))
+    market_data_service.add_market_data_from_path(
+        path_data_frame=LinearPath(daily_value=0.04, start_date=start_date, end_date=end_date)
+        .repeat_scenarios(number_of_scenarios).get_path_dataframe(),
+        market_id=market_id.RiskFreeRateId(security_id=security_id))
+    return market_data_service
+
 
+def build_portfolio(*, security_id=1, stock_quantity=3):
+    portfolio = Portfolio()
+    portfolio.add_position(position=option.Option(
+        security_id=security_id,
+        quantity=2,
+        expiry=datetime.datetime(2024, 6, 14, 0, 0),
+        strike=110,
+        option_type="call"))
+    portfolio.add_position(position=option.Option(
+        security_id=security_id,
+        quantity=1,
+        expiry=datetime.datetime(2024, 12, 15, 0, 0),
+        strike=100,
+        option_type="put"))
+    portfolio.add_position(position=common_stock.CommonStock(security_id=security_id, quantity=stock_quantity))
+    return portfolio
@@ -1,18 +1,28 @@
 import unittest
 
+import numpy as np
+import pandas as pd
 from pyblackscholesanalytics.market.market import MarketEnvironment
+from pyblackscholesanalytics.options.options import PlainVanillaOption
 
 import portfolio_valuation
 from marketData import market_data
 from marketData import market_id
 from marketData.market_data_service import MarketDataService
+from path_generators.business_calendar import WEEKDAY_CALENDAR
 from path_generators.linear_path import LinearPath
 from path_generators.volatile_path import VolatilePath
+from portfolio.columnar_portfolio import to_columnar_portfolio, from_columnar_portfolio
 from portfolio.portfolio import Portfolio
 from positions import common_stock
 from positions import option
 import datetime
 
+from valuation.batch_valuation import BatchValuation, position_values
+from valuation.black_scholes import black_scholes_price, black_scholes_strip_value, year_fractions
+from valuation.online_statistics import QuantileSketch, RunningMoments
+from valuation.window_statistics import WindowStatistics
+
 
 class TestPortfolioValuation(unittest.TestCase):
 
@@ -23,7 +33,6 @@ class TestPortfolioValuation(unittest.TestCase):
         security_market_data.add_market_data(key=market_id.PriceId(security_id=security_id), value=[1.1])
         security = common_stock.CommonStock(security_id=security_id, quantity=100)
         present_value = portfolio_valuation.present_value(
-            mkt_env=MarketEnvironment(),
             position_to_value=security,
             market_data=security_market_data,
             scenario_number=0)
@@ -49,7 +58,6 @@ class TestPortfolioValuation(unittest.TestCase):
             option_type=option_type)
 
         present_value = portfolio_valuation.present_value(
-            mkt_env=MarketEnvironment(),
             position_to_value=security,
             market_data=security_market_data,
             scenario_number=0)
@@ -76,7 +84,6 @@ class TestPortfolioValuation(unittest.TestCase):
             option_type=option_type)
 
         present_value = portfolio_valuation.present_value(
-            mkt_env=MarketEnvironment(),
             position_to_value=security,
             market_data=security_market_data,
             scenario_number=0)
@@ -106,7 +113,6 @@ class TestPortfolioValuation(unittest.TestCase):
         portfolio.add_position(position=common_stock.CommonStock(security_id=security_id, quantity=100))
 
         present_value = portfolio_valuation.portfolio_present_value(
-            mkt_env=MarketEnvironment(),
             portfolio=portfolio,
             market_data=security_market_data,
             scenario_number=0)
@@ -206,3 +212,198 @@ class TestPortfolioValuation(unittest.TestCase):
             scenario_number=0)
 
         self.assertFalse(__portfolio_valuation.get_portfolio_valuation().isnull().values.any())
+
+    def test_portfolio_valuation_add_and_remove_position(self):
+        security_id = 1
+        start_date = datetime.datetime(2023, 12, 15, 0, 0)
+        end_date = datetime.datetime(2024, 2, 15, 0, 0)
+        linear_path = LinearPath(daily_value=0.001, start_date=start_date, end_date=end_date)
+
+        market_data_service = MarketDataService()
+        market_data_service.add_market_data_from_path(
+            path_data_frame=linear_path.get_cumulative_path(start_value=100),
+            market_id=market_id.PriceId(security_id=security_id))
+        market_data_service.add_market_data_from_path(
+            path_data_frame=LinearPath(daily_value=0.2, start_date=start_date, end_date=end_date).get_path_dataframe(),
+            market_id=market_id.VolatilityId(security_id=security_id))
+        market_data_service.add_market_data_from_path(
+            path_data_frame=LinearPath(daily_value=0.04, start_date=start_date, end_date=end_date).get_path_dataframe(),
+            market_id=market_id.RiskFreeRateId(security_id=security_id))
+
+        stock = common_stock.CommonStock(security_id=security_id, quantity=2)
+        call = option.Option(
+            security_id=security_id,
+            quantity=1,
+            expiry=datetime.datetime(2024, 1, 15, 0, 0),
+            strike=100,
+            option_type="call")
+        portfolio = Portfolio()
+        portfolio.add_position(position=stock)
+        __portfolio_valuation = portfolio_valuation.PortfolioValuation(
+            portfolio=portfolio,
+            market_data_service=market_data_service,
+            scenario_number=0)
+
+        __portfolio_valuation.add_position(position=call)
+        portfolio.add_position(position=call)
+        full_valuation = portfolio_valuation.PortfolioValuation(
+            portfolio=portfolio,
+            market_data_service=market_data_service,
+            scenario_number=0)
+
+        # Check that the added position is valued the same as valuing the whole portfolio.
+        pd.testing.assert_frame_equal(__portfolio_valuation.get_portfolio_securities_valuation(),
+                                      full_valuation.get_portfolio_securities_valuation(), check_dtype=False)
+
+        __portfolio_valuation.remove_position(position=stock)
+
+        # Check that only the option column remains after removing the stock.
+        pd.testing.assert_series_equal(__portfolio_valuation.get_portfolio_securities_valuation()[0],
+                                       full_valuation.get_portfolio_securities_valuation()[1], check_names=False)
+
+    def test_black_scholes_matches_reference(self):
+        expiry = datetime.datetime(2024, 12, 15, 0, 0)
+        dates = [datetime.datetime(2023, 12, 15, 0, 0), datetime.datetime(2024, 6, 3, 0, 0),
+                 datetime.datetime(2024, 12, 14, 0, 0)]
+        spot = np.array([[80.0, 100.0, 130.0], [95.0, 101.0, 99.0], [120.0, 100.5, 70.0]])
+        volatility = np.array([[0.1, 0.2, 0.5], [0.3, 0.2, 0.25], [0.4, 0.15, 0.2]])
+        risk_free_rate = np.array([[0.01, 0.04, 0.05], [0.0, 0.03, 0.02], [0.04, 0.04, 0.1]])
+        strike = 100.0
+        time_to_expiry = year_fractions(dates=dates, expiry=expiry).reshape(-1, 1)
+
+        for option_type in ["call", "put"]:
+            reference = PlainVanillaOption(MarketEnvironment(), option_type=option_type, K=strike,
+                                           T=expiry.strftime('%d-%m-%Y'))
+            reference_pricer = reference.call_price if option_type == "call" else reference.put_price
+            expected = reference_pricer(S=spot, K=strike, tau=time_to_expiry, sigma=volatility, r=risk_free_rate)
+            prices = black_scholes_price(option_type=option_type, spot=spot, strike=strike, volatility=volatility,
+                                         risk_free_rate=risk_free_rate, time_to_expiry=time_to_expiry)
+
+            # Check that the whole grid is priced in one call and matches the reference library.
+            np.testing.assert_allclose(prices, expected, rtol=1e-12)
+
+    def test_black_scholes_at_expiry(self):
+        prices = black_scholes_price(option_type="put", spot=np.array([90.0, 110.0]), strike=100.0, volatility=0.2,
+                                     risk_free_rate=0.04, time_to_expiry=0.0)
+
+        np.testing.assert_allclose(prices, [10.0, 0.0])
+
+    def test_year_fractions(self):
+        expiry = datetime.datetime(2024, 1, 1, 0, 0)
+        dates = [datetime.datetime(2023, 12, 15, 0, 0), datetime.datetime(2023, 12, 29, 12, 0), expiry]
+
+        # Check that calendar days are counted by default and working days of a calendar when one is given.
+        np.testing.assert_allclose(year_fractions(dates=dates, expiry=expiry), np.array([17, 3, 0]) / 365.0)
+        np.testing.assert_allclose(year_fractions(dates=dates, expiry=expiry, calendar=WEEKDAY_CALENDAR),
+                                   np.array([11, 1, 0]) / 255.0)
+
+    def test_online_statistics(self):
+        values = np.random.default_rng(7).standard_normal((3, 20000)) * np.array([[1], [2], [3]])
+        running_moments = RunningMoments(shape=(3,))
+        quantile_sketch = QuantileSketch(shape=(3,))
+        for start in range(0, values.shape[1], 3000):
+            running_moments.update(values[:, start:start + 3000])
+            quantile_sketch.update(values[:, start:start + 3000])
+
+        # Check that the moments updated in batches are those of all the values together.
+        np.testing.assert_allclose(running_moments.get_mean(), values.mean(axis=1))
+        np.testing.assert_allclose(running_moments.get_std(), values.std(axis=1, ddof=1))
+
+        # Check that the quantiles and tail means are close to those of all the values together.
+        quantiles = [0.01, 0.05, 0.5, 0.95, 0.99]
+        np.testing.assert_allclose(quantile_sketch.get_quantiles(quantiles),
+                                   np.quantile(values, quantiles, axis=1).T, atol=0.05)
+        np.testing.assert_allclose(quantile_sketch.get_tail_mean(0.05),
+                                   np.sort(values, axis=1)[:, :1000].mean(axis=1), atol=0.05)
+
+    def test_window_statistics(self):
+        values = 100 * np.cumprod(1 + np.random.default_rng(11).normal(0.0004, 0.01, (60, 4)), axis=0)
+        window_statistics = WindowStatistics(values)
+
+        # Check that each window matches the pnl of the window, starting from a pnl of zero, computed directly.
+        for start_index, end_index in [(0, 59), (10, 40), (5, 6), (30, 59)]:
+            window = values[start_index:end_index + 1]
+            pnl = np.concatenate((np.zeros((1, 4)), window[1:] / window[:-1] - 1))
+            expected_return = window[-1] / window[0] - 1
+            expected_volatility = pnl.std(axis=0, ddof=1) * pow(255, 0.5)
+            np.testing.assert_allclose(
+                window_statistics.get_return(start_index=start_index, end_index=end_index), expected_return)
+            np.testing.assert_allclose(
+                window_statistics.get_volatility(start_index=start_index, end_index=end_index), expected_volatility)
+            np.testing.assert_allclose(
+                window_statistics.get_sharpe_ratio(start_index=start_index, end_index=end_index),
+                expected_return / expected_volatility)
+
+        # Check that a single scenario of values gives the same statistics as a column of many.
+        self.assertAlmostEqual(WindowStatistics(values[:, 2]).get_sharpe_ratio(start_index=10, end_index=40),
+                               window_statistics.get_sharpe_ratio(start_index=10, end_index=40)[2])
+
+    def test_black_scholes_strip_value(self):
+        spot = np.array([[90.0, 100.0], [110.0, 120.0]])
+        strikes = np.array([95.0, 100.0, 130.0])
+        quantities = np.array([1.0, -2.0, 3.0])
+
+        # Check that a strip is valued as the quantity weighted sum of the price of each option.
+        for option_type in ("call", "put"):
+            expected = sum(quantity * black_scholes_price(
+                option_type=option_type, spot=spot, strike=strike, volatility=0.2, risk_free_rate=0.04,
+                time_to_expiry=np.array([[0.5], [0.25]])) for strike, quantity in zip(strikes, quantities))
+            np.testing.assert_allclose(black_scholes_strip_value(
+                option_type=option_type, spot=spot, strikes=strikes, quantities=quantities,
+                volatility=np.full(spot.shape, 0.2), risk_free_rate=np.full(spot.shape, 0.04),
+                time_to_expiry=np.array([[0.5], [0.25]]), max_elements=4), expected)
+
+    def test_columnar_valuation(self):
+        start_date = datetime.datetime(2023, 12, 15, 0, 0)
+        end_date = datetime.datetime(2024, 6, 15, 0, 0)
+        number_of_scenarios = 4
+        market_data_service = MarketDataService()
+        for security_id in (1, 2):
+            prices = VolatilePath(
+                volatility=0.2,
+                number_of_paths=number_of_scenarios,
+                central_path=LinearPath(daily_value=0.0004, start_date=start_date, end_date=end_date),
+                seed=security_id).get_cumulative_path(start_value=100)
+            if security_id == 1:
+                # the market data is sparse, with a gap in the prices over an expiry
+                prices = prices.drop(prices.loc['2024-03-10':'2024-03-20'].index)
+            market_data_service.add_market_data_from_path(
+                path_data_frame=prices,
+                market_id=market_id.PriceId(security_id=security_id))
+            for market_data_id, value in ((market_id.VolatilityId(security_id=security_id), 0.2),
+                                          (market_id.RiskFreeRateId(security_id=security_id), 0.04)):
+                market_data_frame = (LinearPath(daily_value=value, start_date=start_date, end_date=end_date)
+                                     .repeat_scenarios(number_of_scenarios).get_path_dataframe())
+                market_data_service.add_market_data_from_path(
+                    path_data_frame=market_data_frame.iloc[::3] if security_id == 2 else market_data_frame,
+                    market_id=market_data_id)
+
+        portfolio = Portfolio()
+        for index in range(12):
+            portfolio.add_position(position=option.Option(
+                security_id=1 + index % 2,
+                quantity=1 + index % 3,
+                expiry=datetime.datetime(2024, 1 + index % 4 * 2, 15, 0, 0),
+                strike=90 + 2 * index,
+                option_type="call" if index % 3 else "put"))
+        portfolio.add_position(position=common_stock.CommonStock(security_id=1, quantity=5))
+        portfolio.add_position(position=common_stock.CommonStock(security_id=2, quantity=-2))
+        columnar_portfolio = to_columnar_portfolio(portfolio)
+
+        # Check that the columns convert back into the same positions.
+        self.assertEqual(len(columnar_portfolio), 14)
+        self.assertEqual(from_columnar_portfolio(columnar_portfolio).get_positions(), portfolio.get_positions())
+
+        # Check that valuing positions in groups matches valuing them one at a time, forward filling sparse data.
+        position_valuations = [np.nan_to_num(position_values(
+            position_to_value=position,
+            market_data_service=market_data_service,
+            number_of_scenarios=number_of_scenarios)) for position in portfolio.get_positions()]
+        one_at_a_time = sum(position_valuations)
+        batch_valuation = BatchValuation(portfolio=portfolio, market_data_service=market_data_service)
+        np.testing.assert_allclose(batch_valuation.get_portfolio_valuation_matrix(), one_at_a_time)
+
+        # Check that a position removed is priced alone and subtracted.
+        batch_valuation.remove_position(position=portfolio.get_positions()[0])
+        np.testing.assert_allclose(batch_valuation.get_portfolio_valuation_matrix(),
+                                   one_at_a_time - position_valuations[0])
@@ -0,0 +1,176 @@
+import copy
+import threading
+from collections import OrderedDict
+
+from marketData.market_data_service import MarketDataService
+from portfolio.portfolio import Portfolio
+from valuation.batch_valuation import get_number_scenarios
+from valuation.scenario_valuation import (ScenarioValuation, ValuationProgress, value_scenarios_in_chunks,
+                                          STATISTICS_CHUNK_SIZE)
+
+
+class ValuationCache:
+    """ Valuation Cache Class
+    Bounded least recently used cache of scenario valuations, keyed by portfolio and market data fingerprints.
+
+    When a portfolio is not cached but another portfolio on the same market data is, the cached valuation is updated
+    incrementally so only the positions which differ are priced.
+
+    The cache may be used from a worker thread, a lock guarding its entries. Callers are given copies of the cached
+    valuations, so changing the positions of a valuation returned never changes the cached entry.
+    """
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, *, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the Valuation Cache Class.
+
+        Parameters
+        ----------
+        max_bytes: int, the memory cap for the cached valuations
+        """
+        if max_bytes < 0:
+            raise ValueError("Memory cap must not be negative but was {}".format(max_bytes))
+        self.__max_bytes = max_bytes
+        self.__valuations = OrderedDict()
+        self.__nbytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.Lock()
+
+    def get_scenario_valuation(self, *, portfolio: Portfolio, market_data_service: MarketDataService):
+        """
+        Gets the scenario valuation for a portfolio and market data, valuing it only if it is not cached.
+
+        The valuation returned is a copy sharing the read only values of the cached entry.
+
+        Parameters
+        ----------
+        portfolio: Portfolio
+        market_data_service: MarketDataService
+
+        Returns ScenarioValuation
+        -------
+        """
+        key = (portfolio.get_fingerprint(), market_data_service.get_fingerprint())
+        with self.__lock:
+            scenario_valuation = self.__get_cached_or_updated(
+                key=key, portfolio=portfolio, market_data_service=market_data_service)
+            if scenario_valuation is None:
+                scenario_valuation = ScenarioValuation(portfolio=portfolio, market_data_service=market_data_service)
+                self.__add(key=key, scenario_valuation=scenario_valuation)
+            return copy.copy(scenario_valuation)
+
+    def get_scenario_valuation_in_chunks(self, *, portfolio: Portfolio, market_data_service: MarketDataService,
+                                         chunk_size=STATISTICS_CHUNK_SIZE):
+        """
+        Gets the scenario valuation for a portfolio and market data as a generator of progress, for running on a
+        worker thread.
+
+        A cached or incrementally updated valuation is yielded as soon as it is found. Otherwise the scenarios are
+        valued a chunk at a time, yielding the statistics of the scenarios valued so far, and the complete valuation is
+        cached. Closing the generator early caches nothing.
+
+        Parameters
+        ----------
+        portfolio: Portfolio
+        market_data_service: MarketDataService
+        chunk_size: int, number of scenarios in each chunk
+
+        Yields ValuationProgress
+        -------
+        """
+        key = (portfolio.get_fingerprint(), market_data_service.get_fingerprint())
+        with self.__lock:
+            scenario_valuation = self.__get_cached_or_updated(
+                key=key, portfolio=portfolio, market_data_service=market_data_service)
+            if scenario_valuation is not None:
+                scenario_valuation = copy.copy(scenario_valuation)
+        if scenario_valuation is not None:
+            yield ValuationProgress(
+                number_valued=scenario_valuation.get_number_scenarios(),
+                number_of_scenarios=scenario_valuation.get_number_scenarios(),
+                dates=scenario_valuation.get_batch_valuation().get_dates(),
+                scenario_statistics=scenario_valuation.get_scenario_statistics(),
+                scenario_valuation=scenario_valuation)
+            return
+
+        for progress in value_scenarios_in_chunks(
+                portfolio=portfolio, market_data_service=market_data_service, chunk_size=chunk_size):
+            if progress.is_complete():
+                with self.__lock:
+                    self.__add(key=key, scenario_valuation=copy.copy(progress.get_scenario_valuation()))
+            yield progress
+
+    def __get_cached_or_updated(self, *, key, portfolio, market_data_service):
+        """
+        Gets the cached valuation for a key, or updates a copy of a valuation on the same market data and caches it.
+        None is returned if neither is cached, the miss being counted.
+        """
+        if key in self.__valuations:
+            self.__hits += 1
+            self.__valuations.move_to_end(key)
+            return self.__valuations[key]
+
+        self.__misses += 1
+        scenario_valuation = self.__get_same_market_valuation(market_fingerprint=key[1])
+        if scenario_valuation is None or scenario_valuation.get_number_scenarios() != get_number_scenarios(
+                portfolio=portfolio, market_data_service=market_data_service):
+            return None
+        scenario_valuation = copy.copy(scenario_valuation)
+        scenario_valuation.update_portfolio(portfolio=portfolio)
+        self.__add(key=key, scenario_valuation=scenario_valuation)
+        return scenario_valuation
+
+    def __get_same_market_valuation(self, *, market_fingerprint):
+        """
+        Gets the most recently used valuation on the market data with the given fingerprint, if there is one.
+        """
+        for (_, cached_market_fingerprint), scenario_valuation in reversed(self.__valuations.items()):
+            if cached_market_fingerprint == market_fingerprint:
+                return scenario_valuation
+        return None
+
+    def __add(self, *, key, scenario_valuation):
+        """
+        Adds a valuation, evicting the least recently used valuations until it fits under the memory cap.
+
+        A key already cached, such as by another run valuing the same portfolio at the same time, keeps its entry.
+        """
+        if key in self.__valuations:
+            self.__valuations.move_to_end(key)
+            return
+        nbytes = scenario_valuation.get_nbytes()
+        if nbytes > self.__max_bytes:
+            return
+        while self.__nbytes + nbytes > self.__max_bytes:
+            _, evicted = self.__valuations.popitem(last=False)
+            self.__nbytes -= evicted.get_nbytes()
+        self.__valuations[key] = scenario_valuation
+        self.__nbytes += nbytes
+
+    def clear(self):
+        """
+        Removes all cached valuations. Hit and miss counts are kept.
+
+        :return: none
+        """
+        with self.__lock:
+            self.__valuations.clear()
+            self.__nbytes = 0
+
+    def get_hits(self):
+        return self.__hits
+
+    def get_misses(self):
+        return self.__misses
+
+    def get_nbytes(self):
+        return self.__nbytes
+
+    def get_max_bytes(self):
+        return self.__max_bytes
+
+    def __len__(self):
+        return len(self.__valuations)
@@ -0,0 +1,103 @@
+import numpy as np
+
+TRADING_DAYS_IN_YEAR = 255
+
+
+class WindowStatistics:
+    """ Window Statistics Class
+    Answers return, volatility and sharpe ratio queries over any window of dates in constant time.
+
+    Prefix sums of the daily pnl and the squared daily pnl are found once, so the sums over a window are the
+    difference of two prefix sums.
+    """
+
+    def __init__(self, values):
+        """
+        Initialize the Window Statistics Class.
+
+        :param values: ndarray of portfolio values shaped (date,) or (date, scenario)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        previous = np.concatenate((values[:1], values[:-1]), axis=0)
+        pnl = values / previous - 1
+        valid = ~np.isnan(pnl)
+        pnl = np.where(valid, pnl, 0)
+
+        zeros = np.zeros((1,) + values.shape[1:])
+        self.__values = values
+        self.__pnl_sums = np.concatenate((zeros, np.cumsum(pnl, axis=0)))
+        self.__squared_pnl_sums = np.concatenate((zeros, np.cumsum(np.square(pnl), axis=0)))
+        self.__pnl_counts = np.concatenate((zeros, np.cumsum(valid, axis=0)))
+
+    def get_number_dates(self):
+        return len(self.__values)
+
+    def get_return(self, *, start_index, end_index):
+        """
+        Gets the return between two date positions.
+
+        :param start_index: int
+        :param end_index: int
+        :return: float or ndarray of one return per scenario
+        """
+        return self.__values[end_index] / self.__values[start_index] - 1
+
+    def get_volatility(self, *, start_index, end_index):
+        """
+        Gets the annualised volatility of the daily pnl between two date positions.
+
+        The window holds a pnl of zero on its start date followed by the daily pnl up to its end date, so that the
+        window over all dates gives the volatility of the whole pnl series.
+
+        :param start_index: int
+        :param end_index: int
+        :return: float or ndarray of one volatility per scenario
+        """
+        start_index, end_index = self.__get_positions(start_index, end_index)
+        pnl_sum = self.__pnl_sums[end_index + 1] - self.__pnl_sums[start_index + 1]
+        squared_pnl_sum = self.__squared_pnl_sums[end_index + 1] - self.__squared_pnl_sums[start_index + 1]
+        count = self.__pnl_counts[end_index + 1] - self.__pnl_counts[start_index + 1] + 1
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance = (squared_pnl_sum - np.square(pnl_sum) / count) / (count - 1)
+        # rounding can leave a tiny negative variance for a flat window
+        return np.sqrt(np.maximum(variance, 0)) * pow(TRADING_DAYS_IN_YEAR, 0.5)
+
+    def get_sharpe_ratio(self, *, start_index, end_index):
+        """
+        Gets the sharpe ratio between two date positions, the return over the annualised volatility.
+
+        :param start_index: int
+        :param end_index: int
+        :return: float or ndarray of one sharpe ratio per scenario
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.get_return(start_index=start_index, end_index=end_index)
+                    / self.get_volatility(start_index=start_index, end_index=end_index))
+
+    def __get_positions(self, start_index, end_index):
+        number_of_dates = len(self.__values)
+        return start_index % number_of_dates, end_index % number_of_dates
+
+
+def get_window_indices(*, dates, start_date, end_date):
+    """
+    Gets the positions of a window of dates in a sorted date index.
+
+    Dates which are not in the index, such as weekends and holidays, are moved inside the window, the start to the
+    first date on or after it and the end to the last date on or before it.
+
+    Parameters
+    ----------
+    dates: DatetimeIndex, sorted
+    start_date: datetime
+    end_date: datetime
+
+    Returns tuple of int, the start and end positions
+    -------
+    """
+    start_index = int(dates.searchsorted(start_date, side='left'))
+    end_index = int(dates.searchsorted(end_date, side='right')) - 1
+    if start_index >= len(dates) or end_index < 0 or start_index > end_index:
+        raise KeyError("No dates between {} and {}".format(start_date, end_date))
+    return start_index, end_index